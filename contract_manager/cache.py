@@ -0,0 +1,59 @@
+"""
+Configuração do cache a partir de uma URL.
+
+Formatos aceitos (``CACHE_URL``)::
+
+    locmem://                    memória do processo (padrão; um único worker)
+    file:///var/cache/contratos  arquivos em disco (um único servidor)
+    redis://host:6379/0          Redis ou compatível (Valkey, KeyDB); requer o pacote redis
+    rediss://host:6380/0         idem, com TLS
+    dummy://                     sem cache
+
+Parâmetros da URL: ``timeout`` e ``key_prefix`` vão para a configuração do
+cache; os demais (ex.: ``max_entries``) para ``OPTIONS``.
+"""
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+BACKENDS = {
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+    'file': 'django.core.cache.backends.filebased.FileBasedCache',
+    'redis': 'django.core.cache.backends.redis.RedisCache',
+    'rediss': 'django.core.cache.backends.redis.RedisCache',
+    'dummy': 'django.core.cache.backends.dummy.DummyCache',
+}
+
+
+def _option_value(value):
+    return int(value) if value.isdigit() else value
+
+
+def parse_cache_url(url):
+    """Converte uma URL de cache em um item de ``CACHES``"""
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    if scheme not in BACKENDS:
+        raise ValueError(f'Cache não suportado: {scheme or url}')
+
+    config = {'BACKEND': BACKENDS[scheme]}
+    options = dict(parse_qsl(parts.query))
+    if 'timeout' in options:
+        config['TIMEOUT'] = int(options.pop('timeout'))
+    if 'key_prefix' in options:
+        config['KEY_PREFIX'] = options.pop('key_prefix')
+
+    if scheme in ('redis', 'rediss'):
+        config['LOCATION'] = url.split('?', 1)[0]
+    elif scheme == 'file':
+        config['LOCATION'] = unquote(parts.path)
+    elif scheme == 'locmem':
+        config['LOCATION'] = parts.netloc
+
+    if options:
+        # Opções do Redis vão para o cliente; as dos demais backends são
+        # maiúsculas (MAX_ENTRIES, CULL_FREQUENCY)
+        redis = scheme in ('redis', 'rediss')
+        config['OPTIONS'] = {
+            key if redis else key.upper(): _option_value(value)
+            for key, value in options.items()
+        }
+    return config
@@ -0,0 +1,129 @@
+"""
+Buscas para campos com autocompletar (contratos, usuários e empresas).
+
+Cada busca retorna no máximo ``limit`` itens no formato do Select2
+(``{'id': ..., 'text': ...}``) e compara apenas prefixos, com intervalos
+(``>= termo`` e ``< termo seguinte``) sobre colunas indexadas: o número do
+contrato (único) e os índices de ``LOWER(...)`` de empresa, usuário, nome e
+sobrenome. Os resultados ficam ``AUTOCOMPLETE_CACHE_TIMEOUT`` segundos no
+cache compartilhado; os de contratos e empresas também são invalidados pela
+etiqueta ``contract``.
+"""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db.models import Q
+from django.db.models.functions import Lower
+
+from core.cache import get_or_set
+
+from .models import Contract
+
+
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 20
+
+
+def get_limit(value, default=DEFAULT_LIMIT):
+    """Converte o parâmetro ``limit`` da requisição, entre 1 e ``MAX_LIMIT``"""
+    try:
+        return min(max(int(value), 1), MAX_LIMIT)
+    except (TypeError, ValueError):
+        return default
+
+
+def prefix_filter(lookup, prefix):
+    """
+    Filtro de prefixo que usa o índice da coluna: um intervalo ``[prefixo,
+    próximo prefixo)``, com ``startswith`` para descartar o que a ordenação
+    do banco colocar no intervalo sem começar com o prefixo.
+    """
+    upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+    return Q(**{
+        f'{lookup}__gte': prefix,
+        f'{lookup}__lt': upper,
+        f'{lookup}__startswith': prefix,
+    })
+
+
+def _cached(name, term, limit, compute, tags=()):
+    return get_or_set(
+        f'contracts.autocomplete.{name}', [term, limit], compute, tags=tags,
+        timeout=getattr(settings, 'AUTOCOMPLETE_CACHE_TIMEOUT', 60),
+    )
+
+
+def search_contracts(term, limit=DEFAULT_LIMIT):
+    """Contratos cujo número (CTR-AAAA-NNN, com ou sem o CTR-) ou empresa começa com o termo"""
+    term = ' '.join(term.split())
+    if not term:
+        return []
+
+    def compute():
+        number = term.upper()
+        if not number.startswith('CTR'):
+            number = f'CTR-{number}'
+        contracts = Contract.objects.alias(company_lower=Lower('company')).filter(
+            prefix_filter('contract_number', number) | prefix_filter('company_lower', term.lower())
+        ).order_by('-number_year', '-number_sequence', 'pk').values('pk', 'contract_number', 'company')
+        return [
+            {'id': contract['pk'], 'text': f"{contract['contract_number']} - {contract['company']}"}
+            for contract in contracts[:limit]
+        ]
+
+    return _cached('contracts', term.lower(), limit, compute, tags=['contract'])
+
+
+def search_users(term, limit=DEFAULT_LIMIT):
+    """
+    Usuários ativos cujo usuário, nome ou sobrenome começa com o termo; com
+    mais de uma palavra, o nome começa com a primeira e o sobrenome com a
+    última (ex.: "joão si" encontra João Silva).
+    """
+    words = term.lower().split()
+    if not words:
+        return []
+
+    def compute():
+        users = get_user_model().objects.filter(is_active=True).alias(
+            username_lower=Lower('username'),
+            first_name_lower=Lower('first_name'),
+            last_name_lower=Lower('last_name'),
+        )
+        if len(words) == 1:
+            users = users.filter(
+                prefix_filter('username_lower', words[0]) |
+                prefix_filter('first_name_lower', words[0]) |
+                prefix_filter('last_name_lower', words[0])
+            )
+        else:
+            users = users.filter(
+                prefix_filter('first_name_lower', words[0]),
+                prefix_filter('last_name_lower', words[-1]),
+            )
+        users = users.order_by('first_name', 'last_name', 'username').values(
+            'pk', 'username', 'first_name', 'last_name'
+        )
+        return [
+            {
+                'id': user['pk'],
+                'text': f"{user['first_name']} {user['last_name']}".strip() or user['username'],
+            }
+            for user in users[:limit]
+        ]
+
+    return _cached('users', ' '.join(words), limit, compute)
+
+
+def search_companies(term, limit=DEFAULT_LIMIT):
+    """Nomes de empresa distintos que começam com o termo"""
+    term = ' '.join(term.split())
+    if not term:
+        return []
+
+    def compute():
+        companies = Contract.objects.alias(company_lower=Lower('company')).filter(
+            prefix_filter('company_lower', term.lower())
+        ).order_by('company').values_list('company', flat=True).distinct()
+        return [{'id': company, 'text': company} for company in companies[:limit]]
+
+    return _cached('companies', term.lower(), limit, compute, tags=['contract'])
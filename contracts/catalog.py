@@ -0,0 +1,127 @@
+"""
+Catálogo em cache de status e tipos de contrato.
+
+As tabelas ``ContractStatus`` e ``ContractType`` são pequenas e quase não
+mudam, mas eram consultadas várias vezes por página (listas de filtros,
+relatórios, formulários). O catálogo fica na memória de cada processo (nível
+``local`` de ``core.cache``) por ``CATALOG_LOCAL_TIMEOUT`` segundos e, por
+trás dele, no cache compartilhado por até um dia; ambos são invalidados pelas
+etiquetas ``contract_status`` e ``contract_type``, trocadas nos sinais de
+save/delete.
+
+A invalidação só alcança os demais processos com um cache compartilhado de
+fato (Redis, arquivos). Com o cache padrão (locmem, um por processo), os
+outros workers enxergam as mudanças quando a entrada local expira; até lá,
+``CatalogChoiceField`` ainda aceita status e tipos novos, consultando o banco.
+
+Os objetos retornados são compartilhados entre requisições: não os altere.
+"""
+from django import forms
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.forms.models import ModelChoiceIterator
+
+from core.cache import get_or_set, shared_cache_is_process_local
+
+from .models import ContractStatus, ContractType
+
+# Validade no cache compartilhado; na memória do processo vale CATALOG_LOCAL_TIMEOUT
+CATALOG_TIMEOUT = 24 * 3600
+
+
+def get_local_timeout():
+    return getattr(settings, 'CATALOG_LOCAL_TIMEOUT', 60)
+
+
+def _load(model, tag):
+    name = f'contracts.catalog.{model._meta.model_name}'
+    local_timeout = get_local_timeout()
+    # Um cache "compartilhado" de cada processo não é invalidado pelos demais
+    shared_timeout = local_timeout if shared_cache_is_process_local() else CATALOG_TIMEOUT
+
+    def load_shared():
+        return list(model.objects.all())
+
+    def load():
+        items = get_or_set(name, None, load_shared, tags=[tag], timeout=shared_timeout)
+        return items, {item.pk: item for item in items}
+
+    return get_or_set(name, None, load, tags=[tag], timeout=local_timeout, tier='local')
+
+
+def get_statuses(active_only=False):
+    """Status de contrato na ordem do modelo"""
+    items, _ = _load(ContractStatus, 'contract_status')
+    return [item for item in items if item.is_active] if active_only else list(items)
+
+
+def get_status(pk):
+    _, by_pk = _load(ContractStatus, 'contract_status')
+    return by_pk.get(_as_pk(pk))
+
+
+def get_types(active_only=False):
+    """Tipos de contrato na ordem do modelo"""
+    items, _ = _load(ContractType, 'contract_type')
+    return [item for item in items if item.is_active] if active_only else list(items)
+
+
+def get_type(pk):
+    _, by_pk = _load(ContractType, 'contract_type')
+    return by_pk.get(_as_pk(pk))
+
+
+def _as_pk(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class CatalogChoiceIterator(ModelChoiceIterator):
+    """Opções lidas do catálogo em vez do queryset"""
+
+    def __iter__(self):
+        if self.field.empty_label is not None:
+            yield ('', self.field.empty_label)
+        for obj in self.field.catalog():
+            yield self.choice(obj)
+
+    def __len__(self):
+        return len(self.field.catalog()) + (self.field.empty_label is not None)
+
+    def __bool__(self):
+        return self.field.empty_label is not None or bool(self.field.catalog())
+
+
+class CatalogChoiceField(forms.ModelChoiceField):
+    """
+    ``ModelChoiceField`` que renderiza e valida as opções com uma função do
+    catálogo (ex.: ``get_statuses``), sem consultar o banco. Um valor ausente
+    do catálogo (criado há pouco por outro processo) é procurado no
+    ``queryset`` antes de ser rejeitado.
+    """
+    iterator = CatalogChoiceIterator
+
+    def __init__(self, catalog, queryset, **kwargs):
+        self.catalog = catalog
+        super().__init__(queryset, **kwargs)
+
+    def to_python(self, value):
+        if value in self.empty_values:
+            return None
+        key = self.to_field_name or 'pk'
+        if isinstance(value, self.queryset.model):
+            value = getattr(value, key)
+        for obj in self.catalog():
+            if str(getattr(obj, key)) == str(value):
+                return obj
+        try:
+            return self.queryset.get(**{key: value})
+        except (ValueError, TypeError, self.queryset.model.DoesNotExist):
+            pass
+        raise ValidationError(
+            self.error_messages['invalid_choice'],
+            code='invalid_choice',
+            params={'value': value},
+        )
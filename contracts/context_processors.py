@@ -0,0 +1,14 @@
+from django.utils.functional import SimpleLazyObject
+
+from .catalog import get_statuses, get_types
+
+
+def contract_catalog(request):
+    """
+    Disponibiliza aos templates os status e tipos de contrato do catálogo em
+    cache (carregados apenas se usados).
+    """
+    return {
+        'contract_statuses': SimpleLazyObject(get_statuses),
+        'contract_types_catalog': SimpleLazyObject(get_types),
+    }
@@ -0,0 +1,300 @@
+"""
+Exportação de contratos (CSV, Excel e PDF).
+
+As linhas são geradas sob demanda a partir de ``QuerySet.iterator`` para que
+a exportação tenha uso de memória constante, independente do número de
+contratos. Exportações grandes são processadas em segundo plano pelo comando
+``process_export_jobs`` (veja ``ExportJob``).
+"""
+import csv
+import io
+import logging
+import tempfile
+
+from django.core.files import File
+from django.db.models import Count, Prefetch
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from core.utils import csv_streaming_response, excel_streaming_response, write_excel_stream
+
+from .models import Contract, ContractParty, ExportJob
+
+logger = logging.getLogger(__name__)
+
+
+# Quantidade de contratos carregados do banco por vez
+EXPORT_CHUNK_SIZE = 2000
+
+CONTRACT_EXPORT_HEADERS = [
+    'Número', 'Empresa', 'Termo', 'Status', 'Valor',
+    'Data Início', 'Data Término', 'Dias Restantes',
+    'Observações', 'Criado em', 'Atualizado em'
+]
+
+CONTRACT_SUMMARY_HEADERS = [
+    'Número', 'Empresa', 'Termo', 'Status', 'Valor',
+    'Data Início', 'Data Término', 'Dias Restantes',
+    'Partes', 'Anexos', 'Lembretes', 'Observações'
+]
+
+
+# Parâmetros aceitos como filtro de exportação
+EXPORT_FILTER_PARAMS = ('status', 'contract_term', 'start_date', 'end_date')
+
+
+def get_export_filters(params):
+    """Extrai os filtros de exportação válidos de um QueryDict ou dicionário"""
+    filters = {}
+    for key in EXPORT_FILTER_PARAMS:
+        value = (params.get(key) or '').strip()
+        if not value:
+            continue
+        if key == 'status' and not value.isdigit():
+            continue
+        if key in ('start_date', 'end_date') and not parse_date(value):
+            continue
+        filters[key] = value
+    return filters
+
+
+def filter_contracts(filters, queryset=None):
+    """Aplica os filtros de exportação e a ordenação padrão (vencimento)"""
+    if queryset is None:
+        queryset = Contract.objects.all()
+
+    if filters.get('status'):
+        queryset = queryset.filter(status_id=filters['status'])
+    if filters.get('contract_term'):
+        queryset = queryset.filter(contract_term=filters['contract_term'])
+    if filters.get('start_date'):
+        queryset = queryset.filter(start_date__gte=parse_date(filters['start_date']))
+    if filters.get('end_date'):
+        queryset = queryset.filter(end_date__lte=parse_date(filters['end_date']))
+
+    return queryset.order_by('end_date')
+
+
+def _days_left(contract, today):
+    return (contract.end_date - today).days if contract.end_date else None
+
+
+def contract_export_rows(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    """Gera as linhas da exportação simples de contratos"""
+    today = timezone.now().date()
+    queryset = queryset.select_related('status')
+
+    for contract in queryset.iterator(chunk_size=chunk_size):
+        yield [
+            contract.contract_number or '',
+            contract.company,
+            contract.get_contract_term_display(),
+            str(contract.status) if contract.status else '',
+            float(contract.value) if contract.value else 0,
+            contract.start_date,
+            contract.end_date,
+            _days_left(contract, today),
+            contract.notes or '',
+            contract.created_at,
+            contract.updated_at,
+        ]
+
+
+def summary_queryset(queryset):
+    """
+    Prepara o queryset da exportação detalhada.
+    
+    As contagens de anexos e lembretes são anotadas na própria consulta e as
+    partes são pré-carregadas junto com os usuários, de modo que o custo da
+    exportação é um número constante de consultas por lote de contratos.
+    """
+    parties = Prefetch(
+        'contract_parties',
+        queryset=ContractParty.objects.select_related('user').order_by('-is_primary', 'id')
+    )
+    return queryset.select_related('status').prefetch_related(parties).annotate(
+        attachment_count=Count('attachments', distinct=True),
+        reminder_count=Count('reminders', distinct=True),
+    )
+
+
+def _party_name(party):
+    return party.user.get_full_name() or party.user.username
+
+
+def contract_summary_rows(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    """Gera as linhas da exportação detalhada (partes, anexos e lembretes)"""
+    today = timezone.now().date()
+
+    for contract in summary_queryset(queryset).iterator(chunk_size=chunk_size):
+        yield [
+            contract.contract_number,
+            contract.company,
+            contract.get_contract_term_display(),
+            str(contract.status) if contract.status else '',
+            float(contract.value) if contract.value else 0,
+            contract.start_date,
+            contract.end_date,
+            _days_left(contract, today),
+            ', '.join(_party_name(p) for p in contract.contract_parties.all()),
+            contract.attachment_count,
+            contract.reminder_count,
+            contract.notes or '',
+        ]
+
+
+def contract_csv_rows(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Gera as linhas da exportação CSV a partir de ``values_list``,
+    sem instanciar os modelos.
+    """
+    today = timezone.now().date()
+    terms = dict(Contract.TERM_CHOICES)
+    values = queryset.values_list(
+        'contract_number', 'company', 'contract_term', 'status__name', 'value',
+        'start_date', 'end_date', 'notes', 'created_at', 'updated_at'
+    )
+
+    for (number, company, term, status, value, start_date, end_date,
+         notes, created_at, updated_at) in values.iterator(chunk_size=chunk_size):
+        yield [
+            number or '',
+            company,
+            terms.get(term, term),
+            status or '',
+            float(value) if value else 0,
+            start_date,
+            end_date,
+            (end_date - today).days if end_date else None,
+            notes or '',
+            timezone.localtime(created_at) if created_at else '',
+            timezone.localtime(updated_at) if updated_at else '',
+        ]
+
+
+def contracts_csv_response(queryset, filename='contratos_exportados.csv'):
+    """Retorna a resposta em streaming com o CSV de contratos"""
+    return csv_streaming_response(
+        CONTRACT_EXPORT_HEADERS, contract_csv_rows(queryset), filename=filename
+    )
+
+
+def contracts_excel_response(queryset, filename='contratos_exportados.xlsx', detailed=False):
+    """Retorna a resposta em streaming com a planilha de contratos"""
+    if detailed:
+        headers, rows = CONTRACT_SUMMARY_HEADERS, contract_summary_rows(queryset)
+    else:
+        headers, rows = CONTRACT_EXPORT_HEADERS, contract_export_rows(queryset)
+
+    return excel_streaming_response(headers, rows, filename=filename, title='Contratos')
+
+
+def write_csv_export(output, queryset):
+    """Grava o CSV de contratos em um arquivo binário e retorna o total de linhas"""
+    wrapper = io.TextIOWrapper(output, encoding='utf-8', newline='')
+    writer = csv.writer(wrapper)
+    writer.writerow(CONTRACT_EXPORT_HEADERS)
+
+    row_count = 0
+    for row in contract_csv_rows(queryset):
+        writer.writerow(row)
+        row_count += 1
+
+    wrapper.flush()
+    wrapper.detach()
+    return row_count
+
+
+def write_excel_export(output, queryset):
+    """Grava a planilha de contratos em um arquivo binário e retorna o total de linhas"""
+    counter = {'rows': 0}
+
+    def rows():
+        for row in contract_export_rows(queryset):
+            counter['rows'] += 1
+            yield row
+
+    write_excel_stream(output, CONTRACT_EXPORT_HEADERS, rows(), title='Contratos')
+    return counter['rows']
+
+
+def write_pdf_export(output, queryset, rows_per_table=500):
+    """Grava o relatório PDF de contratos em um arquivo binário e retorna o total de linhas"""
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4, landscape
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+
+    headers = [
+        'Número', 'Empresa', 'Termo', 'Status', 'Valor',
+        'Data Início', 'Data Término', 'Dias Restantes'
+    ]
+    table_style = TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, -1), 8),
+        ('GRID', (0, 0), (-1, -1), 0.25, colors.grey),
+    ])
+
+    styles = getSampleStyleSheet()
+    story = [
+        Paragraph('Relatório de Contratos', styles['Title']),
+        Paragraph(timezone.localtime().strftime('%d/%m/%Y %H:%M'), styles['Normal']),
+        Spacer(1, 12),
+    ]
+
+    # Tabelas menores evitam que o reportlab calcule o layout de todas as
+    # linhas de uma vez
+    row_count = 0
+    data = []
+    for row in contract_csv_rows(queryset):
+        data.append([
+            row[0], row[1][:40], row[2], row[3], f'{row[4]:.2f}',
+            row[5].strftime('%d/%m/%Y') if row[5] else '',
+            row[6].strftime('%d/%m/%Y') if row[6] else '',
+            '' if row[7] is None else row[7],
+        ])
+        row_count += 1
+        if len(data) >= rows_per_table:
+            story.append(Table([headers] + data, repeatRows=1, style=table_style))
+            data = []
+    if data or not row_count:
+        story.append(Table([headers] + data, repeatRows=1, style=table_style))
+
+    SimpleDocTemplate(output, pagesize=landscape(A4)).build(story)
+    return row_count
+
+
+EXPORT_WRITERS = {
+    'csv': write_csv_export,
+    'excel': write_excel_export,
+    'pdf': write_pdf_export,
+}
+
+
+def process_export_job(job):
+    """
+    Gera o arquivo de uma exportação em segundo plano e o grava no MEDIA_ROOT.
+
+    A exportação deve ter sido assumida com ``ExportJob.claim`` antes.
+    """
+    writer = EXPORT_WRITERS[job.export_format]
+    queryset = filter_contracts(job.filters)
+
+    try:
+        with tempfile.TemporaryFile() as output:
+            row_count = writer(output, queryset)
+            output.seek(0)
+            job.file.save(job.get_filename(), File(output), save=False)
+    except Exception as e:
+        logger.exception('Falha ao processar a exportação %s', job.pk)
+        job.status = ExportJob.FAILED
+        job.error = str(e)
+    else:
+        job.status = ExportJob.DONE
+        job.row_count = row_count
+        job.error = ''
+
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'file', 'row_count', 'error', 'finished_at'])
+    return job
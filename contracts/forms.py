@@ -1,13 +1,77 @@
+from functools import partial
+
 from django import forms
 from django.utils.translation import gettext_lazy as _
 from django.core.exceptions import ValidationError
 from django.core.validators import FileExtensionValidator, MinValueValidator
 from django.conf import settings
 from django.db.models import Q
+from django.urls import reverse_lazy
 from .models import (
     Contract, ContractType, ContractStatus, ContractParty,
     ContractReminder, ContractAttachment, ContractHistory
 )
+from .catalog import CatalogChoiceField, get_statuses, get_types
+
+
+class AutocompleteMixin:
+    """
+    Atributos usados por ``initAutocomplete`` (static/js/main.js): a URL de
+    busca, que retorna ``{'results': [{'id': ..., 'text': ...}]}``, e o
+    mínimo de caracteres digitados.
+    """
+    def __init__(self, url_name, attrs=None, minimum_input_length=1):
+        self.url_name = url_name
+        self.minimum_input_length = minimum_input_length
+        super().__init__(attrs)
+    
+    def build_attrs(self, base_attrs, extra_attrs=None):
+        attrs = super().build_attrs(base_attrs, extra_attrs)
+        attrs['data-autocomplete-url'] = reverse_lazy(self.url_name)
+        attrs['data-minimum-input-length'] = self.minimum_input_length
+        return attrs
+
+
+class AutocompleteSelect(AutocompleteMixin, forms.Select):
+    """
+    Select com busca no servidor: renderiza apenas a opção selecionada (e a
+    vazia), sem percorrer o queryset do campo; as demais opções são
+    carregadas pelo Select2 conforme o usuário digita. A validação continua
+    sendo a do ``ModelChoiceField``.
+    """
+    def __init__(self, url_name, attrs=None, minimum_input_length=1):
+        attrs = {'class': 'form-select', **(attrs or {})}
+        super().__init__(url_name, attrs, minimum_input_length)
+    
+    def selected_choices(self, value):
+        selected = {str(item) for item in value if item not in (None, '')}
+        field = getattr(self.choices, 'field', None)
+        if field is None:
+            return [choice for choice in self.choices if choice[0] == '' or str(choice[0]) in selected]
+        
+        choices = [('', field.empty_label)] if field.empty_label is not None else []
+        if selected:
+            key = field.to_field_name or 'pk'
+            choices.extend(
+                self.choices.choice(obj)
+                for obj in field.queryset.filter(**{f'{key}__in': selected})
+            )
+        return choices
+    
+    def optgroups(self, name, value, attrs=None):
+        choices = self.choices
+        self.choices = self.selected_choices(value)
+        try:
+            return super().optgroups(name, value, attrs)
+        finally:
+            self.choices = choices
+
+
+class AutocompleteTextInput(AutocompleteMixin, forms.TextInput):
+    """Campo de texto livre com sugestões vindas do servidor"""
+    def __init__(self, url_name, attrs=None, minimum_input_length=1):
+        attrs = {'class': 'form-control', 'autocomplete': 'off', **(attrs or {})}
+        super().__init__(url_name, attrs, minimum_input_length)
 
 
 class ContractFilterForm(forms.Form):
@@ -33,7 +97,8 @@ class ContractFilterForm(forms.Form):
         required=False,
         widget=forms.Select(attrs={'class': 'form-select'})
     )
-    contract_type = forms.ModelChoiceField(
+    contract_type = CatalogChoiceField(
+        partial(get_types, active_only=True),
         label=_('Tipo de Contrato'),
         queryset=ContractType.objects.filter(is_active=True),
         required=False,
@@ -121,9 +186,11 @@ class ContractForm(forms.ModelForm):
             'contract_number', 'company', 'company_cnpj', 'fiscal_name', 'fiscal_registration',
             'alternate_fiscal_name', 'alternate_fiscal_registration',
             'contract_term', 'start_date', 'end_date', 'value', 'currency',
-            'contract_document', 'fiscal_portaria', 'additive_term', 'notes'
+            'responsible', 'contract_document', 'fiscal_portaria', 'additive_term', 'notes'
         ]
         widgets = {
+            'company': AutocompleteTextInput('contracts:company_autocomplete'),
+            'responsible': AutocompleteSelect('contracts:user_autocomplete'),
             'start_date': forms.DateInput(
                 attrs={'class': 'form-control dateinput'},
                 format='%d/%m/%Y'
@@ -227,6 +294,49 @@ class ContractForm(forms.ModelForm):
         return cleaned_data
 
 
+class ContractImportRowForm(ContractForm):
+    """
+    Validação de uma linha da importação de contratos.
+    
+    Usa as mesmas regras do ContractForm, sem o responsável e os arquivos
+    (que não vêm na planilha). A unicidade do número é verificada por lote pelo importador.
+    """
+    class Meta(ContractForm.Meta):
+        fields = [
+            field for field in ContractForm.Meta.fields
+            if field not in ('responsible', 'contract_document', 'fiscal_portaria', 'additive_term')
+        ]
+    
+    def validate_unique(self):
+        pass
+
+
+class ContractImportForm(forms.Form):
+    """Formulário de envio da planilha de importação de contratos"""
+    file = forms.FileField(
+        label=_('Arquivo'),
+        validators=[FileExtensionValidator(allowed_extensions=['csv', 'xlsx'])],
+        help_text=_('Planilha CSV ou XLSX com uma linha de cabeçalho')
+    )
+    status = CatalogChoiceField(
+        partial(get_statuses, active_only=True),
+        label=_('Status padrão'),
+        queryset=ContractStatus.objects.filter(is_active=True),
+        help_text=_('Usado nas linhas sem a coluna Status')
+    )
+    dry_run = forms.BooleanField(
+        label=_('Apenas validar'),
+        required=False,
+        help_text=_('Verifica as linhas sem gravar os contratos')
+    )
+    
+    def clean_file(self):
+        file = self.cleaned_data.get('file')
+        if file and file.size > settings.MAX_UPLOAD_SIZE:
+            raise forms.ValidationError(_('O arquivo excede o tamanho máximo permitido.'))
+        return file
+
+
 class ContractTypeForm(forms.ModelForm):
     """Formulário para tipos de contrato"""
     class Meta:
@@ -254,6 +364,7 @@ class ContractPartyForm(forms.ModelForm):
         model = ContractParty
         fields = ['user', 'role', 'is_primary', 'notes']
         widgets = {
+            'user': AutocompleteSelect('contracts:user_autocomplete'),
             'notes': forms.Textarea(attrs={'rows': 3}),
         }
 
@@ -264,6 +375,7 @@ class ContractReminderForm(forms.ModelForm):
         model = ContractReminder
         fields = ['title', 'description', 'due_date', 'assigned_to', 'is_completed']
         widgets = {
+            'assigned_to': AutocompleteSelect('contracts:user_autocomplete'),
             'description': forms.Textarea(attrs={'rows': 3}),
             'due_date': forms.DateTimeInput(
                 attrs={'type': 'datetime-local'},
@@ -0,0 +1,74 @@
+"""
+Registro do histórico de alterações de contratos.
+
+As entradas de ``ContractHistory`` criadas dentro de uma transação ficam em
+um buffer e são gravadas de uma vez, com ``bulk_create``, quando a transação
+é confirmada. Fora de uma transação a entrada é gravada imediatamente.
+
+Cada nível de savepoint tem o seu buffer, preso ao callback registrado com
+``transaction.on_commit`` na primeira entrada daquele nível. Se o savepoint
+(``atomic`` aninhado) ou a transação for desfeito, o Django descarta o
+callback e, com ele, as entradas registradas ali; a próxima entrada abre um
+buffer novo. Sem savepoints, cada commit grava o histórico em um único
+``bulk_create``.
+"""
+import weakref
+
+from django.db import transaction
+
+from .models import ContractHistory
+
+
+class _HistoryBuffer:
+    """Entradas de um nível de savepoint, gravadas como callback de ``on_commit``"""
+
+    def __init__(self):
+        self.entries = []
+        self.written = False
+
+    def __call__(self):
+        self.written = True
+        if self.entries:
+            ContractHistory.objects.bulk_create(self.entries)
+
+
+def _pending_entries(connection):
+    """Buffer do savepoint atual, registrado no on_commit na primeira entrada"""
+    buffers = getattr(connection, 'contract_history_buffers', None)
+    if buffers is None:
+        # O callback só fica vivo enquanto o Django o mantiver registrado
+        buffers = connection.contract_history_buffers = weakref.WeakValueDictionary()
+
+    key = tuple(connection.savepoint_ids)
+    buffer = buffers.get(key)
+    if buffer is None or buffer.written:
+        buffer = buffers[key] = _HistoryBuffer()
+        transaction.on_commit(buffer)
+    return buffer.entries
+
+
+def record_history(contract, user=None, description='', changed_fields=None):
+    """Registra uma entrada no histórico do contrato"""
+    entry = ContractHistory(
+        contract=contract,
+        changed_by=user,
+        change_description=description,
+        changed_fields=changed_fields or {},
+    )
+    connection = transaction.get_connection()
+    if not connection.in_atomic_block:
+        entry.save()
+    else:
+        _pending_entries(connection).append(entry)
+    return entry
+
+
+def record_changes(contract, user=None, description='Dados do contrato atualizados'):
+    """
+    Registra as alterações de um contrato em relação aos valores carregados
+    do banco. Deve ser chamada antes do ``save``; retorna None se nada mudou.
+    """
+    changed_fields = contract.get_changed_fields()
+    if not changed_fields:
+        return None
+    return record_history(contract, user, description, changed_fields)
@@ -0,0 +1,406 @@
+"""
+Importação de contratos em lote (CSV e XLSX).
+
+As linhas são lidas sob demanda (``csv`` ou openpyxl em modo somente
+leitura), validadas com as regras do ``ContractForm`` e gravadas em lotes com
+``bulk_create``, junto com o histórico de cada contrato. Os números de
+contrato são reservados em blocos na ``ContractNumberSequence``.
+
+Linhas inválidas são relatadas com o número da linha e não interrompem a
+importação das demais.
+"""
+import csv
+import io
+import os
+from collections import defaultdict
+from datetime import date, datetime
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from core.cache import invalidate_tags
+
+from .catalog import get_statuses
+from .forms import ContractImportRowForm
+from .models import (
+    Contract, ContractHistory, ContractStats, ContractNumberSequence, ContractStatus,
+    parse_contract_number
+)
+from .search import get_search_backend, normalize_search_text
+
+
+# Quantidade de linhas validadas e gravadas por vez
+IMPORT_BATCH_SIZE = 500
+
+# Cabeçalhos aceitos (sem acentos e em minúsculas) e os campos correspondentes.
+# Os nomes dos próprios campos de Contract também são aceitos.
+IMPORT_COLUMNS = {
+    'numero': 'contract_number',
+    'numero do contrato': 'contract_number',
+    'empresa': 'company',
+    'cnpj': 'company_cnpj',
+    'cnpj da empresa': 'company_cnpj',
+    'fiscal': 'fiscal_name',
+    'nome fiscal': 'fiscal_name',
+    'matricula do fiscal': 'fiscal_registration',
+    'fiscal suplente': 'alternate_fiscal_name',
+    'nome do fiscal suplente': 'alternate_fiscal_name',
+    'matricula do fiscal suplente': 'alternate_fiscal_registration',
+    'termo': 'contract_term',
+    'termo do contrato': 'contract_term',
+    'status': 'status',
+    'valor': 'value',
+    'valor total': 'value',
+    'moeda': 'currency',
+    'data inicio': 'start_date',
+    'data de inicio': 'start_date',
+    'data termino': 'end_date',
+    'data de termino': 'end_date',
+    'observacoes': 'notes',
+}
+
+IMPORT_FIELDS = set(ContractImportRowForm.Meta.fields) | {'status'}
+
+
+def _column_key(header):
+    return ' '.join(normalize_search_text(header).split())
+
+
+def map_headers(headers):
+    """Associa cada coluna da planilha a um campo de Contract (ou None)"""
+    mapped = []
+    for header in headers:
+        key = _column_key(header or '')
+        field = IMPORT_COLUMNS.get(key) or key.replace(' ', '_')
+        mapped.append(field if field in IMPORT_FIELDS else None)
+    return mapped
+
+
+def _rows_from_values(rows):
+    """Converte as linhas (cabeçalho + valores) em (número da linha, dicionário)"""
+    headers = None
+    for line, values in enumerate(rows, start=1):
+        if headers is None:
+            headers = map_headers(values)
+            continue
+        if not any(value not in (None, '') for value in values):
+            continue
+        yield line, {
+            field: value
+            for field, value in zip(headers, values)
+            if field and value not in (None, '')
+        }
+
+
+def read_csv_rows(file):
+    """Lê um CSV (vírgula ou ponto e vírgula, UTF-8) de um arquivo binário"""
+    text = io.TextIOWrapper(file, encoding='utf-8-sig', newline='')
+    sample = text.read(4096)
+    text.seek(0)
+    try:
+        dialect = csv.Sniffer().sniff(sample, delimiters=',;\t')
+    except csv.Error:
+        dialect = csv.excel
+    try:
+        yield from _rows_from_values(csv.reader(text, dialect))
+    finally:
+        text.detach()
+
+
+def read_xlsx_rows(file):
+    """Lê a primeira planilha de um XLSX em modo somente leitura"""
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(file, read_only=True, data_only=True)
+    try:
+        yield from _rows_from_values(workbook.active.iter_rows(values_only=True))
+    finally:
+        workbook.close()
+
+
+IMPORT_READERS = {
+    '.csv': read_csv_rows,
+    '.xlsx': read_xlsx_rows,
+}
+
+
+def read_import_rows(file, filename):
+    """Escolhe o leitor pela extensão do arquivo"""
+    extension = os.path.splitext(filename)[1].lower()
+    if extension not in IMPORT_READERS:
+        raise ValueError(f'Formato de arquivo não suportado: {extension or filename}')
+    return IMPORT_READERS[extension](file)
+
+
+def _decimal_text(value):
+    """Aceita números da planilha e textos como 'R$ 1.234,56'"""
+    if isinstance(value, (int, float, Decimal)):
+        return str(value)
+    text = str(value).replace('R$', '').strip()
+    if ',' in text:
+        text = text.replace('.', '').replace(',', '.')
+    return text
+
+
+def _date_text(value):
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    return str(value).strip()
+
+
+class ImportResult:
+    """Totais e erros por linha de uma importação"""
+
+    def __init__(self):
+        self.total = 0
+        self.created = 0
+        self.errors = []
+
+    def add_error(self, line, messages):
+        self.errors.append((line, messages))
+
+    @property
+    def error_count(self):
+        return len(self.errors)
+
+
+class ContractImporter:
+    """
+    Importa contratos em lotes.
+
+    ``rows`` deve produzir pares (número da linha, dicionário campo -> valor),
+    como os gerados por ``read_import_rows``.
+    """
+
+    def __init__(self, user=None, default_status=None, batch_size=IMPORT_BATCH_SIZE,
+                 dry_run=False, source=''):
+        self.user = user
+        self.default_status = default_status
+        self.batch_size = batch_size
+        self.dry_run = dry_run
+        self.source = source
+        self.result = ImportResult()
+        self.seen_numbers = set()
+        self.statuses = self.load_statuses(get_statuses())
+        self.statuses_reloaded = False
+        self.terms = {}
+        for key, label in Contract.TERM_CHOICES:
+            self.terms[key] = key
+            self.terms[normalize_search_text(label)] = key
+
+    @staticmethod
+    def load_statuses(statuses):
+        return {normalize_search_text(status.name): status.pk for status in statuses}
+
+    def find_status(self, name):
+        """
+        Id do status pelo nome. Um nome ausente do catálogo (que pode estar
+        desatualizado neste processo) faz uma releitura do banco.
+        """
+        key = normalize_search_text(name)
+        if key not in self.statuses and not self.statuses_reloaded:
+            self.statuses = self.load_statuses(ContractStatus.objects.all())
+            self.statuses_reloaded = True
+        return self.statuses.get(key)
+
+    def run(self, rows):
+        batch = []
+        for line, data in rows:
+            self.result.total += 1
+            batch.append((line, data))
+            if len(batch) >= self.batch_size:
+                self.process_batch(batch)
+                batch = []
+        if batch:
+            self.process_batch(batch)
+
+        if self.result.created:
+            invalidate_tags('contract')
+        return self.result
+
+    def prepare(self, data):
+        """Converte os valores da planilha para o formato aceito pelo formulário"""
+        data = {key: value.strip() if isinstance(value, str) else value for key, value in data.items()}
+        if 'value' in data:
+            data['value'] = _decimal_text(data['value'])
+        for field in ('start_date', 'end_date'):
+            if field in data:
+                data[field] = _date_text(data[field])
+        if 'contract_term' in data:
+            term = normalize_search_text(data['contract_term'])
+            data['contract_term'] = self.terms.get(term, data['contract_term'])
+        # Documentos lidos como número perdem os zeros à esquerda
+        for field, digits in (('company_cnpj', 14), ('fiscal_registration', 7),
+                              ('alternate_fiscal_registration', 7)):
+            if isinstance(data.get(field), (int, float)):
+                data[field] = f'{int(data[field]):0{digits}d}'
+
+        # Colunas ausentes recebem o valor padrão do modelo
+        for field in ContractImportRowForm.Meta.fields:
+            model_field = Contract._meta.get_field(field)
+            if field not in data and model_field.has_default():
+                data[field] = model_field.get_default()
+        return data
+
+    def build_contract(self, line, data):
+        """Valida uma linha e retorna o contrato (não gravado) ou None"""
+        data = self.prepare(data)
+        errors = []
+
+        status_id = self.default_status.pk if self.default_status else None
+        if data.get('status'):
+            status_id = self.find_status(data['status'])
+            if status_id is None:
+                errors.append(f"status: Status '{data['status']}' não encontrado.")
+
+        form = ContractImportRowForm(data=data)
+        if not form.is_valid():
+            for field, messages in form.errors.items():
+                label = field if field != '__all__' else 'linha'
+                errors.extend(f'{label}: {message}' for message in messages)
+
+        if errors:
+            self.result.add_error(line, errors)
+            return None
+
+        contract = form.save(commit=False)
+        if status_id:
+            contract.status_id = status_id
+        contract.created_by = self.user
+        if not (contract.contract_number or '').startswith('CTR-'):
+            contract.contract_number = ''
+        return contract
+
+    def process_batch(self, batch):
+        pending = []
+        for line, data in batch:
+            contract = self.build_contract(line, data)
+            if contract is not None:
+                pending.append((line, contract))
+
+        pending = self.check_numbers(pending)
+        if self.dry_run or not pending:
+            return
+
+        # Números reservados em bloco para as linhas sem número, depois dos
+        # números informados no lote para o mesmo ano (ainda não gravados)
+        manual = [contract for _, contract in pending if contract.contract_number]
+        missing = [contract for _, contract in pending if not contract.contract_number]
+        if missing:
+            year = timezone.now().year
+            after = 0
+            for contract in manual:
+                number_year, sequence = parse_contract_number(contract.contract_number)
+                if number_year == year:
+                    after = max(after, sequence)
+            numbers = Contract.allocate_contract_numbers(len(missing), year, after)
+            for contract, number in zip(missing, numbers):
+                contract.contract_number = number
+
+        for _, contract in pending:
+            contract.update_lookup_keys()
+
+        created = self.save_contracts(pending)
+        self.after_save(created, manual)
+
+    def check_numbers(self, pending):
+        """
+        Rejeita números informados que já existem no banco ou no próprio
+        arquivo. A comparação usa o ano e a sequência do número, de modo que
+        CTR-2026-7 e CTR-2026-007 são o mesmo contrato.
+        """
+        keys = {}
+        for _, contract in pending:
+            if contract.contract_number:
+                year, sequence = parse_contract_number(contract.contract_number)
+                keys[contract.contract_number] = (
+                    (year, sequence) if year is not None else contract.contract_number
+                )
+
+        parsed = [key for key in keys.values() if isinstance(key, tuple)]
+        raw = [key for key in keys.values() if not isinstance(key, tuple)]
+        existing = set()
+        if parsed:
+            existing.update(
+                Contract.objects.filter(
+                    number_year__in={year for year, _ in parsed},
+                    number_sequence__in={sequence for _, sequence in parsed},
+                ).values_list('number_year', 'number_sequence')
+            )
+        if raw:
+            existing.update(
+                Contract.objects.filter(contract_number__in=raw).values_list('contract_number', flat=True)
+            )
+
+        accepted = []
+        for line, contract in pending:
+            number = contract.contract_number
+            key = keys.get(number)
+            if number and (key in existing or key in self.seen_numbers):
+                self.result.add_error(line, [f'contract_number: O número {number} já está em uso.'])
+                continue
+            if number:
+                self.seen_numbers.add(key)
+            accepted.append((line, contract))
+        return accepted
+
+    def history_entry(self, contract):
+        return ContractHistory(
+            contract=contract,
+            changed_by=self.user,
+            change_description='Contrato importado',
+            changed_fields={'created': True, 'imported': True, 'source': self.source},
+        )
+
+    def save_contracts(self, pending):
+        """Grava o lote; se houver conflito no banco, grava linha a linha"""
+        contracts = [contract for _, contract in pending]
+        try:
+            with transaction.atomic():
+                Contract.objects.bulk_create(contracts)
+                ContractHistory.objects.bulk_create([self.history_entry(c) for c in contracts])
+            return contracts
+        except IntegrityError:
+            for contract in contracts:
+                contract.pk = None
+
+        created = []
+        for line, contract in pending:
+            try:
+                with transaction.atomic():
+                    Contract.objects.bulk_create([contract])
+                    self.history_entry(contract).save()
+            except IntegrityError as e:
+                contract.pk = None
+                self.result.add_error(line, [f'Erro ao gravar o contrato: {e}'])
+            else:
+                created.append(contract)
+        return created
+
+    def after_save(self, created, manual=()):
+        """Atualiza o que os sinais de Contract fariam em um save individual"""
+        self.result.created += len(created)
+
+        totals = defaultdict(lambda: [0, 0])
+        for contract in created:
+            bucket, value = contract.get_stats_bucket()
+            key = tuple(sorted(bucket.items()))
+            totals[key][0] += 1
+            totals[key][1] += value
+        for key, (count, value) in totals.items():
+            ContractStats.apply_delta(dict(key), count, value)
+
+        get_search_backend().index_contracts(created, replace=False)
+
+        for contract in manual:
+            if contract.pk and contract.number_year is not None:
+                ContractNumberSequence.observe(contract.number_year, contract.number_sequence)
+
+
+def import_contracts(file, filename, **kwargs):
+    """Importa os contratos de um arquivo CSV ou XLSX e retorna o ImportResult"""
+    importer = ContractImporter(source=os.path.basename(filename), **kwargs)
+    return importer.run(read_import_rows(file, filename))
@@ -0,0 +1,206 @@
+import random
+import statistics
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+from contracts.models import Contract, ContractStatus, ContractStats
+from contracts.search import get_search_backend
+
+
+BENCHMARK_MARKER = '[benchmark]'
+
+
+class RollbackBenchmark(Exception):
+    """Usada para desfazer a remoção temporária dos índices"""
+
+
+class Command(BaseCommand):
+    help = (
+        'Popula contratos de teste e mede as consultas da listagem, dos '
+        'dashboards e do relatório de vencimentos (EXPLAIN e tempos)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='Quantidade de contratos de teste a criar antes da medição',
+        )
+        parser.add_argument(
+            '--clear',
+            action='store_true',
+            help='Remove os contratos de teste criados anteriormente e encerra',
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5,
+            help='Número de execuções de cada consulta (padrão: 5)',
+        )
+        parser.add_argument(
+            '--compare',
+            action='store_true',
+            help='Mede também sem os índices de Contract.Meta (removidos temporariamente)',
+        )
+        parser.add_argument(
+            '--explain',
+            action='store_true',
+            help='Exibe o plano de execução (EXPLAIN) de cada consulta',
+        )
+        parser.add_argument(
+            '--search',
+            action='append',
+            default=[],
+            metavar='TERMO',
+            help='Compara a busca por icontains com o índice de busca (pode repetir)',
+        )
+
+    def handle(self, *args, **options):
+        if options['clear']:
+            deleted, _ = Contract.objects.filter(notes=BENCHMARK_MARKER).delete()
+            ContractStats.rebuild()
+            get_search_backend().rebuild()
+            self.stdout.write(self.style.SUCCESS(f'{deleted} registro(s) de teste removido(s)'))
+            return
+
+        if options['seed']:
+            self.seed(options['seed'])
+
+        total = Contract.objects.count()
+        self.stdout.write(f'Contratos na base: {total}')
+
+        if options['compare']:
+            try:
+                with transaction.atomic():
+                    self.drop_indexes()
+                    self.stdout.write(self.style.MIGRATE_HEADING('\nSem índices compostos'))
+                    self.run_benchmark(options['repeat'], options['explain'])
+                    raise RollbackBenchmark
+            except RollbackBenchmark:
+                pass
+
+        self.stdout.write(self.style.MIGRATE_HEADING('\nCom índices compostos'))
+        self.run_benchmark(options['repeat'], options['explain'])
+
+        if options['search']:
+            self.stdout.write(self.style.MIGRATE_HEADING('\nBusca textual'))
+            self.run_benchmark(
+                options['repeat'], options['explain'], self.get_search_queries(options['search'])
+            )
+
+    def seed(self, count, batch_size=5000):
+        """Cria contratos de teste com bulk_create"""
+        statuses = list(ContractStatus.objects.values_list('pk', flat=True))
+        if not statuses:
+            statuses = [ContractStatus.objects.create(name='Ativo').pk]
+        users = list(get_user_model().objects.values_list('pk', flat=True)[:50]) or [None]
+        terms = [choice for choice, _ in Contract.TERM_CHOICES]
+
+        today = timezone.localdate()
+        offset = Contract.objects.filter(notes=BENCHMARK_MARKER).count()
+        created = 0
+
+        while created < count:
+            batch = []
+            for i in range(min(batch_size, count - created)):
+                number = offset + created + i + 1
+                start_date = today - timedelta(days=random.randint(0, 3650))
+                cnpj = f'{random.randint(0, 10 ** 14 - 1):014d}'
+                contract = Contract(
+                    contract_number=f'CTR-BENCH-{number:07d}',
+                    company=f'Empresa {random.randint(1, 5000)}',
+                    company_cnpj=f'{cnpj[:2]}.{cnpj[2:5]}.{cnpj[5:8]}/{cnpj[8:12]}-{cnpj[12:]}',
+                    fiscal_name=f'Fiscal {random.randint(1, 500)}',
+                    contract_term=random.choice(terms),
+                    contract_document='benchmark.pdf',
+                    fiscal_portaria='benchmark.pdf',
+                    notes=BENCHMARK_MARKER,
+                    status_id=random.choice(statuses),
+                    responsible_id=random.choice(users),
+                    start_date=start_date,
+                    end_date=start_date + timedelta(days=random.randint(30, 1825)),
+                    value=Decimal(random.randint(1000, 10000000)) / 100,
+                    is_active=random.random() < 0.8,
+                )
+                # bulk_create não chama Contract.save
+                contract.update_lookup_keys()
+                batch.append(contract)
+            Contract.objects.bulk_create(batch, batch_size=batch_size)
+            created += len(batch)
+            self.stdout.write(f'  {created}/{count} contratos criados', ending='\r')
+            self.stdout.flush()
+
+        # bulk_create não dispara os sinais que mantêm ContractStats e o
+        # índice de busca
+        ContractStats.rebuild()
+        get_search_backend().rebuild()
+        self.stdout.write(self.style.SUCCESS(f'\n{created} contratos de teste criados'))
+
+    def drop_indexes(self):
+        """Remove os índices declarados em Contract.Meta (dentro da transação)"""
+        schema_editor = connection.schema_editor(atomic=False)
+        for index in Contract._meta.indexes:
+            schema_editor.remove_index(Contract, index)
+
+    def get_queries(self):
+        """Consultas equivalentes às das views de listagem e relatórios"""
+        today = timezone.localdate()
+        status_id = ContractStatus.objects.values_list('pk', flat=True).first()
+        responsible_id = Contract.objects.exclude(
+            responsible__isnull=True
+        ).values_list('responsible_id', flat=True).first()
+
+        base = Contract.objects.select_related('status', 'responsible', 'created_by')
+        return [
+            ('Listagem (-created_at)', base.order_by('-created_at')[:20]),
+            ('Listagem por status', base.filter(status_id=status_id).order_by('-created_at')[:20]),
+            ('Listagem por responsável', base.filter(responsible_id=responsible_id).order_by('-created_at')[:20]),
+            ('Listagem por termo', base.filter(contract_term='term_1').order_by('-created_at')[:20]),
+            ('Vencendo em 30 dias', base.filter(
+                is_active=True, end_date__range=(today, today + timedelta(days=30))
+            ).order_by('end_date')[:20]),
+            ('Vencidos (ativos)', Contract.objects.filter(is_active=True, end_date__lt=today).order_by('-end_date')[:20]),
+            ('Contagem vencendo', Contract.objects.filter(
+                is_active=True, end_date__range=(today, today + timedelta(days=30))
+            ).order_by()),
+        ]
+
+    def get_search_queries(self, terms):
+        """Busca da listagem com icontains e com o backend de busca configurado"""
+        base = Contract.objects.select_related('status', 'responsible', 'created_by')
+        like = get_search_backend('like')
+        backend = get_search_backend()
+
+        queries = []
+        for term in terms:
+            queries.append((f'icontains "{term}"', like.search(base, term)[:20]))
+            queries.append((f'{backend.name} "{term}"', backend.search(base, term)[:20]))
+            queries.append((f'icontains "{term}" (total)', like.search(base, term).order_by()))
+            queries.append((f'{backend.name} "{term}" (total)', backend.search(base, term).order_by()))
+        return queries
+
+    def run_benchmark(self, repeat, explain, queries=None):
+        for label, queryset in queries or self.get_queries():
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                if queryset.query.is_sliced:
+                    list(queryset.all())
+                else:
+                    queryset.count()
+                timings.append((time.perf_counter() - started) * 1000)
+
+            self.stdout.write(
+                f'{label:<28} melhor {min(timings):8.2f} ms   '
+                f'mediana {statistics.median(timings):8.2f} ms'
+            )
+            if explain:
+                for line in queryset.explain().splitlines():
+                    self.stdout.write(f'    {line}')
@@ -0,0 +1,73 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from contracts.imports import IMPORT_BATCH_SIZE, import_contracts
+from contracts.models import ContractStatus
+
+
+class Command(BaseCommand):
+    help = 'Importa contratos de uma planilha CSV ou XLSX'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Caminho do arquivo CSV ou XLSX')
+        parser.add_argument(
+            '--user',
+            help='Nome de usuário registrado como criador dos contratos',
+        )
+        parser.add_argument(
+            '--status',
+            help='Status (nome ou id) das linhas sem a coluna Status',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=IMPORT_BATCH_SIZE,
+            help=f'Linhas validadas e gravadas por vez (padrão: {IMPORT_BATCH_SIZE})',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Apenas valida as linhas, sem gravar os contratos',
+        )
+
+    def handle(self, *args, **options):
+        user = None
+        if options['user']:
+            try:
+                user = get_user_model().objects.get(username=options['user'])
+            except get_user_model().DoesNotExist:
+                raise CommandError(f"Usuário '{options['user']}' não encontrado")
+
+        status = None
+        if options['status']:
+            lookup = {'pk': options['status']} if options['status'].isdigit() else {'name__iexact': options['status']}
+            status = ContractStatus.objects.filter(**lookup).first()
+            if status is None:
+                raise CommandError(f"Status '{options['status']}' não encontrado")
+
+        try:
+            with open(options['path'], 'rb') as file:
+                result = import_contracts(
+                    file, options['path'],
+                    user=user,
+                    default_status=status,
+                    batch_size=options['batch_size'],
+                    dry_run=options['dry_run'],
+                )
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+
+        for line, messages in result.errors:
+            for message in messages:
+                self.stderr.write(f'Linha {line}: {message}')
+
+        if options['dry_run']:
+            valid = result.total - result.error_count
+            self.stdout.write(self.style.SUCCESS(
+                f'{valid} de {result.total} linha(s) válida(s); nada foi gravado'
+            ))
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f'{result.created} contrato(s) importado(s) de {result.total} linha(s); '
+                f'{result.error_count} linha(s) com erro'
+            ))
@@ -0,0 +1,104 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.utils import timezone
+
+from contracts.exports import process_export_job
+from contracts.models import ExportJob
+
+
+class Command(BaseCommand):
+    help = 'Processa a fila de exportações de contratos (CSV, Excel e PDF)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Processa as exportações pendentes e encerra, em vez de aguardar novas',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=2.0,
+            help='Intervalo em segundos entre as consultas à fila (padrão: 2)',
+        )
+        parser.add_argument(
+            '--retention-days',
+            type=int,
+            default=getattr(settings, 'EXPORT_JOB_RETENTION_DAYS', 7),
+            help='Remove exportações concluídas há mais dias que este valor',
+        )
+
+    def handle(self, *args, **options):
+        self.requeue_stale()
+        self.stdout.write('Aguardando exportações...')
+        purge_interval = getattr(settings, 'EXPORT_JOB_PURGE_INTERVAL', 600)
+        next_purge = time.monotonic()
+        try:
+            while True:
+                # Como ao fim de uma requisição: descarta conexões quebradas ou
+                # mais velhas que CONN_MAX_AGE antes de voltar ao banco
+                close_old_connections()
+                if self.process_pending():
+                    continue
+                if options['once']:
+                    break
+                if time.monotonic() >= next_purge:
+                    self.purge_expired(options['retention_days'])
+                    next_purge = time.monotonic() + purge_interval
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            self.stdout.write('Encerrando.')
+            return
+
+        self.purge_expired(options['retention_days'])
+
+    def process_pending(self):
+        """Processa as exportações na fila, da mais antiga para a mais nova"""
+        processed = 0
+        pending = list(
+            ExportJob.objects.filter(status=ExportJob.PENDING).order_by('created_at')[:50]
+        )
+
+        for job in pending:
+            if not job.claim():
+                continue
+
+            job = process_export_job(job)
+            processed += 1
+            if job.status == ExportJob.DONE:
+                self.stdout.write(self.style.SUCCESS(
+                    f'Exportação {job.pk} concluída ({job.row_count} linhas)'
+                ))
+            else:
+                self.stdout.write(self.style.ERROR(
+                    f'Exportação {job.pk} falhou: {job.error}'
+                ))
+
+        return processed
+
+    def requeue_stale(self):
+        """Devolve à fila exportações interrompidas por um worker que parou"""
+        timeout = getattr(settings, 'EXPORT_JOB_TIMEOUT', 3600)
+        limit = timezone.now() - timezone.timedelta(seconds=timeout)
+        requeued = ExportJob.objects.filter(
+            status=ExportJob.RUNNING,
+            started_at__lt=limit
+        ).update(status=ExportJob.PENDING, started_at=None)
+        if requeued:
+            self.stdout.write(f'{requeued} exportação(ões) interrompida(s) devolvida(s) à fila')
+
+    def purge_expired(self, retention_days):
+        """Remove os arquivos e registros de exportações antigas"""
+        limit = timezone.now() - timezone.timedelta(days=retention_days)
+        expired = ExportJob.objects.filter(
+            status__in=[ExportJob.DONE, ExportJob.FAILED],
+            finished_at__lt=limit
+        )
+
+        for job in expired.iterator():
+            if job.file:
+                job.file.delete(save=False)
+            job.delete()
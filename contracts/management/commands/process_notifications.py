@@ -0,0 +1,52 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from contracts.notifications import process_notifications
+
+
+class Command(BaseCommand):
+    help = (
+        'Envia por email os resumos de lembretes pendentes e de contratos '
+        'próximos do vencimento (sem repetir avisos já enviados)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Continua em execução, processando a cada --interval segundos (padrão: executa uma vez, para uso com cron)',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=getattr(settings, 'NOTIFICATION_INTERVAL', 900),
+            help='Intervalo em segundos entre as execuções com --loop (padrão: 900)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Mostra os emails que seriam enviados, sem enviar nem registrar',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            while True:
+                self.run_once(options['dry_run'])
+                if not options['loop']:
+                    break
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            self.stdout.write('Encerrando.')
+
+    def run_once(self, dry_run):
+        result = process_notifications(dry_run=dry_run, stdout=self.stdout if dry_run else None)
+        message = (
+            f'{result["digests"]} resumo(s) com {result["notices"]} aviso(s); '
+            f'{result["skipped"]} destinatário(s) ignorado(s)'
+        )
+        if result['failed']:
+            self.stdout.write(self.style.ERROR(f'{message}; {result["failed"]} falha(s)'))
+        else:
+            self.stdout.write(self.style.SUCCESS(message))
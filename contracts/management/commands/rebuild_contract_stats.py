@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from contracts.models import ContractStats
+from contracts.stats import DASHBOARD_STATS_TAGS
+from core.cache import invalidate_tags
+
+
+class Command(BaseCommand):
+    help = 'Recalcula a tabela de estatísticas de contratos (ContractStats)'
+
+    def handle(self, *args, **options):
+        ContractStats.rebuild()
+        invalidate_tags(*DASHBOARD_STATS_TAGS)
+        self.stdout.write(self.style.SUCCESS(
+            f'{ContractStats.objects.count()} agrupamento(s) de estatísticas recalculado(s)'
+        ))
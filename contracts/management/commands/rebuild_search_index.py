@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from contracts.search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = 'Recria o índice de busca textual de contratos'
+
+    def handle(self, *args, **options):
+        backend = get_search_backend()
+        if not backend.ranked:
+            self.stdout.write(self.style.WARNING(
+                'Índice de busca indisponível neste banco; a busca usa icontains'
+            ))
+            return
+        backend.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Índice de busca ({backend.name}) recriado'))
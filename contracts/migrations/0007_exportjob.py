@@ -0,0 +1,40 @@
+# Generated by Django 4.2.7 on 2026-10-18 15:34
+
+import contracts.models
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('contracts', '0006_contract_company_cnpj'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('export_format', models.CharField(choices=[('csv', 'CSV'), ('excel', 'Excel'), ('pdf', 'PDF')], default='excel', max_length=10, verbose_name='formato')),
+                ('filters', models.JSONField(blank=True, default=dict, verbose_name='filtros')),
+                ('filters_hash', models.CharField(db_index=True, max_length=64, verbose_name='hash dos filtros')),
+                ('status', models.CharField(choices=[('pending', 'Na fila'), ('running', 'Processando'), ('done', 'Concluído'), ('failed', 'Falhou')], default='pending', max_length=10, verbose_name='situação')),
+                ('file', models.FileField(blank=True, null=True, upload_to=contracts.models.export_job_file_path, verbose_name='arquivo')),
+                ('row_count', models.PositiveIntegerField(default=0, verbose_name='linhas exportadas')),
+                ('error', models.TextField(blank=True, verbose_name='erro')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='criado em')),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='iniciado em')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='concluído em')),
+                ('requested_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='export_jobs', to=settings.AUTH_USER_MODEL, verbose_name='solicitado por')),
+            ],
+            options={
+                'verbose_name': 'exportação de contratos',
+                'verbose_name_plural': 'exportações de contratos',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'created_at'], name='contracts_e_status_43d78d_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 4.2.7 on 2026-10-18 15:36
+
+from django.db import migrations, models
+from django.db.models.functions import ExtractYear
+import django.db.models.deletion
+
+
+def populate_contract_stats(apps, schema_editor):
+    Contract = apps.get_model('contracts', 'Contract')
+    ContractStats = apps.get_model('contracts', 'ContractStats')
+
+    rows = Contract.objects.order_by().values(
+        'status_id', 'contract_term', 'is_active',
+        start_year=ExtractYear('start_date')
+    ).annotate(
+        contract_count=models.Count('id'),
+        total_value=models.Sum('value')
+    )
+    ContractStats.objects.bulk_create(
+        [
+            ContractStats(
+                status_id=row['status_id'],
+                contract_term=row['contract_term'],
+                start_year=row['start_year'],
+                is_active=row['is_active'],
+                contract_count=row['contract_count'],
+                total_value=row['total_value'] or 0,
+            )
+            for row in rows
+        ],
+        batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contracts', '0007_exportjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContractStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('contract_term', models.CharField(choices=[('initial', 'Contrato Inicial'), ('term_1', '1º Termo Aditivo'), ('term_2', '2º Termo Aditivo'), ('term_3', '3º Termo Aditivo'), ('term_4', '4º Termo Aditivo'), ('term_5', '5º Termo Aditivo')], max_length=10, verbose_name='termo do contrato')),
+                ('start_year', models.PositiveIntegerField(null=True, verbose_name='ano de início')),
+                ('is_active', models.BooleanField(verbose_name='ativo')),
+                ('contract_count', models.IntegerField(default=0, verbose_name='quantidade de contratos')),
+                ('total_value', models.DecimalField(decimal_places=2, default=0, max_digits=16, verbose_name='valor total')),
+                ('status', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stats', to='contracts.contractstatus', verbose_name='status')),
+            ],
+            options={
+                'verbose_name': 'estatística de contratos',
+                'verbose_name_plural': 'estatísticas de contratos',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='contractstats',
+            constraint=models.UniqueConstraint(fields=('status', 'contract_term', 'start_year', 'is_active'), name='unique_contract_stats_bucket'),
+        ),
+        migrations.RunPython(populate_contract_stats, migrations.RunPython.noop),
+    ]
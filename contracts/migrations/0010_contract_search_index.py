@@ -0,0 +1,73 @@
+# Generated by Django 4.2.7 on 2026-10-18 16:10
+
+import unicodedata
+
+from django.db import migrations, OperationalError
+
+
+SEARCH_FIELDS = ('contract_number', 'company', 'fiscal_name', 'notes')
+
+
+def normalize(value):
+    value = unicodedata.normalize('NFKD', str(value or ''))
+    return ''.join(char for char in value if not unicodedata.combining(char)).lower()
+
+
+def create_search_index(apps, schema_editor):
+    Contract = apps.get_model('contracts', 'Contract')
+    vendor = schema_editor.connection.vendor
+    contracts = Contract.objects.order_by().values_list('pk', *SEARCH_FIELDS)
+
+    with schema_editor.connection.cursor() as cursor:
+        if vendor == 'sqlite':
+            try:
+                cursor.execute(
+                    'CREATE VIRTUAL TABLE contracts_contract_fts USING fts5('
+                    'contract_number, company, fiscal_name, notes, '
+                    'tokenize = "unicode61 remove_diacritics 2")'
+                )
+            except OperationalError:
+                # SQLite sem FTS5: a busca continua com icontains
+                return
+            cursor.executemany(
+                'INSERT INTO contracts_contract_fts '
+                '(rowid, contract_number, company, fiscal_name, notes) '
+                'VALUES (%s, %s, %s, %s, %s)',
+                [[row[0]] + [normalize(value) for value in row[1:]] for row in contracts]
+            )
+        elif vendor == 'postgresql':
+            cursor.execute(
+                'CREATE TABLE contracts_contract_search ('
+                'contract_id bigint PRIMARY KEY REFERENCES contracts_contract (id) '
+                'ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED, '
+                'document tsvector NOT NULL)'
+            )
+            cursor.execute(
+                'CREATE INDEX contracts_contract_search_gin '
+                'ON contracts_contract_search USING gin (document)'
+            )
+            cursor.executemany(
+                "INSERT INTO contracts_contract_search (contract_id, document) "
+                "VALUES (%s, to_tsvector('simple', %s))",
+                [[row[0], ' '.join(normalize(value) for value in row[1:])] for row in contracts]
+            )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    with schema_editor.connection.cursor() as cursor:
+        if vendor == 'sqlite':
+            cursor.execute('DROP TABLE IF EXISTS contracts_contract_fts')
+        elif vendor == 'postgresql':
+            cursor.execute('DROP TABLE IF EXISTS contracts_contract_search')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contracts', '0009_contract_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 4.2.7 on 2026-10-18 15:45
+
+import re
+
+from django.db import migrations, models
+
+
+def populate_lookup_keys(apps, schema_editor):
+    Contract = apps.get_model('contracts', 'Contract')
+    number_re = re.compile(r'^CTR-(\d{4})-(\d+)$')
+
+    batch = []
+    queryset = Contract.objects.order_by().only('pk', 'contract_number', 'company_cnpj')
+    for contract in queryset.iterator(chunk_size=2000):
+        contract.company_cnpj_digits = re.sub(r'\D', '', contract.company_cnpj or '')
+        match = number_re.match((contract.contract_number or '').strip().upper())
+        if match:
+            contract.number_year = int(match.group(1))
+            contract.number_sequence = int(match.group(2))
+        batch.append(contract)
+        if len(batch) >= 2000:
+            Contract.objects.bulk_update(
+                batch, ['company_cnpj_digits', 'number_year', 'number_sequence']
+            )
+            batch = []
+    Contract.objects.bulk_update(batch, ['company_cnpj_digits', 'number_year', 'number_sequence'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contracts', '0010_contract_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contract',
+            name='company_cnpj_digits',
+            field=models.CharField(blank=True, editable=False, max_length=14, verbose_name='CNPJ (somente dígitos)'),
+        ),
+        migrations.AddField(
+            model_name='contract',
+            name='number_sequence',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='sequência do número'),
+        ),
+        migrations.AddField(
+            model_name='contract',
+            name='number_year',
+            field=models.PositiveSmallIntegerField(blank=True, editable=False, null=True, verbose_name='ano do número'),
+        ),
+        migrations.RunPython(populate_lookup_keys, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='contract',
+            index=models.Index(fields=['company_cnpj_digits'], name='contract_cnpj_digits_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contract',
+            index=models.Index(fields=['number_year', 'number_sequence'], name='contract_number_key_idx'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 4.2.7 on 2026-10-18 15:50
+
+from django.db import migrations, models
+
+
+def populate_number_sequences(apps, schema_editor):
+    Contract = apps.get_model('contracts', 'Contract')
+    ContractNumberSequence = apps.get_model('contracts', 'ContractNumberSequence')
+
+    rows = Contract.objects.filter(number_year__isnull=False).order_by().values(
+        'number_year'
+    ).annotate(last_value=models.Max('number_sequence'))
+    ContractNumberSequence.objects.bulk_create([
+        ContractNumberSequence(year=row['number_year'], last_value=row['last_value'])
+        for row in rows
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contracts', '0011_contract_lookup_keys'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContractNumberSequence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.PositiveSmallIntegerField(unique=True, verbose_name='ano')),
+                ('last_value', models.PositiveIntegerField(default=0, verbose_name='último número')),
+            ],
+            options={
+                'verbose_name': 'sequência de números de contrato',
+                'verbose_name_plural': 'sequências de números de contrato',
+                'ordering': ['-year'],
+            },
+        ),
+        migrations.RunPython(populate_number_sequences, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-18 16:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contracts', '0012_contractnumbersequence'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='contracthistory',
+            index=models.Index(fields=['change_date'], name='history_change_date_idx'),
+        ),
+    ]
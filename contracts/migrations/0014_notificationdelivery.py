@@ -0,0 +1,47 @@
+# Generated by Django 4.2.7 on 2026-10-18 16:11
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('contracts', '0013_contracthistory_change_date_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationDelivery',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('expiration', 'Vencimento de contrato'), ('reminder', 'Lembrete')], max_length=20, verbose_name='tipo')),
+                ('object_id', models.PositiveIntegerField(verbose_name='objeto')),
+                ('reference_date', models.DateField(verbose_name='data de referência')),
+                ('threshold', models.PositiveIntegerField(default=0, help_text='Dias antes do término que dispararam o aviso (0 para lembretes)', verbose_name='limite em dias')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='registrado em')),
+                ('sent_at', models.DateTimeField(blank=True, db_index=True, null=True, verbose_name='enviado em')),
+            ],
+            options={
+                'verbose_name': 'notificação enviada',
+                'verbose_name_plural': 'notificações enviadas',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='contractreminder',
+            index=models.Index(fields=['is_completed', 'due_date'], name='reminder_pending_due_idx'),
+        ),
+        migrations.AddField(
+            model_name='notificationdelivery',
+            name='recipient',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notification_deliveries', to=settings.AUTH_USER_MODEL, verbose_name='destinatário'),
+        ),
+        migrations.AddConstraint(
+            model_name='notificationdelivery',
+            constraint=models.UniqueConstraint(fields=('kind', 'object_id', 'reference_date', 'threshold', 'recipient'), name='unique_notification_delivery'),
+        ),
+    ]
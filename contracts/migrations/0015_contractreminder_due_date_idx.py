@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-18 16:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contracts', '0014_notificationdelivery'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='contractreminder',
+            index=models.Index(fields=['due_date'], name='reminder_due_date_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 16:18
+
+from django.db import migrations, models
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contracts', '0015_contractreminder_due_date_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='contract',
+            index=models.Index(django.db.models.functions.text.Lower('company'), name='contract_company_lower_idx'),
+        ),
+    ]
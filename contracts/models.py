@@ -1,10 +1,45 @@
-from django.db import models
+from django.db import models, transaction, IntegrityError
 from django.utils.translation import gettext_lazy as _
 from django.conf import settings
 from django.core.validators import MinValueValidator, FileExtensionValidator
 from django.utils import timezone
 from django.core.exceptions import ValidationError
+from django.db.models.functions import Lower
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
 import os
+import re
+
+
+# Número de contrato no formato CTR-YYYY-NNN
+CONTRACT_NUMBER_RE = re.compile(r'^CTR-(\d{4})-(\d+)$')
+
+
+def only_digits(value):
+    """Remove a pontuação de documentos como o CNPJ"""
+    return re.sub(r'\D', '', value or '')
+
+
+def format_contract_number(year, sequence):
+    """Monta o número CTR-YYYY-NNN (a sequência cresce além de 3 dígitos)"""
+    return f'CTR-{year}-{sequence:03d}'
+
+
+def _history_value(value):
+    """Converte um valor de campo para o JSON do histórico"""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return str(value)
+
+
+def parse_contract_number(number):
+    """Retorna o ano e a sequência de um número CTR-YYYY-NNN, ou (None, None)"""
+    match = CONTRACT_NUMBER_RE.match((number or '').strip().upper())
+    if not match:
+        return None, None
+    return int(match.group(1)), int(match.group(2))
 
 
 def contract_file_path(instance, filename):
@@ -47,6 +82,65 @@ class ContractType(models.Model):
         return self.name
 
 
+class ContractNumberSequence(models.Model):
+    """Último número de contrato emitido em cada ano"""
+    year = models.PositiveSmallIntegerField(_('ano'), unique=True)
+    last_value = models.PositiveIntegerField(_('último número'), default=0)
+    
+    class Meta:
+        verbose_name = _('sequência de números de contrato')
+        verbose_name_plural = _('sequências de números de contrato')
+        ordering = ['-year']
+    
+    def __str__(self):
+        return f"{self.year}: {self.last_value}"
+    
+    @classmethod
+    def allocate(cls, year, count=1, after=0):
+        """
+        Reserva ``count`` números consecutivos do ano e retorna o primeiro.
+        
+        O incremento é um UPDATE com F() feito antes de qualquer leitura: ele
+        bloqueia a linha do ano (ou o banco, no SQLite) até o fim da transação,
+        de modo que processos concorrentes nunca recebem o mesmo número. A
+        linha do ano é criada a partir do maior número já usado. Com ``after``,
+        o bloco começa depois desse número (números informados manualmente e
+        ainda não gravados, como os de uma importação).
+        """
+        with transaction.atomic():
+            if after:
+                cls.observe(year, after)
+            updated = cls.objects.filter(year=year).update(
+                last_value=models.F('last_value') + count
+            )
+            if not updated:
+                try:
+                    with transaction.atomic():
+                        highest = max(cls.get_highest_used(year), after)
+                        cls.objects.create(year=year, last_value=highest + count)
+                except IntegrityError:
+                    # Outro processo criou a linha do ano ao mesmo tempo
+                    if after:
+                        cls.observe(year, after)
+                    cls.objects.filter(year=year).update(
+                        last_value=models.F('last_value') + count
+                    )
+            last_value = cls.objects.filter(year=year).values_list('last_value', flat=True).get()
+        return last_value - count + 1
+    
+    @classmethod
+    def observe(cls, year, sequence):
+        """Avança a sequência quando um número é informado manualmente"""
+        cls.objects.filter(year=year, last_value__lt=sequence).update(last_value=sequence)
+    
+    @staticmethod
+    def get_highest_used(year):
+        highest = Contract.objects.filter(number_year=year).aggregate(
+            highest=models.Max('number_sequence')
+        )['highest']
+        return highest or 0
+
+
 class Contract(models.Model):
     """Modelo principal para contratos"""
     # Informações básicas
@@ -61,38 +155,37 @@ class Contract(models.Model):
     @classmethod
     def get_next_contract_number(cls):
         """Gera o próximo número de contrato no formato CTR-YYYY-NNN"""
-        from django.db.models import Max
-        from django.utils import timezone
-        
-        current_year = timezone.now().year
-        
-        # Busca o maior número de sequência para o ano atual
-        last_contract = cls.objects.filter(
-            contract_number__startswith=f'CTR-{current_year}-'
-        ).order_by('-contract_number').first()
-        
-        if last_contract:
-            try:
-                # Extrai o número de sequência e incrementa
-                last_number = int(last_contract.contract_number.split('-')[-1])
-                next_number = last_number + 1
-            except (IndexError, ValueError):
-                next_number = 1
-        else:
-            next_number = 1
-            
-        return f'CTR-{current_year}-{next_number:03d}'
+        return cls.allocate_contract_numbers(1)[0]
+    
+    @classmethod
+    def allocate_contract_numbers(cls, count, year=None, after=0):
+        """Reserva um bloco de ``count`` números de contrato do ano, depois de ``after``"""
+        year = year or timezone.now().year
+        first = ContractNumberSequence.allocate(year, count, after)
+        return [format_contract_number(year, first + i) for i in range(count)]
     
     def save(self, *args, **kwargs):
-        # Gera o número do contrato se não existir
-        if not self.contract_number:
+        # Gera o número do contrato se não existir ou não estiver no formato correto
+        allocated = False
+        if not self.contract_number or not self.contract_number.startswith('CTR-'):
             self.contract_number = self.get_next_contract_number()
+            allocated = True
         
-        # Garante que o número do contrato está no formato correto
-        if not self.contract_number.startswith('CTR-'):
-            self.contract_number = self.get_next_contract_number()
+        # Chaves normalizadas usadas nas buscas por CNPJ e número
+        self.update_lookup_keys()
+        # A sequência só precisa acompanhar números novos informados à mão
+        number_changed = (
+            self._state.adding
+            or self.get_loaded_values().get('contract_number') != self.contract_number
+        )
+        if not allocated and number_changed and self.number_year is not None:
+            ContractNumberSequence.observe(self.number_year, self.number_sequence)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'contract_number', 'company_cnpj'} & set(update_fields):
+            kwargs['update_fields'] = set(update_fields) | set(self.LOOKUP_KEY_FIELDS)
             
         super().save(*args, **kwargs)
+        self.reset_loaded_values(kwargs.get('update_fields'))
     title = models.CharField(_('título'), max_length=200, null=True, blank=True, help_text=_('Título do contrato (obsoleto, usar campo empresa)'))
     company = models.CharField(_('empresa'), max_length=200, default='Empresa não informada')
     company_cnpj = models.CharField(
@@ -101,6 +194,18 @@ class Contract(models.Model):
         blank=True,
         help_text=_('CNPJ no formato 00.000.000/0000-00')
     )
+    company_cnpj_digits = models.CharField(
+        _('CNPJ (somente dígitos)'),
+        max_length=14,
+        blank=True,
+        editable=False
+    )
+    number_year = models.PositiveSmallIntegerField(
+        _('ano do número'), null=True, blank=True, editable=False
+    )
+    number_sequence = models.PositiveIntegerField(
+        _('sequência do número'), null=True, blank=True, editable=False
+    )
     fiscal_name = models.CharField(_('nome fiscal'), max_length=200, default='Fiscal não informado')
     fiscal_registration = models.CharField(_('matrícula do fiscal'), max_length=7, 
                                          help_text=_('Matrícula com 7 dígitos'), default='0000000')
@@ -210,6 +315,21 @@ class Contract(models.Model):
         verbose_name = _('contrato')
         verbose_name_plural = _('contratos')
         ordering = ['-created_at']
+        indexes = [
+            # Listagem padrão e filtros da ContractListView
+            models.Index(fields=['-created_at'], name='contract_created_idx'),
+            models.Index(fields=['status', '-created_at'], name='contract_status_created_idx'),
+            models.Index(fields=['responsible', '-created_at'], name='contract_resp_created_idx'),
+            models.Index(fields=['contract_term', '-created_at'], name='contract_term_created_idx'),
+            # Vencimentos (dashboards e relatório de vencimentos)
+            models.Index(fields=['is_active', 'end_date'], name='contract_active_end_idx'),
+            models.Index(fields=['end_date'], name='contract_end_date_idx'),
+            # Buscas por CNPJ e por número do contrato
+            models.Index(fields=['company_cnpj_digits'], name='contract_cnpj_digits_idx'),
+            models.Index(fields=['number_year', 'number_sequence'], name='contract_number_key_idx'),
+            # Autocompletar por prefixo da empresa
+            models.Index(Lower('company'), name='contract_company_lower_idx'),
+        ]
         permissions = [
             ('can_export_contracts', 'Pode exportar contratos'),
             ('can_import_contracts', 'Pode importar contratos'),
@@ -237,6 +357,79 @@ class Contract(models.Model):
             return None
         delta = self.end_date - timezone.now().date()
         return delta.days
+    
+    # Chaves normalizadas derivadas de contract_number e company_cnpj
+    LOOKUP_KEY_FIELDS = ('company_cnpj_digits', 'number_year', 'number_sequence')
+    
+    def update_lookup_keys(self):
+        """Atualiza o CNPJ sem pontuação e o ano/sequência do número"""
+        self.company_cnpj_digits = only_digits(self.company_cnpj)
+        self.number_year, self.number_sequence = parse_contract_number(self.contract_number)
+    
+    # Campos que definem o agrupamento do contrato em ContractStats
+    STATS_FIELDS = ('status_id', 'contract_term', 'start_date', 'is_active', 'value')
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Guarda o agrupamento carregado do banco para que as estatísticas
+        # possam ser ajustadas no save/delete sem uma nova consulta
+        if all(field in field_names for field in cls.STATS_FIELDS):
+            instance._loaded_stats = instance.get_stats_bucket()
+        # Valores carregados, comparados no save para o histórico de alterações
+        instance._loaded_values = (field_names, values)
+        return instance
+    
+    # Campos ignorados no histórico de alterações (automáticos ou derivados)
+    HISTORY_EXCLUDED_FIELDS = ('id', 'created_at', 'updated_at') + LOOKUP_KEY_FIELDS
+    
+    def get_loaded_values(self):
+        """Valores dos campos como estavam no banco (por attname)"""
+        field_names, values = getattr(self, '_loaded_values', ((), ()))
+        return dict(zip(field_names, values))
+    
+    def get_changed_fields(self):
+        """
+        Compara os campos com os valores carregados do banco, sem nova consulta.
+        
+        Retorna ``{campo: {'old': ..., 'new': ...}}`` com valores serializáveis
+        em JSON; chaves estrangeiras são representadas pelo id.
+        """
+        loaded = self.get_loaded_values()
+        changes = {}
+        for field in self._meta.concrete_fields:
+            if field.name in self.HISTORY_EXCLUDED_FIELDS or field.attname not in loaded:
+                continue
+            old = loaded[field.attname]
+            new = getattr(self, field.attname)
+            if isinstance(field, models.FileField):
+                old, new = str(old or ''), str(new or '')
+            if old != new:
+                changes[field.name] = {
+                    'old': _history_value(old),
+                    'new': _history_value(new),
+                }
+        return changes
+    
+    def reset_loaded_values(self, update_fields=None):
+        """Marca os valores atuais (ou só os de ``update_fields``) como gravados"""
+        loaded = self.get_loaded_values() if update_fields is not None else {}
+        for field in self._meta.concrete_fields:
+            if update_fields is not None and not {field.name, field.attname} & set(update_fields):
+                continue
+            if field.attname in self.__dict__:
+                loaded[field.attname] = getattr(self, field.attname)
+        self._loaded_values = (list(loaded), list(loaded.values()))
+    
+    def get_stats_bucket(self):
+        """Retorna o agrupamento (chave, valor) do contrato em ContractStats"""
+        bucket = {
+            'status_id': self.status_id,
+            'contract_term': self.contract_term,
+            'start_year': self.start_date.year if self.start_date else None,
+            'is_active': self.is_active,
+        }
+        return bucket, self.value or 0
 
 
 class ContractParty(models.Model):
@@ -301,6 +494,9 @@ class ContractHistory(models.Model):
         verbose_name = _('histórico de contrato')
         verbose_name_plural = _('histórico de contratos')
         ordering = ['-change_date']
+        indexes = [
+            models.Index(fields=['change_date'], name='history_change_date_idx'),
+        ]
     
     def __str__(self):
         return f"Alteração em {self.contract} por {self.changed_by} em {self.change_date}"
@@ -340,6 +536,10 @@ class ContractReminder(models.Model):
         verbose_name = _('lembrete de contrato')
         verbose_name_plural = _('lembretes de contrato')
         ordering = ['due_date']
+        indexes = [
+            models.Index(fields=['is_completed', 'due_date'], name='reminder_pending_due_idx'),
+            models.Index(fields=['due_date'], name='reminder_due_date_idx'),
+        ]
 
     def __str__(self):
         return f"{self.title} - {self.contract}"
@@ -357,6 +557,57 @@ def contract_attachment_path(instance, filename):
     return f'contracts/{instance.contract.id}/attachments/{int(timezone.now().timestamp())}_{filename}'
 
 
+class NotificationDelivery(models.Model):
+    """
+    Registro de uma notificação por email.
+
+    A chave (tipo, objeto, data de referência, limite, destinatário) é única:
+    o comando ``process_notifications`` grava (e confirma) o registro antes
+    de enviar o email e preenche ``sent_at`` depois do envio, então
+    reexecuções e execuções simultâneas não repetem mensagens. Registros sem
+    ``sent_at`` são envios interrompidos, que não são refeitos
+    automaticamente. A data de referência é a data de término do contrato ou
+    o vencimento do lembrete; se ela mudar, a notificação volta a ser devida.
+    """
+    EXPIRATION = 'expiration'
+    REMINDER = 'reminder'
+    KIND_CHOICES = [
+        (EXPIRATION, _('Vencimento de contrato')),
+        (REMINDER, _('Lembrete')),
+    ]
+
+    kind = models.CharField(_('tipo'), max_length=20, choices=KIND_CHOICES)
+    object_id = models.PositiveIntegerField(_('objeto'))
+    reference_date = models.DateField(_('data de referência'))
+    threshold = models.PositiveIntegerField(
+        _('limite em dias'),
+        default=0,
+        help_text=_('Dias antes do término que dispararam o aviso (0 para lembretes)')
+    )
+    recipient = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        verbose_name=_('destinatário'),
+        related_name='notification_deliveries'
+    )
+    created_at = models.DateTimeField(_('registrado em'), default=timezone.now)
+    sent_at = models.DateTimeField(_('enviado em'), null=True, blank=True, db_index=True)
+
+    class Meta:
+        verbose_name = _('notificação enviada')
+        verbose_name_plural = _('notificações enviadas')
+        ordering = ['-created_at']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['kind', 'object_id', 'reference_date', 'threshold', 'recipient'],
+                name='unique_notification_delivery'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} {self.object_id} ({self.threshold}) - {self.recipient_id}"
+
+
 class ContractAttachment(models.Model):
     """Modelo para anexos de contratos"""
     contract = models.ForeignKey(
@@ -418,3 +669,258 @@ class ContractAttachment(models.Model):
                 return f"{size:.2f} {unit}"
             size /= 1024.0
         return f"{size:.2f} TB"
+
+
+def export_job_file_path(instance, filename):
+    """Gera o caminho para armazenar os arquivos de exportação"""
+    return os.path.join('exports', timezone.now().strftime('%Y/%m'), filename)
+
+
+class ExportJob(models.Model):
+    """Modelo para exportações de contratos processadas em segundo plano"""
+    FORMAT_CHOICES = [
+        ('csv', 'CSV'),
+        ('excel', 'Excel'),
+        ('pdf', 'PDF'),
+    ]
+    FORMAT_EXTENSIONS = {
+        'csv': 'csv',
+        'excel': 'xlsx',
+        'pdf': 'pdf',
+    }
+
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (PENDING, _('Na fila')),
+        (RUNNING, _('Processando')),
+        (DONE, _('Concluído')),
+        (FAILED, _('Falhou')),
+    ]
+
+    export_format = models.CharField(_('formato'), max_length=10, choices=FORMAT_CHOICES, default='excel')
+    filters = models.JSONField(_('filtros'), default=dict, blank=True)
+    filters_hash = models.CharField(_('hash dos filtros'), max_length=64, db_index=True)
+    status = models.CharField(_('situação'), max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    file = models.FileField(_('arquivo'), upload_to=export_job_file_path, null=True, blank=True)
+    row_count = models.PositiveIntegerField(_('linhas exportadas'), default=0)
+    error = models.TextField(_('erro'), blank=True)
+    requested_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        verbose_name=_('solicitado por'),
+        related_name='export_jobs'
+    )
+    created_at = models.DateTimeField(_('criado em'), auto_now_add=True)
+    started_at = models.DateTimeField(_('iniciado em'), null=True, blank=True)
+    finished_at = models.DateTimeField(_('concluído em'), null=True, blank=True)
+
+    class Meta:
+        verbose_name = _('exportação de contratos')
+        verbose_name_plural = _('exportações de contratos')
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.get_export_format_display()} - {self.get_status_display()} ({self.created_at})"
+
+    @staticmethod
+    def compute_filters_hash(export_format, filters):
+        """Gera uma chave estável para o formato e o conjunto de filtros"""
+        import hashlib
+        import json
+
+        payload = json.dumps([export_format, filters], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    @classmethod
+    def enqueue(cls, export_format, filters, user=None):
+        """
+        Coloca uma exportação na fila.
+
+        Se uma exportação idêntica do mesmo usuário estiver na fila, em
+        processamento ou tiver sido concluída dentro da janela de
+        reaproveitamento, ela é retornada no lugar de uma nova. Retorna a
+        tupla (job, created).
+        """
+        filters_hash = cls.compute_filters_hash(export_format, filters)
+        window = getattr(settings, 'EXPORT_JOB_REUSE_WINDOW', 600)
+        since = timezone.now() - timezone.timedelta(seconds=window)
+
+        existing = cls.objects.filter(filters_hash=filters_hash, requested_by=user).filter(
+            models.Q(status__in=[cls.PENDING, cls.RUNNING]) |
+            models.Q(status=cls.DONE, finished_at__gte=since)
+        ).order_by('-created_at').first()
+        if existing:
+            return existing, False
+
+        job = cls.objects.create(
+            export_format=export_format,
+            filters=filters,
+            filters_hash=filters_hash,
+            requested_by=user
+        )
+        return job, True
+
+    def claim(self):
+        """
+        Marca a exportação como em processamento.
+
+        A atualização é condicional, então apenas um worker consegue assumir
+        cada exportação. Retorna False se outro worker chegou antes.
+        """
+        started_at = timezone.now()
+        claimed = type(self).objects.filter(pk=self.pk, status=self.PENDING).update(
+            status=self.RUNNING, started_at=started_at
+        )
+        if claimed:
+            self.status = self.RUNNING
+            self.started_at = started_at
+        return bool(claimed)
+
+    @classmethod
+    def visible_to(cls, user):
+        """Exportações que o usuário pode acompanhar e baixar (todas, para a equipe)"""
+        if user.is_staff:
+            return cls.objects.all()
+        return cls.objects.filter(requested_by=user)
+
+    @property
+    def is_finished(self):
+        return self.status in (self.DONE, self.FAILED)
+
+    def get_filename(self):
+        """Nome do arquivo entregue ao usuário"""
+        extension = self.FORMAT_EXTENSIONS.get(self.export_format, self.export_format)
+        return f'contratos_exportados_{self.pk}.{extension}'
+
+
+class ContractStats(models.Model):
+    """
+    Totais de contratos agrupados por status, termo, ano de início e situação.
+    
+    Mantido de forma incremental pelos sinais de ``Contract`` e recalculado
+    pelo comando ``rebuild_contract_stats``.
+    """
+    status = models.ForeignKey(
+        ContractStatus,
+        on_delete=models.CASCADE,
+        verbose_name=_('status'),
+        related_name='stats'
+    )
+    contract_term = models.CharField(_('termo do contrato'), max_length=10, choices=Contract.TERM_CHOICES)
+    start_year = models.PositiveIntegerField(_('ano de início'), null=True)
+    is_active = models.BooleanField(_('ativo'))
+    contract_count = models.IntegerField(_('quantidade de contratos'), default=0)
+    total_value = models.DecimalField(_('valor total'), max_digits=16, decimal_places=2, default=0)
+    
+    class Meta:
+        verbose_name = _('estatística de contratos')
+        verbose_name_plural = _('estatísticas de contratos')
+        constraints = [
+            models.UniqueConstraint(
+                fields=['status', 'contract_term', 'start_year', 'is_active'],
+                name='unique_contract_stats_bucket'
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.status_id} / {self.contract_term} / {self.start_year}: {self.contract_count}"
+    
+    @classmethod
+    def apply_delta(cls, bucket, count, value):
+        """Soma (ou subtrai) contratos e valor a um agrupamento de forma atômica"""
+        delta = {
+            'contract_count': models.F('contract_count') + count,
+            'total_value': models.F('total_value') + value,
+        }
+        if not cls.objects.filter(**bucket).update(**delta):
+            stats, _created = cls.objects.get_or_create(**bucket)
+            cls.objects.filter(pk=stats.pk).update(**delta)
+    
+    @classmethod
+    def rebuild(cls):
+        """Recalcula todos os totais a partir da tabela de contratos"""
+        from django.db import transaction
+        from django.db.models.functions import ExtractYear
+        
+        rows = Contract.objects.order_by().values(
+            'status_id', 'contract_term', 'is_active',
+            start_year=ExtractYear('start_date')
+        ).annotate(
+            contract_count=models.Count('id'),
+            total_value=models.Sum('value')
+        )
+        
+        with transaction.atomic():
+            cls.objects.all().delete()
+            cls.objects.bulk_create(
+                [
+                    cls(
+                        status_id=row['status_id'],
+                        contract_term=row['contract_term'],
+                        start_year=row['start_year'],
+                        is_active=row['is_active'],
+                        contract_count=row['contract_count'],
+                        total_value=row['total_value'] or 0,
+                    )
+                    for row in rows
+                ],
+                batch_size=500
+            )
+
+
+# Sinais
+@receiver(pre_save, sender=Contract)
+def load_contract_stats_bucket(sender, instance, raw=False, **kwargs):
+    """Carrega o agrupamento anterior de contratos que não vieram do banco"""
+    if raw or not instance.pk or hasattr(instance, '_loaded_stats'):
+        return
+    previous = sender.objects.filter(pk=instance.pk).only(
+        'status', 'contract_term', 'start_date', 'is_active', 'value'
+    ).first()
+    if previous:
+        instance._loaded_stats = previous.get_stats_bucket()
+
+
+@receiver(post_save, sender=Contract)
+def update_contract_stats_on_save(sender, instance, raw=False, **kwargs):
+    """Move o contrato entre os agrupamentos de ContractStats"""
+    if raw:
+        return
+    new_bucket, new_value = instance.get_stats_bucket()
+    old = getattr(instance, '_loaded_stats', None)
+    if old == (new_bucket, new_value):
+        return
+    if old:
+        ContractStats.apply_delta(old[0], -1, -old[1])
+    ContractStats.apply_delta(new_bucket, 1, new_value)
+    instance._loaded_stats = (new_bucket, new_value)
+
+
+@receiver(post_delete, sender=Contract)
+def update_contract_stats_on_delete(sender, instance, **kwargs):
+    """Remove o contrato do seu agrupamento em ContractStats"""
+    bucket, value = getattr(instance, '_loaded_stats', None) or instance.get_stats_bucket()
+    ContractStats.apply_delta(bucket, -1, -value)
+
+
+@receiver(post_save, sender=Contract)
+def update_contract_search_index(sender, instance, created=False, update_fields=None, **kwargs):
+    """Atualiza o contrato no índice de busca, se algum campo indexado pode ter mudado"""
+    from .search import SEARCH_FIELDS, get_search_backend
+    if update_fields is not None and not set(update_fields) & set(SEARCH_FIELDS):
+        return
+    get_search_backend().index_contracts([instance], replace=not created)
+
+
+@receiver(post_delete, sender=Contract)
+def remove_contract_search_index(sender, instance, **kwargs):
+    """Remove o contrato do índice de busca"""
+    from .search import get_search_backend
+    get_search_backend().remove_contracts([instance.pk])
@@ -0,0 +1,272 @@
+"""
+Notificações por email de lembretes e de vencimento de contratos.
+
+A cada execução (comando ``process_notifications``):
+
+1. contratos ativos com término nos próximos ``max(CONTRACT_EXPIRY_NOTICE_DAYS)``
+   dias e lembretes pendentes com vencimento na janela de
+   ``REMINDER_NOTICE_HOURS`` / ``REMINDER_OVERDUE_GRACE_DAYS`` são lidos com
+   uma consulta por intervalo cada (índices ``contract_active_end_idx`` e
+   ``reminder_pending_due_idx``);
+2. os avisos já registrados em ``NotificationDelivery`` são descartados;
+3. os avisos restantes são agrupados por destinatário em um único email
+   (resumo), enviados por uma só conexão SMTP; cada resumo é registrado
+   antes do envio e marcado como enviado depois (veja
+   ``process_notifications``).
+
+Cada contrato gera no máximo um aviso por limite: se a execução de um dia
+for perdida, o contrato recebe o aviso do menor limite já alcançado (ex.: 28
+dias restantes geram o aviso de 30 dias, não os de 90 e 60).
+"""
+import logging
+from collections import defaultdict, namedtuple
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.mail import EmailMessage, get_connection
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Contract, ContractReminder, NotificationDelivery
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_EXPIRY_NOTICE_DAYS = (90, 60, 30, 7)
+
+# Quantidade de chaves por consulta ao verificar avisos já enviados
+LOOKUP_CHUNK_SIZE = 500
+
+Notice = namedtuple('Notice', 'kind object_id reference_date threshold recipient_id text')
+
+
+def get_expiry_thresholds():
+    """Limites de aviso de vencimento, em dias, do menor para o maior"""
+    days = getattr(settings, 'CONTRACT_EXPIRY_NOTICE_DAYS', DEFAULT_EXPIRY_NOTICE_DAYS)
+    return sorted({int(day) for day in days if int(day) >= 0})
+
+
+def threshold_for(days_left, thresholds):
+    """Menor limite já alcançado pelo contrato, ou None"""
+    for threshold in thresholds:
+        if days_left <= threshold:
+            return threshold
+    return None
+
+
+def collect_expiration_notices(today=None):
+    """Avisos de contratos ativos que alcançaram um limite de vencimento"""
+    thresholds = get_expiry_thresholds()
+    if not thresholds:
+        return []
+    today = today or timezone.localdate()
+
+    contracts = Contract.objects.filter(
+        is_active=True,
+        end_date__gte=today,
+        end_date__lte=today + timezone.timedelta(days=thresholds[-1]),
+    ).order_by('end_date', 'pk').values_list(
+        'pk', 'contract_number', 'company', 'end_date', 'responsible_id', 'created_by_id'
+    )
+
+    notices = []
+    for pk, number, company, end_date, responsible_id, created_by_id in contracts.iterator():
+        recipient_id = responsible_id or created_by_id
+        if recipient_id is None:
+            continue
+        days_left = (end_date - today).days
+        threshold = threshold_for(days_left, thresholds)
+        text = (
+            f'{number} - {company}: vence em {end_date:%d/%m/%Y} '
+            f'({days_left} dia(s) restante(s))'
+        )
+        notices.append(Notice(
+            NotificationDelivery.EXPIRATION, pk, end_date, threshold, recipient_id, text
+        ))
+    return notices
+
+
+def collect_reminder_notices(now=None):
+    """
+    Avisos de lembretes pendentes que vencem nas próximas
+    ``REMINDER_NOTICE_HOURS`` horas ou venceram há até
+    ``REMINDER_OVERDUE_GRACE_DAYS`` dias.
+    """
+    now = now or timezone.now()
+    ahead = timezone.timedelta(hours=getattr(settings, 'REMINDER_NOTICE_HOURS', 24))
+    grace = timezone.timedelta(days=getattr(settings, 'REMINDER_OVERDUE_GRACE_DAYS', 7))
+
+    reminders = ContractReminder.objects.filter(
+        is_completed=False,
+        due_date__gte=now - grace,
+        due_date__lt=now + ahead,
+    ).order_by('due_date', 'pk').values_list(
+        'pk', 'title', 'due_date', 'assigned_to_id', 'created_by_id', 'contract__contract_number'
+    )
+
+    notices = []
+    for pk, title, due_date, assigned_to_id, created_by_id, number in reminders.iterator():
+        recipient_id = assigned_to_id or created_by_id
+        if recipient_id is None:
+            continue
+        due = timezone.localtime(due_date)
+        situation = 'vencido' if due_date < now else 'vence'
+        text = f'{title} ({number}): {situation} em {due:%d/%m/%Y %H:%M}'
+        notices.append(Notice(
+            NotificationDelivery.REMINDER, pk, due.date(), 0, recipient_id, text
+        ))
+    return notices
+
+
+def _delivery_key(kind, object_id, reference_date, threshold, recipient_id):
+    return (kind, object_id, reference_date, threshold, recipient_id)
+
+
+def exclude_delivered(notices):
+    """Remove os avisos que já constam em ``NotificationDelivery``"""
+    object_ids = defaultdict(set)
+    for notice in notices:
+        object_ids[notice.kind].add(notice.object_id)
+
+    delivered = set()
+    for kind, ids in object_ids.items():
+        ids = sorted(ids)
+        for start in range(0, len(ids), LOOKUP_CHUNK_SIZE):
+            delivered.update(
+                NotificationDelivery.objects.filter(
+                    kind=kind, object_id__in=ids[start:start + LOOKUP_CHUNK_SIZE]
+                ).order_by().values_list('kind', 'object_id', 'reference_date', 'threshold', 'recipient_id')
+            )
+
+    return [notice for notice in notices if _delivery_key(*notice[:5]) not in delivered]
+
+
+def get_recipients(user_ids):
+    """Usuários ativos, com email, que aceitam notificações por email"""
+    User = get_user_model()
+    users = User.objects.filter(
+        pk__in=user_ids, is_active=True
+    ).exclude(email='').exclude(profile__email_notifications=False).order_by()
+    return {user.pk: user for user in users.only('pk', 'email', 'first_name', 'last_name', 'username')}
+
+
+def build_digest(user, notices, from_email=None, connection=None):
+    """Monta o email de resumo com os avisos de um destinatário"""
+    expirations = [n for n in notices if n.kind == NotificationDelivery.EXPIRATION]
+    reminders = [n for n in notices if n.kind == NotificationDelivery.REMINDER]
+
+    lines = [f'Olá, {user.get_full_name() or user.username}.', '']
+    if expirations:
+        lines.append('Contratos próximos do vencimento:')
+        lines.extend(f'  - {notice.text}' for notice in expirations)
+        lines.append('')
+    if reminders:
+        lines.append('Lembretes:')
+        lines.extend(f'  - {notice.text}' for notice in reminders)
+        lines.append('')
+    lines.append('Para deixar de receber estes emails, desative as notificações no seu perfil.')
+
+    return EmailMessage(
+        subject=f'[Contratos] {len(notices)} aviso(s) de contratos e lembretes',
+        body='\n'.join(lines),
+        from_email=from_email or getattr(settings, 'DEFAULT_FROM_EMAIL', 'webmaster@localhost'),
+        to=[user.email],
+        connection=connection,
+    )
+
+
+def claim_deliveries(user_id, notices, now):
+    """
+    Grava os registros dos avisos de um destinatário, ainda sem ``sent_at``,
+    em uma transação própria. Retorna o queryset dos registros gravados, ou
+    None se outra execução já registrou algum dos avisos.
+    """
+    try:
+        with transaction.atomic():
+            NotificationDelivery.objects.bulk_create([
+                NotificationDelivery(
+                    kind=notice.kind,
+                    object_id=notice.object_id,
+                    reference_date=notice.reference_date,
+                    threshold=notice.threshold,
+                    recipient_id=user_id,
+                    created_at=now,
+                )
+                for notice in notices
+            ])
+    except IntegrityError:
+        return None
+
+    keys = Q()
+    for notice in notices:
+        keys |= Q(
+            kind=notice.kind,
+            object_id=notice.object_id,
+            reference_date=notice.reference_date,
+            threshold=notice.threshold,
+        )
+    return NotificationDelivery.objects.filter(keys, recipient_id=user_id)
+
+
+def process_notifications(today=None, now=None, dry_run=False, stdout=None):
+    """
+    Envia os resumos de avisos pendentes.
+
+    Para cada destinatário, os avisos são registrados e confirmados antes do
+    envio (a restrição única impede que outra execução envie os mesmos
+    avisos) e marcados como enviados depois dele. Se o envio falhar, os
+    registros são removidos e os avisos voltam na próxima execução. Se o
+    processo for interrompido entre o envio e a marcação, os registros ficam
+    sem ``sent_at`` e o aviso não é repetido: a entrega é no máximo uma vez.
+
+    Retorna um dicionário com as quantidades de resumos enviados, avisos
+    incluídos, destinatários ignorados e falhas.
+    """
+    now = now or timezone.now()
+    today = today or timezone.localdate(now)
+    result = {'digests': 0, 'notices': 0, 'skipped': 0, 'failed': 0}
+
+    notices = exclude_delivered(collect_expiration_notices(today) + collect_reminder_notices(now))
+    if not notices:
+        return result
+
+    by_recipient = defaultdict(list)
+    for notice in notices:
+        by_recipient[notice.recipient_id].append(notice)
+    recipients = get_recipients(list(by_recipient))
+    result['skipped'] = len(by_recipient) - len(recipients)
+
+    if dry_run:
+        for user_id, user in recipients.items():
+            message = build_digest(user, by_recipient[user_id])
+            if stdout:
+                stdout.write(f'Para: {user.email}\nAssunto: {message.subject}\n\n{message.body}\n')
+            result['digests'] += 1
+            result['notices'] += len(by_recipient[user_id])
+        return result
+
+    connection = get_connection(fail_silently=False)
+    connection.open()
+    try:
+        for user_id, user in recipients.items():
+            user_notices = by_recipient[user_id]
+            deliveries = claim_deliveries(user_id, user_notices, now)
+            if deliveries is None:
+                result['skipped'] += 1
+                continue
+
+            try:
+                connection.send_messages([build_digest(user, user_notices, connection=connection)])
+            except Exception:
+                logger.exception('Falha ao enviar notificações para o usuário %s', user_id)
+                deliveries.delete()
+                result['failed'] += 1
+                continue
+
+            deliveries.update(sent_at=timezone.now())
+            result['digests'] += 1
+            result['notices'] += len(user_notices)
+    finally:
+        connection.close()
+    return result
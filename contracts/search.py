@@ -0,0 +1,268 @@
+"""
+Busca textual de contratos.
+
+A busca usa um índice de texto completo mantido pelos sinais de ``Contract``:
+uma tabela virtual FTS5 no SQLite ou uma tabela com ``tsvector`` e índice GIN
+no PostgreSQL. Os textos e os termos pesquisados são normalizados (minúsculas
+e sem acentos), então "joao" encontra "João", e cada termo casa por prefixo.
+Quando o índice não está disponível, a busca volta ao ``icontains``.
+
+O backend pode ser fixado com ``CONTRACT_SEARCH_BACKEND`` (``'sqlite'``,
+``'postgresql'`` ou ``'like'``); por padrão ele é escolhido pelo banco em uso.
+
+Buscas que parecem um CNPJ ou um número de contrato (``CTR-2024-015``,
+``2024-015``) não passam pelo índice textual: elas usam as chaves
+normalizadas indexadas de ``Contract`` (veja ``contract_lookup_filter``).
+"""
+import re
+import unicodedata
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+
+from .models import only_digits
+
+
+# Campos de Contract incluídos no índice de busca
+SEARCH_FIELDS = ('contract_number', 'company', 'fiscal_name', 'notes')
+
+# Limite de termos por busca
+MAX_SEARCH_TERMS = 8
+
+SQLITE_FTS_TABLE = 'contracts_contract_fts'
+POSTGRES_SEARCH_TABLE = 'contracts_contract_search'
+
+
+def normalize_search_text(value):
+    """Converte o texto para minúsculas e remove os acentos"""
+    value = unicodedata.normalize('NFKD', str(value or ''))
+    value = ''.join(char for char in value if not unicodedata.combining(char))
+    return value.lower()
+
+
+def search_terms(query):
+    """Quebra a busca em termos alfanuméricos normalizados"""
+    return re.findall(r'[^\W_]+', normalize_search_text(query))[:MAX_SEARCH_TERMS]
+
+
+# Número de contrato completo ou parcial: CTR-2024-015, 2024-015, 2024/15, CTR-2024
+CONTRACT_NUMBER_SEARCH_RE = re.compile(r'^(?:CTR-?)?(\d{4})(?:[-/](\d*))?$', re.IGNORECASE)
+
+# CNPJ completo ou parcial, com ou sem pontuação
+CNPJ_SEARCH_RE = re.compile(r'^[\d./\-\s]+$')
+CNPJ_MIN_DIGITS = 8
+
+
+def contract_lookup_filter(query):
+    """
+    Retorna um filtro sobre as chaves indexadas de ``Contract`` quando a busca
+    é um número de contrato ou um CNPJ, ou ``None`` para a busca textual.
+
+    Números com sequência são buscados exatamente (``2024-15`` encontra
+    ``CTR-2024-015``); ``CTR-2024`` e ``2024-`` trazem os contratos do ano.
+    CNPJs com pelo menos 8 dígitos são buscados por prefixo.
+    """
+    query = (query or '').strip()
+
+    match = CONTRACT_NUMBER_SEARCH_RE.match(query)
+    if match and (query[:1].isalpha() or match.group(2) is not None):
+        year, sequence = match.groups()
+        if sequence:
+            return Q(number_year=int(year), number_sequence=int(sequence))
+        return Q(number_year=int(year))
+
+    if CNPJ_SEARCH_RE.match(query):
+        digits = only_digits(query)
+        if len(digits) == 14:
+            return Q(company_cnpj_digits=digits)
+        if len(digits) >= CNPJ_MIN_DIGITS:
+            # Intervalo em vez de startswith para que o índice seja usado
+            # também no SQLite (LIKE não usa índices de colunas case-sensitive)
+            return Q(company_cnpj_digits__gte=digits, company_cnpj_digits__lt=digits + ':')
+
+    return None
+
+
+def search_document(contract):
+    """Texto indexado de um contrato, campo a campo"""
+    return [normalize_search_text(getattr(contract, field, '')) for field in SEARCH_FIELDS]
+
+
+class LikeSearchBackend:
+    """Busca sem índice, com ``icontains`` em cada campo (comportamento antigo)"""
+    name = 'like'
+    ranked = False
+
+    def is_available(self):
+        return True
+
+    def search(self, queryset, query):
+        """Filtra o queryset pela busca, usando as chaves indexadas quando possível"""
+        lookup = contract_lookup_filter(query)
+        if lookup is not None:
+            return queryset.filter(lookup)
+        return self.search_text(queryset, query)
+
+    def search_text(self, queryset, query):
+        terms = query.split()
+        if not terms:
+            return queryset
+        condition = Q()
+        for term in terms:
+            term_condition = Q()
+            for field in SEARCH_FIELDS:
+                term_condition |= Q(**{f'{field}__icontains': term})
+            condition &= term_condition
+        return queryset.filter(condition)
+
+    def index_contracts(self, contracts, replace=True):
+        pass
+
+    def remove_contracts(self, contract_ids):
+        pass
+
+    def rebuild(self):
+        pass
+
+
+class SQLiteFTSSearchBackend(LikeSearchBackend):
+    """Busca com a tabela virtual FTS5 do SQLite, ordenada por bm25"""
+    name = 'sqlite'
+    ranked = True
+    table = SQLITE_FTS_TABLE
+
+    def __init__(self):
+        self._available = None
+
+    def is_available(self):
+        # Só o resultado positivo fica guardado: se a tabela for criada
+        # depois (migrate), o índice passa a ser usado sem reiniciar o processo
+        if not self._available:
+            self._available = self.table in connection.introspection.table_names()
+        return self._available
+
+    def match_expression(self, query):
+        return ' AND '.join(f'"{term}"*' for term in search_terms(query))
+
+    def search_text(self, queryset, query):
+        expression = self.match_expression(query)
+        if not expression:
+            return queryset
+        return queryset.extra(
+            tables=[self.table],
+            where=[
+                f'{self.table}.rowid = contracts_contract.id',
+                f'{self.table} MATCH %s',
+            ],
+            params=[expression],
+            select={'search_rank': f'-{self.table}.rank'},
+        ).order_by('-search_rank')
+
+    def index_contracts(self, contracts, replace=True):
+        """Indexa os contratos; ``replace=False`` para contratos recém-criados"""
+        rows = [[contract.pk] + search_document(contract) for contract in contracts]
+        if not rows:
+            return
+        columns = ', '.join(SEARCH_FIELDS)
+        placeholders = ', '.join(['%s'] * (len(SEARCH_FIELDS) + 1))
+        with connection.cursor() as cursor:
+            if replace:
+                cursor.executemany(
+                    f'DELETE FROM {self.table} WHERE rowid = %s', [[row[0]] for row in rows]
+                )
+            cursor.executemany(
+                f'INSERT INTO {self.table} (rowid, {columns}) VALUES ({placeholders})', rows
+            )
+
+    def remove_contracts(self, contract_ids):
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'DELETE FROM {self.table} WHERE rowid = %s', [[pk] for pk in contract_ids]
+            )
+
+    def rebuild(self):
+        from .models import Contract
+
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table}')
+        queryset = Contract.objects.only('pk', *SEARCH_FIELDS).order_by()
+        batch = []
+        for contract in queryset.iterator(chunk_size=2000):
+            batch.append(contract)
+            if len(batch) >= 2000:
+                self.index_contracts(batch, replace=False)
+                batch = []
+        self.index_contracts(batch, replace=False)
+
+
+class PostgresSearchBackend(SQLiteFTSSearchBackend):
+    """Busca com ``tsvector`` e índice GIN do PostgreSQL, ordenada por ts_rank"""
+    name = 'postgresql'
+    table = POSTGRES_SEARCH_TABLE
+
+    def match_expression(self, query):
+        return ' & '.join(f'{term}:*' for term in search_terms(query))
+
+    def search_text(self, queryset, query):
+        expression = self.match_expression(query)
+        if not expression:
+            return queryset
+        return queryset.extra(
+            tables=[self.table],
+            where=[
+                f'{self.table}.contract_id = contracts_contract.id',
+                f"{self.table}.document @@ to_tsquery('simple', %s)",
+            ],
+            params=[expression],
+            select={
+                'search_rank': f"ts_rank({self.table}.document, to_tsquery('simple', %s))"
+            },
+            select_params=[expression],
+        ).order_by('-search_rank')
+
+    def index_contracts(self, contracts, replace=True):
+        rows = [[contract.pk, ' '.join(search_document(contract))] for contract in contracts]
+        if not rows:
+            return
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f"INSERT INTO {self.table} (contract_id, document) "
+                f"VALUES (%s, to_tsvector('simple', %s)) "
+                f"ON CONFLICT (contract_id) DO UPDATE SET document = EXCLUDED.document",
+                rows
+            )
+
+    def remove_contracts(self, contract_ids):
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'DELETE FROM {self.table} WHERE contract_id = %s', [[pk] for pk in contract_ids]
+            )
+
+
+SEARCH_BACKENDS = {
+    'like': LikeSearchBackend,
+    'sqlite': SQLiteFTSSearchBackend,
+    'postgresql': PostgresSearchBackend,
+}
+
+_backends = {}
+
+
+def get_search_backend(name=None):
+    """
+    Retorna o backend de busca configurado.
+
+    Sem configuração, usa o índice do banco em uso e recorre à busca com
+    ``icontains`` enquanto a tabela do índice não existir.
+    """
+    name = name or getattr(settings, 'CONTRACT_SEARCH_BACKEND', None) or connection.vendor
+    if name not in SEARCH_BACKENDS:
+        name = 'like'
+    if name not in _backends:
+        _backends[name] = SEARCH_BACKENDS[name]()
+
+    backend = _backends[name]
+    if not backend.is_available():
+        return get_search_backend('like')
+    return backend
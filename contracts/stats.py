@@ -0,0 +1,116 @@
+"""
+Estatísticas agregadas de contratos usadas nos painéis.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Count, F, Q, Sum
+from django.utils import timezone
+
+from core.cache import get_or_set, shared_cache_is_process_local
+
+from .models import Contract, ContractStats
+
+
+# Etiquetas de core.cache que invalidam as estatísticas do dashboard
+DASHBOARD_STATS_TAGS = ['contract', 'contract_status']
+
+
+def dashboard_stats_cache_timeout():
+    """
+    Validade das estatísticas em cache.
+
+    A invalidação pelas etiquetas só alcança os demais processos com um cache
+    compartilhado (Redis, arquivos). Com o cache padrão (locmem, um por
+    processo), os outros workers só enxergam a mudança quando a entrada
+    expira, então a validade é limitada a ``DASHBOARD_STATS_LOCAL_CACHE_TIMEOUT``
+    segundos; com um cache compartilhado, vale ``DASHBOARD_STATS_CACHE_TIMEOUT``.
+    """
+    timeout = getattr(settings, 'DASHBOARD_STATS_CACHE_TIMEOUT', 3600)
+    if shared_cache_is_process_local():
+        timeout = min(timeout, getattr(settings, 'DASHBOARD_STATS_LOCAL_CACHE_TIMEOUT', 60))
+    return timeout
+
+
+def get_dashboard_stats():
+    """
+    Retorna as estatísticas de contratos exibidas no dashboard.
+    
+    Os indicadores são calculados em uma única consulta com agregação
+    condicional e guardados em cache por dia, já que "vencendo" e "vencidos"
+    dependem da data atual. O cache é invalidado pelas etiquetas ``contract``
+    e ``contract_status`` (veja ``core.cache`` e ``dashboard_stats_cache_timeout``).
+    """
+    today = timezone.localdate()
+    return get_or_set(
+        'contracts.dashboard_stats', today.isoformat(), lambda: compute_dashboard_stats(today),
+        tags=DASHBOARD_STATS_TAGS, timeout=dashboard_stats_cache_timeout(),
+    )
+
+
+def compute_dashboard_stats(today):
+    """Calcula as estatísticas do dashboard para o dia informado"""
+    active = Q(is_active=True)
+    stats = Contract.objects.aggregate(
+        total_contracts=Count('id'),
+        active_contracts=Count('id', filter=active),
+        expiring_soon_count=Count(
+            'id', filter=active & Q(end_date__range=(today, today + timedelta(days=30)))
+        ),
+        expired_contracts_count=Count('id', filter=active & Q(end_date__lt=today)),
+        total_contracts_value=Sum('value', filter=active),
+    )
+    stats['total_contracts_value'] = stats['total_contracts_value'] or 0
+    
+    stats['contracts_by_status'] = list(stats_by_status())
+    stats['upcoming_contracts'] = list(
+        Contract.objects.select_related('status').filter(
+            end_date__gte=today,
+            is_active=True
+        ).order_by('end_date')[:5]
+    )
+    return stats
+
+
+def stats_by_status():
+    """Quantidade e valor de contratos por status, lidos de ContractStats"""
+    return ContractStats.objects.values(
+        'status_id', 'status__name', 'status__color'
+    ).annotate(
+        total=Sum('contract_count'),
+        total_value=Sum('total_value')
+    ).filter(total__gt=0).order_by('-total')
+
+
+def stats_by_term():
+    """Quantidade e valor de contratos por termo, lidos de ContractStats"""
+    terms = dict(Contract.TERM_CHOICES)
+    rows = ContractStats.objects.values('contract_term').annotate(
+        contract_count=Sum('contract_count'),
+        total_value=Sum('total_value')
+    ).filter(contract_count__gt=0).order_by('-contract_count')
+    
+    return [
+        dict(row, name=terms.get(row['contract_term'], row['contract_term']))
+        for row in rows
+    ]
+
+
+def stats_by_year():
+    """Quantidade e valor de contratos por ano de início, lidos de ContractStats"""
+    return ContractStats.objects.exclude(start_year__isnull=True).values(
+        year=F('start_year')
+    ).annotate(
+        contract_count=Sum('contract_count'),
+        total_value=Sum('total_value')
+    ).filter(contract_count__gt=0).order_by('year')
+
+
+def stats_totals():
+    """Totais gerais de contratos, lidos de ContractStats"""
+    totals = ContractStats.objects.aggregate(
+        total_contracts=Sum('contract_count'),
+        active_contracts=Sum('contract_count', filter=Q(is_active=True)),
+        total_value=Sum('total_value'),
+    )
+    return {key: value or 0 for key, value in totals.items()}
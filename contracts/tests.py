@@ -1,3 +1,1215 @@
-from django.test import TestCase
+import csv
+import io
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import Permission
+from django.core import mail
+from django.core.cache import cache
+from django.core.exceptions import PermissionDenied
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.db.models import Q, QuerySet
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from core.cache import local_cache
+from core.models import User
+from core.utils import export_to_csv
+
+from . import catalog, search
+from .exports import CONTRACT_EXPORT_HEADERS, contract_csv_rows, contract_summary_rows
+from .forms import ContractFilterForm, ContractImportForm
+from .history import record_changes, record_history
+from .imports import import_contracts
+from .notifications import process_notifications
+from .search import LikeSearchBackend, SQLiteFTSSearchBackend, contract_lookup_filter, get_search_backend
+from .stats import dashboard_stats_cache_timeout, get_dashboard_stats, stats_by_status, stats_totals
+from .timeline import expiring_contracts
+from .views import ContractReminderCompleteView
+from .models import (
+    Contract, ContractStatus, ContractParty, ContractReminder, ContractAttachment,
+    ContractHistory, ContractNumberSequence, ContractStats, ContractType, ExportJob,
+    NotificationDelivery
+)
+
+
+class ContractSummaryExportTests(TestCase):
+    """Testes da exportação detalhada de contratos"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.status = ContractStatus.objects.create(name='Vigente')
+        cls.user = User.objects.create_user(
+            username='fiscal', email='fiscal@example.com',
+            first_name='Maria', last_name='Souza', password='senha-segura-123'
+        )
+
+    def create_contracts(self, count):
+        for i in range(count):
+            contract = Contract.objects.create(
+                company=f'Empresa {i}',
+                status=self.status,
+                start_date=date(2024, 1, 1),
+                end_date=date(2025, 1, 1) + timedelta(days=i),
+                value=1000,
+                contract_document='contrato.pdf',
+                fiscal_portaria='portaria.pdf',
+            )
+            ContractParty.objects.create(contract=contract, user=self.user)
+            ContractAttachment.objects.bulk_create([
+                ContractAttachment(contract=contract, file='anexo1.pdf', name='anexo1.pdf'),
+                ContractAttachment(contract=contract, file='anexo2.pdf', name='anexo2.pdf'),
+            ])
+            ContractReminder.objects.create(
+                contract=contract, title='Renovar', due_date=timezone.now()
+            )
+
+    def test_query_count_does_not_grow_with_contracts(self):
+        self.create_contracts(3)
+        with self.assertNumQueries(2):
+            rows = list(contract_summary_rows(Contract.objects.all()))
+        self.assertEqual(len(rows), 3)
+
+        self.create_contracts(7)
+        with self.assertNumQueries(2):
+            rows = list(contract_summary_rows(Contract.objects.all()))
+        self.assertEqual(len(rows), 10)
+
+    def test_counts_and_parties(self):
+        self.create_contracts(1)
+        row = next(contract_summary_rows(Contract.objects.all()))
+        self.assertEqual(row[8], 'Maria Souza')
+        self.assertEqual(row[9], 2)
+        self.assertEqual(row[10], 1)
+
+
+class ExportJobAccessTests(TestCase):
+    """Testes do acesso às exportações em segundo plano"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user(username='dono', email='dono@example.com', password='senha-segura-123')
+        cls.other = User.objects.create_user(username='outro', email='outro@example.com', password='senha-segura-123')
+        cls.staff = User.objects.create_user(username='equipe', email='equipe@example.com', password='senha-segura-123', is_staff=True)
+        cls.job, _ = ExportJob.enqueue('csv', {}, user=cls.owner)
+
+    def get_urls(self):
+        return [
+            reverse('contracts:export_job_detail', kwargs={'pk': self.job.pk}),
+            reverse('contracts:export_job_status', kwargs={'pk': self.job.pk}),
+        ]
+
+    def test_owner_and_staff_can_follow_the_export(self):
+        for user in (self.owner, self.staff):
+            self.client.force_login(user)
+            for url in self.get_urls():
+                self.assertEqual(self.client.get(url).status_code, 200)
+
+    # O projeto não tem os templates de errors/, então o 404 usa a página do Django
+    @override_settings(DEBUG=True)
+    def test_other_users_get_404(self):
+        ExportJob.objects.filter(pk=self.job.pk).update(status=ExportJob.DONE, file='exports/x.csv')
+        self.client.force_login(self.other)
+        urls = self.get_urls() + [reverse('contracts:export_job_download', kwargs={'pk': self.job.pk})]
+        for url in urls:
+            self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_identical_exports_are_reused_only_for_the_same_user(self):
+        job, created = ExportJob.enqueue('csv', {}, user=self.owner)
+        self.assertFalse(created)
+        self.assertEqual(job, self.job)
+
+        job, created = ExportJob.enqueue('csv', {}, user=self.other)
+        self.assertTrue(created)
+        self.assertEqual(job.requested_by, self.other)
+
+
+class ExportWorkerTests(TestCase):
+    """Testes do laço do comando process_export_jobs"""
+
+    command = 'contracts.management.commands.process_export_jobs'
+
+    def run_worker(self, iterations, **options):
+        """Executa o laço até a ``iterations``-ésima espera pela fila"""
+        sleeps = [None] * (iterations - 1) + [KeyboardInterrupt]
+        with mock.patch(f'{self.command}.time.sleep', side_effect=sleeps), \
+                mock.patch(f'{self.command}.close_old_connections') as close_old_connections, \
+                mock.patch(f'{self.command}.Command.purge_expired') as purge_expired:
+            call_command('process_export_jobs', stdout=io.StringIO(), **options)
+        return close_old_connections, purge_expired
+
+    def test_connections_are_recycled_on_every_iteration(self):
+        close_old_connections, _purge_expired = self.run_worker(3)
+        self.assertEqual(close_old_connections.call_count, 3)
+
+    @override_settings(EXPORT_JOB_PURGE_INTERVAL=600)
+    def test_purge_runs_on_its_own_cadence(self):
+        _close_old_connections, purge_expired = self.run_worker(3)
+        purge_expired.assert_called_once()
+
+    @override_settings(EXPORT_JOB_PURGE_INTERVAL=0)
+    def test_purge_without_interval_runs_on_every_poll(self):
+        _close_old_connections, purge_expired = self.run_worker(3)
+        self.assertEqual(purge_expired.call_count, 3)
+
+    def test_once_purges_after_draining_the_queue(self):
+        with mock.patch(f'{self.command}.close_old_connections'), \
+                mock.patch(f'{self.command}.Command.purge_expired') as purge_expired:
+            call_command('process_export_jobs', once=True, stdout=io.StringIO())
+        purge_expired.assert_called_once_with(7)
+
+
+class DashboardStatsCacheTests(TestCase):
+    """Testes das estatísticas do dashboard em cache"""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_stats_are_cached_until_a_contract_changes(self):
+        status = ContractStatus.objects.create(name='Vigente')
+        self.assertEqual(get_dashboard_stats()['total_contracts'], 0)
+        with self.assertNumQueries(0):
+            get_dashboard_stats()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Contract.objects.create(
+                status=status, start_date=date(2024, 1, 1), end_date=date(2099, 1, 1),
+                value=1000, fiscal_portaria='portaria.pdf',
+            )
+        stats = get_dashboard_stats()
+        self.assertEqual(stats['total_contracts'], 1)
+        self.assertEqual(stats['contracts_by_status'][0]['status__name'], 'Vigente')
+
+    @override_settings(DASHBOARD_STATS_CACHE_TIMEOUT=3600, DASHBOARD_STATS_LOCAL_CACHE_TIMEOUT=60)
+    def test_process_local_cache_uses_short_timeout(self):
+        self.assertEqual(dashboard_stats_cache_timeout(), 60)
+
+    @override_settings(DASHBOARD_STATS_CACHE_TIMEOUT=30, DASHBOARD_STATS_LOCAL_CACHE_TIMEOUT=60)
+    def test_shorter_configured_timeout_wins(self):
+        self.assertEqual(dashboard_stats_cache_timeout(), 30)
+
+
+class ContractNumberSequenceTests(TestCase):
+    """Testes da numeração sequencial de contratos"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.status = ContractStatus.objects.create(name='Vigente')
+
+    def create_contract(self, **kwargs):
+        data = dict(
+            status=self.status,
+            start_date=date(2024, 1, 1),
+            end_date=date(2025, 1, 1),
+            value=1000,
+            fiscal_portaria='portaria.pdf',
+        )
+        data.update(kwargs)
+        return Contract.objects.create(**data)
+
+    def test_new_contracts_get_consecutive_numbers(self):
+        year = timezone.now().year
+        numbers = [self.create_contract().contract_number for _ in range(3)]
+        self.assertEqual(numbers, [f'CTR-{year}-{i:03d}' for i in (1, 2, 3)])
+
+    def test_allocate_block(self):
+        self.assertEqual(
+            Contract.allocate_contract_numbers(3, year=2030),
+            ['CTR-2030-001', 'CTR-2030-002', 'CTR-2030-003'],
+        )
+        self.assertEqual(Contract.allocate_contract_numbers(1, year=2030), ['CTR-2030-004'])
+
+    def test_year_row_starts_after_highest_number_in_use(self):
+        self.create_contract(contract_number='CTR-2031-041')
+        ContractNumberSequence.objects.filter(year=2031).delete()
+        self.assertEqual(ContractNumberSequence.allocate(2031), 42)
+
+    def test_year_row_created_concurrently(self):
+        # Outro processo cria a linha do ano logo depois do primeiro UPDATE
+        update = QuerySet.update
+        calls = []
+
+        def update_then_create_row(queryset, **kwargs):
+            updated = update(queryset, **kwargs)
+            if not calls:
+                calls.append(updated)
+                ContractNumberSequence.objects.create(year=2032, last_value=5)
+            return updated
+
+        with mock.patch.object(QuerySet, 'update', update_then_create_row):
+            first = ContractNumberSequence.allocate(2032, count=2)
+        self.assertEqual(calls, [0])
+        self.assertEqual(first, 6)
+        self.assertEqual(ContractNumberSequence.objects.get(year=2032).last_value, 7)
+
+    def test_manual_number_advances_sequence(self):
+        Contract.allocate_contract_numbers(1, year=2033)
+        self.create_contract(contract_number='CTR-2033-010')
+        self.assertEqual(Contract.allocate_contract_numbers(1, year=2033), ['CTR-2033-011'])
+
+    def test_edit_without_number_change_does_not_touch_sequence(self):
+        contract = self.create_contract()
+        contract = Contract.objects.get(pk=contract.pk)
+        contract.company = 'Outra empresa'
+        with CaptureQueriesContext(connection) as queries:
+            contract.save()
+        table = ContractNumberSequence._meta.db_table
+        self.assertFalse([q for q in queries.captured_queries if table in q['sql']])
+
+
+class ContractImportTests(TestCase):
+    """Testes da importação de contratos por CSV e XLSX"""
+
+    CSV = (
+        'Empresa;CNPJ;Termo;Status;Valor;Data Início;Data Término\n'
+        'João Ltda;12.345.678/0001-90;Contrato Inicial;Vigente;R$ 1.234,56;01/02/2024;01/02/2025\n'
+        'Sem data;;;;100;;\n'
+        'Outra;;term_2;Inexistente;5;01/01/2024;01/01/2025\n'
+    )
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.status = ContractStatus.objects.create(name='Vigente')
+        cls.default_status = ContractStatus.objects.create(name='Encerrado')
+        cls.user = User.objects.create_user(
+            username='importador', email='importador@example.com', password='senha-segura-123'
+        )
+
+    def import_csv(self, text, **kwargs):
+        kwargs.setdefault('user', self.user)
+        kwargs.setdefault('default_status', self.default_status)
+        return import_contracts(io.BytesIO(text.encode('utf-8')), 'contratos.csv', **kwargs)
+
+    def import_xlsx(self, rows, **kwargs):
+        from openpyxl import Workbook
+
+        workbook = Workbook()
+        for row in rows:
+            workbook.active.append(row)
+        buffer = io.BytesIO()
+        workbook.save(buffer)
+        buffer.seek(0)
+        kwargs.setdefault('default_status', self.default_status)
+        return import_contracts(buffer, 'contratos.xlsx', **kwargs)
+
+    def test_csv_import(self):
+        result = self.import_csv(self.CSV, batch_size=2)
+        self.assertEqual((result.total, result.created), (3, 1))
+        self.assertEqual([line for line, _ in result.errors], [3, 4])
+
+        contract = Contract.objects.get()
+        self.assertTrue(contract.contract_number.startswith('CTR-'))
+        self.assertEqual(contract.company_cnpj_digits, '12345678000190')
+        self.assertEqual(str(contract.value), '1234.56')
+        self.assertEqual(contract.status, self.status)
+        self.assertEqual(contract.start_date, date(2024, 2, 1))
+        self.assertEqual(contract.created_by, self.user)
+        self.assertEqual(ContractHistory.objects.filter(contract=contract).count(), 1)
+
+        before = sorted(ContractStats.objects.values_list('status_id', 'contract_count', 'total_value'))
+        ContractStats.rebuild()
+        after = sorted(ContractStats.objects.values_list('status_id', 'contract_count', 'total_value'))
+        self.assertEqual(before, after)
+
+    def test_dry_run_saves_nothing(self):
+        result = self.import_csv(self.CSV, dry_run=True)
+        self.assertEqual(result.error_count, 2)
+        self.assertFalse(Contract.objects.exists())
+
+    def test_xlsx_import(self):
+        result = self.import_xlsx([
+            ['Número', 'Empresa', 'CNPJ', 'Valor', 'Data Início', 'Data Término', 'Matrícula do Fiscal'],
+            ['CTR-2020-050', 'A', 1234567000190, 10.5, date(2024, 1, 1), date(2025, 1, 1), 123],
+            [None, 'B', None, 10, date(2024, 1, 1), date(2025, 1, 1), None],
+        ])
+        self.assertEqual(result.created, 2)
+        contract = Contract.objects.get(contract_number='CTR-2020-050')
+        self.assertEqual(contract.company_cnpj, '01.234.567/0001-90')
+        self.assertEqual(contract.fiscal_registration, '0000123')
+        self.assertEqual(Contract.allocate_contract_numbers(1, year=2020), ['CTR-2020-051'])
+
+    def test_duplicate_numbers_are_compared_by_year_and_sequence(self):
+        Contract.objects.create(
+            contract_number='CTR-2026-007', status=self.status, start_date=date(2024, 1, 1),
+            end_date=date(2025, 1, 1), value=1, fiscal_portaria='portaria.pdf',
+        )
+        result = self.import_csv(
+            'Número;Empresa;Valor;Data Início;Data Término\n'
+            'CTR-2026-7;Já existe;1;01/01/2024;01/01/2025\n'
+            'CTR-2026-8;Nova;1;01/01/2024;01/01/2025\n'
+            'CTR-2026-008;Repetida no arquivo;1;01/01/2024;01/01/2025\n'
+        )
+        self.assertEqual(result.created, 1)
+        self.assertEqual([line for line, _ in result.errors], [2, 4])
+        self.assertEqual(
+            sorted(Contract.objects.values_list('contract_number', flat=True)),
+            ['CTR-2026-007', 'CTR-2026-8'],
+        )
+
+    def test_blank_rows_are_numbered_after_manual_numbers(self):
+        year = timezone.now().year
+        Contract.allocate_contract_numbers(1, year)
+        result = self.import_csv(
+            'Número;Empresa;Valor;Data Início;Data Término\n'
+            f'CTR-{year}-003;Manual;1;01/01/2024;01/01/2025\n'
+            ';Sem número 1;1;01/01/2024;01/01/2025\n'
+            ';Sem número 2;1;01/01/2024;01/01/2025\n'
+            ';Sem número 3;1;01/01/2024;01/01/2025\n'
+        )
+
+        self.assertEqual(result.errors, [])
+        self.assertEqual(result.created, 4)
+        self.assertEqual(
+            sorted(Contract.objects.values_list('number_sequence', flat=True)), [3, 4, 5, 6]
+        )
+        self.assertEqual(Contract.get_next_contract_number(), f'CTR-{year}-007')
+
+    def test_blank_rows_skip_manual_numbers_for_a_new_year(self):
+        year = timezone.now().year
+        result = self.import_csv(
+            'Número;Empresa;Valor;Data Início;Data Término\n'
+            ';Sem número 1;1;01/01/2024;01/01/2025\n'
+            f'CTR-{year}-001;Manual;1;01/01/2024;01/01/2025\n'
+            ';Sem número 2;1;01/01/2024;01/01/2025\n'
+        )
+
+        self.assertEqual(result.errors, [])
+        self.assertEqual(
+            sorted(Contract.objects.values_list('number_sequence', flat=True)), [1, 2, 3]
+        )
+
+
+class ContractHistoryTests(TestCase):
+    """Testes do registro de alterações de contratos"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.status = ContractStatus.objects.create(name='Vigente')
+        cls.other_status = ContractStatus.objects.create(name='Encerrado')
+        cls.user = User.objects.create_user(
+            username='editor', email='editor@example.com', password='senha-segura-123'
+        )
+        cls.contract = Contract.objects.create(
+            company='Empresa', status=cls.status, start_date=date(2024, 1, 1),
+            end_date=date(2025, 1, 1), value=1000, fiscal_portaria='portaria.pdf',
+        )
+
+    def get_contract(self):
+        return Contract.objects.get(pk=self.contract.pk)
+
+    def test_loaded_contract_has_no_changes(self):
+        self.assertEqual(self.get_contract().get_changed_fields(), {})
+
+    def test_changed_fields_are_serializable(self):
+        contract = self.get_contract()
+        contract.status = self.other_status
+        contract.end_date = date(2026, 6, 30)
+        contract.fiscal_portaria = 'nova_portaria.pdf'
+        contract.company_cnpj = '12.345.678/0001-90'
+
+        self.assertEqual(contract.get_changed_fields(), {
+            'status': {'old': self.status.pk, 'new': self.other_status.pk},
+            'end_date': {'old': '2025-01-01', 'new': '2026-06-30'},
+            'fiscal_portaria': {'old': 'portaria.pdf', 'new': 'nova_portaria.pdf'},
+            'company_cnpj': {'old': '', 'new': '12.345.678/0001-90'},
+        })
+
+    def test_save_resets_loaded_values(self):
+        contract = self.get_contract()
+        contract.company = 'Outra'
+        contract.notes = 'observação'
+        contract.save(update_fields=['company'])
+        self.assertEqual(list(contract.get_changed_fields()), ['notes'])
+
+        contract.save()
+        self.assertEqual(contract.get_changed_fields(), {})
+
+    def test_entries_are_written_on_commit(self):
+        contract = self.get_contract()
+        contract.company = 'Outra'
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                entry = record_changes(contract, self.user)
+                contract.save()
+                record_history(contract, self.user, 'Anexo adicionado')
+                self.assertFalse(ContractHistory.objects.filter(contract=contract).exists())
+
+        history = ContractHistory.objects.filter(contract=contract).order_by('pk')
+        self.assertEqual(
+            list(history.values_list('change_description', flat=True)),
+            ['Dados do contrato atualizados', 'Anexo adicionado'],
+        )
+        self.assertEqual(entry.changed_fields, {'company': {'old': 'Empresa', 'new': 'Outra'}})
+        self.assertIsNone(record_changes(contract, self.user))
+
+    def test_entries_are_dropped_on_rollback(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    record_history(self.contract, self.user, 'Desfeito')
+                    raise ValueError
+            except ValueError:
+                pass
+        self.assertFalse(ContractHistory.objects.filter(change_description='Desfeito').exists())
+
+    def test_entries_of_a_rolled_back_savepoint_are_dropped(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                record_history(self.contract, self.user, 'Antes')
+                try:
+                    with transaction.atomic():
+                        record_history(self.contract, self.user, 'Desfeito')
+                        raise ValueError
+                except ValueError:
+                    pass
+                with transaction.atomic():
+                    record_history(self.contract, self.user, 'Savepoint confirmado')
+                record_history(self.contract, self.user, 'Depois')
+
+        self.assertEqual(
+            list(ContractHistory.objects.filter(contract=self.contract).order_by('pk').values_list(
+                'change_description', flat=True
+            )),
+            ['Antes', 'Depois', 'Savepoint confirmado'],
+        )
+
+    def test_entries_of_one_transaction_are_written_together(self):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with transaction.atomic():
+                for description in ('Primeira', 'Segunda', 'Terceira'):
+                    record_history(self.contract, self.user, description)
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(ContractHistory.objects.filter(contract=self.contract).count(), 3)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                record_history(self.contract, self.user, 'Nova transação')
+        self.assertTrue(ContractHistory.objects.filter(change_description='Nova transação').exists())
+
+
+class CatalogTests(TestCase):
+    """Testes do catálogo em cache de status e tipos de contrato"""
+
+    def setUp(self):
+        cache.clear()
+        local_cache.clear()
+
+    def test_forms_render_and_validate_from_the_catalog(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            service = ContractType.objects.create(name='Serviço')
+            ContractType.objects.create(name='Antigo', is_active=False)
+        catalog.get_types()
+
+        with self.assertNumQueries(0):
+            html = str(ContractFilterForm())
+            form = ContractFilterForm({'contract_type': str(service.pk)})
+            self.assertTrue(form.is_valid())
+        self.assertIn('Serviço', html)
+        self.assertNotIn('Antigo', html)
+        self.assertEqual(form.cleaned_data['contract_type'], service)
+        self.assertFalse(ContractFilterForm({'contract_type': '999'}).is_valid())
+
+    def test_saving_invalidates_the_catalog(self):
+        catalog.get_statuses()
+        with self.captureOnCommitCallbacks(execute=True):
+            ContractStatus.objects.create(name='Novo status')
+        self.assertIn('Novo status', [status.name for status in catalog.get_statuses()])
+
+    def test_stale_catalog_still_accepts_new_rows(self):
+        # Sem executar o on_commit, como um worker que não recebeu a invalidação
+        catalog.get_statuses()
+        status = ContractStatus.objects.create(name='Criado em outro processo')
+        self.assertNotIn(status, catalog.get_statuses())
+
+        form = ContractImportForm(data={'status': str(status.pk)})
+        form.is_valid()
+        self.assertNotIn('status', form.errors)
+        self.assertEqual(form.cleaned_data['status'], status)
+
+        user = User.objects.create_user(
+            username='importador', email='importador@example.com', password='senha-segura-123'
+        )
+        result = import_contracts(io.BytesIO(
+            'Empresa;Status;Valor;Data Início;Data Término\n'
+            'Empresa;Criado em outro processo;1;01/01/2024;01/01/2025\n'.encode()
+        ), 'contratos.csv', user=user)
+        self.assertEqual(result.errors, [])
+        self.assertEqual(Contract.objects.get().status, status)
+
+    @override_settings(CATALOG_LOCAL_TIMEOUT=60)
+    def test_local_entries_expire_quickly(self):
+        with mock.patch('core.cache.LocalCache.set') as local_set:
+            catalog.get_types()
+        self.assertEqual(local_set.call_args.args[2], 60)
+
+
+class NotificationTests(TestCase):
+    """Testes do envio dos resumos de notificação"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.today = date(2024, 6, 1)
+        cls.status = ContractStatus.objects.create(name='Vigente')
+        cls.user = User.objects.create_user(
+            username='fiscal', email='fiscal@example.com', password='senha-segura-123'
+        )
+        cls.contract = Contract.objects.create(
+            company='Empresa', status=cls.status, start_date=date(2024, 1, 1),
+            end_date=cls.today + timedelta(days=25), value=1000,
+            fiscal_portaria='portaria.pdf', responsible=cls.user,
+        )
+
+    def test_notice_uses_the_smallest_reached_threshold(self):
+        result = process_notifications(today=self.today)
+
+        self.assertEqual(result['digests'], 1)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['fiscal@example.com'])
+        self.assertIn(self.contract.contract_number, mail.outbox[0].body)
+        delivery = NotificationDelivery.objects.get()
+        self.assertEqual(delivery.threshold, 30)
+        self.assertIsNotNone(delivery.sent_at)
+
+    def test_second_run_sends_nothing(self):
+        process_notifications(today=self.today)
+        result = process_notifications(today=self.today)
+
+        self.assertEqual(result['digests'], 0)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(NotificationDelivery.objects.count(), 1)
+
+    def test_failed_send_releases_the_claim(self):
+        with mock.patch(
+            'django.core.mail.backends.locmem.EmailBackend.send_messages', side_effect=OSError
+        ):
+            result = process_notifications(today=self.today)
+        self.assertEqual(result['failed'], 1)
+        self.assertFalse(NotificationDelivery.objects.exists())
+
+        result = process_notifications(today=self.today)
+        self.assertEqual(result['digests'], 1)
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_claim_is_recorded_before_sending(self):
+        def send_messages(messages):
+            delivery = NotificationDelivery.objects.get()
+            self.assertIsNone(delivery.sent_at)
+            return len(messages)
+
+        with mock.patch(
+            'django.core.mail.backends.locmem.EmailBackend.send_messages', side_effect=send_messages
+        ):
+            process_notifications(today=self.today)
+        self.assertIsNotNone(NotificationDelivery.objects.get().sent_at)
+
+    def test_pending_claim_is_not_resent(self):
+        # Registro sem sent_at: envio interrompido depois de registrado
+        NotificationDelivery.objects.create(
+            kind=NotificationDelivery.EXPIRATION, object_id=self.contract.pk,
+            reference_date=self.contract.end_date, threshold=30, recipient=self.user,
+        )
+        result = process_notifications(today=self.today)
+
+        self.assertEqual(result['digests'], 0)
+        self.assertEqual(mail.outbox, [])
+
+
+class ExpirationReportTests(TestCase):
+    """Testes do relatório e do calendário de vencimentos"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.today = timezone.localdate()
+        cls.status = ContractStatus.objects.create(name='Vigente')
+        cls.user = User.objects.create_user(
+            username='leitor', email='leitor@example.com', password='senha-segura-123'
+        )
+        cls.expiring = Contract.objects.create(
+            company='A vencer', status=cls.status, start_date=cls.today - timedelta(days=100),
+            end_date=cls.today + timedelta(days=10), value=1000, fiscal_portaria='portaria.pdf',
+        )
+        cls.expired = [
+            Contract.objects.create(
+                company=f'Vencido {index}', status=cls.status, start_date=cls.today - timedelta(days=400),
+                end_date=cls.today - timedelta(days=index + 1), value=1, fiscal_portaria='portaria.pdf',
+            )
+            for index in range(3)
+        ]
+        cls.reminder = ContractReminder.objects.create(
+            contract=cls.expiring, title='Renovar', due_date=timezone.now() + timedelta(days=2),
+        )
+
+    def setUp(self):
+        cache.clear()
+        local_cache.clear()
+        self.client.force_login(self.user)
+
+    def test_report_pages_expired_contracts_by_cursor(self):
+        url = reverse('contracts:contract_expiration_report')
+        with mock.patch('contracts.views.ContractExpirationReportView.expired_paginate_by', 2):
+            response = self.client.get(url, {'days': 30})
+            self.assertEqual(response.status_code, 200)
+            self.assertContains(response, self.expiring.contract_number)
+            self.assertEqual(list(response.context['expired_contracts']), self.expired[:2])
+            self.assertEqual(
+                response.context['expiration_by_month'][0], (self.expiring.end_date.strftime('%Y-%m'), 1)
+            )
+
+            next_cursor = response.context['expired_contracts'].next_cursor
+            self.assertContains(response, f'?days=30&cursor={next_cursor}')
+            response = self.client.get(url, {'days': 30, 'cursor': next_cursor})
+        self.assertEqual(list(response.context['expired_contracts']), self.expired[2:])
+        self.assertTrue(response.context['expired_contracts'].has_previous())
+
+    def test_calendar_returns_events_by_day(self):
+        response = self.client.get(reverse('contracts:expiration_calendar'), {
+            'start': self.today.isoformat(), 'end': (self.today + timedelta(days=30)).isoformat(),
+        })
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['start'], self.today.isoformat())
+        contracts = [c['id'] for day in data['days'] for c in day['contracts']]
+        reminders = [r['id'] for day in data['days'] for r in day['reminders']]
+        self.assertEqual(contracts, [self.expiring.pk])
+        self.assertEqual(reminders, [self.reminder.pk])
+
+    def test_report_and_calendar_are_cached_until_contracts_change(self):
+        url = reverse('contracts:expiration_calendar')
+        params = {'start': self.today.isoformat(), 'end': (self.today + timedelta(days=30)).isoformat()}
+        self.client.get(url, params)
+        self.assertEqual(expiring_contracts(30, self.today), [self.expiring])
+
+        with self.assertNumQueries(0):
+            expiring_contracts(30, self.today)
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(url, params)
+        self.assertFalse(any('contracts_contract' in query['sql'] for query in queries))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            added = Contract.objects.create(
+                company='Nova', status=self.status, start_date=self.today,
+                end_date=self.today + timedelta(days=5), value=1, fiscal_portaria='portaria.pdf',
+            )
+        self.assertEqual(expiring_contracts(30, self.today), [added, self.expiring])
+        days = self.client.get(url, params).json()['days']
+        self.assertIn(added.pk, [c['id'] for day in days for c in day['contracts']])
+
+    @override_settings(EXPIRATION_CALENDAR_MAX_DAYS=10)
+    def test_calendar_rejects_invalid_windows(self):
+        url = reverse('contracts:expiration_calendar')
+        for params in (
+            {'start': '01/06/2024'},
+            {'start': '2024-06-10', 'end': '2024-06-01'},
+            {'start': '2024-06-01', 'end': '2024-06-30'},
+        ):
+            with self.subTest(params=params):
+                response = self.client.get(url, params)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('error', response.json())
+
+
+class ContractReminderListTests(TestCase):
+    """Testes da caixa de lembretes"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.now = timezone.now()
+        cls.status = ContractStatus.objects.create(name='Vigente')
+        cls.user = User.objects.create_user(
+            username='gestor', email='gestor@example.com', password='senha-segura-123'
+        )
+        cls.user.user_permissions.add(Permission.objects.get(codename='change_contractreminder'))
+        cls.contract, cls.other_contract = [
+            Contract.objects.create(
+                company=company, status=cls.status, start_date=date(2024, 1, 1),
+                end_date=date(2030, 1, 1), value=1, fiscal_portaria='portaria.pdf',
+            )
+            for company in ('Empresa', 'Outra')
+        ]
+
+        def reminder(title, due_date, contract=cls.contract, **kwargs):
+            return ContractReminder.objects.create(contract=contract, title=title, due_date=due_date, **kwargs)
+
+        cls.overdue = reminder('Atrasado', cls.now - timedelta(days=2))
+        cls.pending = reminder('Pendente', cls.now + timedelta(days=2))
+        cls.completed = reminder('Concluído', cls.now - timedelta(days=1), is_completed=True)
+        cls.other = reminder('Outro contrato', cls.now + timedelta(days=3), contract=cls.other_contract)
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def get(self, url=None, **params):
+        return self.client.get(url or reverse('contracts:reminder_list'), params)
+
+    def titles(self, response):
+        return [reminder.title for reminder in response.context['reminders']]
+
+    def test_counts_come_from_one_aggregate(self):
+        response = self.get()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            (response.context['pending_count'], response.context['overdue_count'], response.context['completed_count']),
+            (3, 1, 1)
+        )
+
+        with self.assertNumQueries(1):
+            counts = response.context['view'].get_counts()
+        self.assertEqual(counts, {'pending_count': 3, 'overdue_count': 1, 'completed_count': 1})
+
+    def test_status_filters(self):
+        self.assertEqual(self.titles(self.get(status='pending')), ['Atrasado', 'Pendente', 'Outro contrato'])
+        self.assertEqual(self.titles(self.get(status='overdue')), ['Atrasado'])
+        self.assertEqual(self.titles(self.get(status='completed')), ['Concluído'])
+
+    def test_due_date_filter_matches_the_whole_day(self):
+        due_date = timezone.localtime(self.pending.due_date).date()
+        response = self.get(due_date=due_date.isoformat())
+
+        self.assertEqual(self.titles(response), ['Pendente'])
+        self.assertEqual(self.titles(self.get(due_date='invalida')), [
+            'Atrasado', 'Concluído', 'Pendente', 'Outro contrato'
+        ])
+
+    def test_contract_filter_and_autocomplete_select(self):
+        response = self.get(reverse('contracts:contract_reminder_list', args=[self.other_contract.pk]))
+
+        self.assertEqual(self.titles(response), ['Outro contrato'])
+        self.assertEqual(response.context['pending_count'], 1)
+        self.assertEqual(response.context['selected_contract'], self.other_contract)
+        self.assertContains(response, f'data-autocomplete-url="{reverse("contracts:contract_autocomplete")}"')
+        self.assertContains(response, f'<option value="{self.other_contract.pk}" selected>')
+
+    def test_complete_view_toggles_the_reminder(self):
+        url = reverse('contracts:contract_reminder_complete', args=[self.contract.pk, self.pending.pk])
+
+        response = self.client.post(url)
+        self.assertRedirects(
+            response, reverse('contracts:contract_detail', args=[self.contract.pk]), fetch_redirect_response=False
+        )
+        self.pending.refresh_from_db()
+        self.assertTrue(self.pending.is_completed)
+        self.assertIsNotNone(self.pending.completed_date)
+
+        self.client.post(url)
+        self.pending.refresh_from_db()
+        self.assertFalse(self.pending.is_completed)
+        self.assertIsNone(self.pending.completed_date)
+
+    def test_complete_view_requires_permission(self):
+        other = User.objects.create_user(
+            username='leitor', email='leitor@example.com', password='senha-segura-123'
+        )
+        # O projeto não tem os templates de errors/, então a view é chamada
+        # diretamente em vez de passar pelo handler403
+        request = RequestFactory().post('/')
+        request.user = other
+        with self.assertRaises(PermissionDenied):
+            ContractReminderCompleteView.as_view()(request, contract_pk=self.contract.pk, pk=self.pending.pk)
+
+        self.pending.refresh_from_db()
+        self.assertFalse(self.pending.is_completed)
+
+
+class ContractFormResponsibleTests(TestCase):
+    """Testes do campo de responsável no formulário de contrato"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.status = ContractStatus.objects.create(name='Vigente')
+        cls.editor = User.objects.create_user(
+            username='editor', email='editor@example.com', password='senha-segura-123'
+        )
+        cls.editor.user_permissions.add(Permission.objects.get(codename='change_contract'))
+        cls.responsible = User.objects.create_user(
+            username='responsavel', email='responsavel@example.com', password='senha-segura-123',
+            first_name='Maria', last_name='Souza',
+        )
+        cls.contract = Contract.objects.create(
+            company='Empresa', status=cls.status, start_date=date(2024, 1, 1),
+            end_date=date(2025, 1, 1), value=1000, fiscal_portaria='portaria.pdf',
+            contract_document='contrato.pdf', fiscal_name='Fiscal', fiscal_registration='1234567',
+            responsible=cls.responsible,
+        )
+
+    def setUp(self):
+        self.client.force_login(self.editor)
+
+    def test_edit_keeps_the_responsible(self):
+        url = reverse('contracts:contract_update', args=[self.contract.pk])
+        response = self.client.get(url)
+
+        self.assertContains(response, 'name="responsible"')
+        self.assertContains(response, f'<option value="{self.responsible.pk}" selected>')
+
+        response = self.client.post(url, {
+            'contract_number': self.contract.contract_number,
+            'company': 'Empresa renomeada',
+            'fiscal_name': 'Fiscal',
+            'fiscal_registration': '1234567',
+            'contract_term': 'initial',
+            'start_date': '01/01/2024',
+            'end_date': '01/01/2025',
+            'value': '1000',
+            'currency': 'BRL',
+            'responsible': str(self.responsible.pk),
+        })
+
+        self.assertEqual(response.status_code, 302)
+        self.contract.refresh_from_db()
+        self.assertEqual(self.contract.company, 'Empresa renomeada')
+        self.assertEqual(self.contract.responsible, self.responsible)
+
+
+class AutocompleteTests(TestCase):
+    """Testes das buscas de autocompletar"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.status = ContractStatus.objects.create(name='Vigente')
+        cls.user = User.objects.create_user(
+            username='jsilva', email='jsilva@example.com', password='senha-segura-123',
+            first_name='João', last_name='Silva',
+        )
+        User.objects.create_user(
+            username='jsantos', email='jsantos@example.com', password='senha-segura-123',
+            first_name='José', last_name='Santos', is_active=False,
+        )
+        cls.contracts = [
+            Contract.objects.create(
+                company=company, status=cls.status, start_date=date(2024, 1, 1),
+                end_date=date(2025, 1, 1), value=1, fiscal_portaria='portaria.pdf',
+            )
+            for company in ('Alfa Serviços', 'Alfa Serviços', 'Beta Obras')
+        ]
+
+    def setUp(self):
+        cache.clear()
+        local_cache.clear()
+        self.client.force_login(self.user)
+
+    def search(self, name, **params):
+        response = self.client.get(reverse(f'contracts:{name}'), params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()['results']
+
+    def test_contracts_by_number_or_company(self):
+        number = self.contracts[2].contract_number
+        self.assertEqual(self.search('contract_autocomplete', q=number), [
+            {'id': self.contracts[2].pk, 'text': f'{number} - Beta Obras'},
+        ])
+        self.assertEqual(
+            [item['id'] for item in self.search('contract_autocomplete', q=number.removeprefix('CTR-'))],
+            [self.contracts[2].pk]
+        )
+        self.assertEqual(
+            {item['id'] for item in self.search('contract_autocomplete', q='alfa')},
+            {self.contracts[0].pk, self.contracts[1].pk}
+        )
+        self.assertEqual(len(self.search('contract_autocomplete', q='alfa', limit=1)), 1)
+        self.assertEqual(self.search('contract_autocomplete', q='  '), [])
+
+    def test_users_by_name(self):
+        expected = [{'id': self.user.pk, 'text': 'João Silva'}]
+        self.assertEqual(self.search('user_autocomplete', q='jo'), expected)
+        self.assertEqual(self.search('user_autocomplete', q='joão si'), expected)
+        self.assertEqual(self.search('user_autocomplete', q='jsantos'), [])
+
+    def test_distinct_companies(self):
+        self.assertEqual(self.search('company_autocomplete', q='ALFA'), [
+            {'id': 'Alfa Serviços', 'text': 'Alfa Serviços'},
+        ])
+
+    def test_results_are_cached_until_contracts_change(self):
+        self.search('company_autocomplete', q='gama')
+        with self.captureOnCommitCallbacks(execute=True):
+            Contract.objects.create(
+                company='Gama', status=self.status, start_date=date(2024, 1, 1),
+                end_date=date(2025, 1, 1), value=1, fiscal_portaria='portaria.pdf',
+            )
+        self.assertEqual(self.search('company_autocomplete', q='gama'), [{'id': 'Gama', 'text': 'Gama'}])
+
+    def test_requires_login(self):
+        self.client.logout()
+        response = self.client.get(reverse('contracts:contract_autocomplete'), {'q': 'alfa'})
+        self.assertEqual(response.status_code, 302)
+
+
+class ContractSearchTests(TestCase):
+    """Testes da busca textual com o índice FTS5"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.status = ContractStatus.objects.create(name='Vigente')
+
+    def setUp(self):
+        self.backend = get_search_backend('sqlite')
+        self.assertIsInstance(self.backend, SQLiteFTSSearchBackend)
+
+    def create(self, company, notes=''):
+        return Contract.objects.create(
+            company=company, notes=notes, status=self.status, start_date=date(2024, 1, 1),
+            end_date=date(2025, 1, 1), value=1, fiscal_portaria='portaria.pdf',
+        )
+
+    def found(self, query):
+        return list(self.backend.search(Contract.objects.all(), query))
+
+    def test_ignores_accents_and_case(self):
+        contract = self.create('João Construções')
+        self.assertEqual(self.found('joao'), [contract])
+        self.assertEqual(self.found('CONSTRUCOES'), [contract])
+        self.assertEqual(self.found('construções joão'), [contract])
+
+    def test_terms_match_by_prefix(self):
+        contract = self.create('Manutenção Predial')
+        self.assertEqual(self.found('manut pred'), [contract])
+        self.assertEqual(self.found('predio'), [])
+
+    def test_results_are_ordered_by_rank(self):
+        weak = self.create('Beta Obras', notes='contrato de limpeza com várias outras cláusulas e anexos')
+        strong = self.create('Limpeza Total', notes='limpeza limpeza')
+        self.assertEqual(self.found('limpeza'), [strong, weak])
+
+    def test_index_follows_update_and_delete(self):
+        contract = self.create('Alfa Serviços')
+        contract.company = 'Gama Serviços'
+        contract.save()
+        self.assertEqual(self.found('alfa'), [])
+        self.assertEqual(self.found('gama'), [contract])
+
+        contract.delete()
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT COUNT(*) FROM {search.SQLITE_FTS_TABLE}')
+            self.assertEqual(cursor.fetchone()[0], 0)
+
+    def test_save_without_search_fields_skips_reindex(self):
+        contract = self.create('Alfa Serviços')
+        with mock.patch.object(SQLiteFTSSearchBackend, 'index_contracts') as index_contracts:
+            contract.save(update_fields=['is_active'])
+            index_contracts.assert_not_called()
+            contract.save(update_fields=['company', 'is_active'])
+            index_contracts.assert_called_once_with([contract], replace=True)
+
+    @override_settings(CONTRACT_SEARCH_BACKEND='sqlite')
+    def test_falls_back_to_like_until_index_exists(self):
+        with mock.patch.dict(search._backends, clear=True):
+            with mock.patch.object(connection.introspection, 'table_names', return_value=[]):
+                self.assertIsInstance(get_search_backend(), LikeSearchBackend)
+                self.assertNotIsInstance(get_search_backend(), SQLiteFTSSearchBackend)
+            self.assertIsInstance(get_search_backend(), SQLiteFTSSearchBackend)
+
+    def test_like_backend_matches_substrings(self):
+        contract = self.create('Delta Engenharia')
+        found = LikeSearchBackend().search(Contract.objects.all(), 'engenh')
+        self.assertEqual(list(found), [contract])
+
+
+class ContractLookupKeyTests(TestCase):
+    """Testes das chaves normalizadas de CNPJ e número do contrato"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.status = ContractStatus.objects.create(name='Vigente')
+        cls.contract = cls.create('CTR-2024-015', '12.345.678/0001-90')
+        cls.other = cls.create('CTR-2023-015', '12.345.679/0001-00')
+
+    @classmethod
+    def create(cls, number, cnpj):
+        return Contract.objects.create(
+            contract_number=number, company_cnpj=cnpj, status=cls.status,
+            start_date=date(2024, 1, 1), end_date=date(2025, 1, 1), value=1,
+            fiscal_portaria='portaria.pdf',
+        )
+
+    def found(self, query):
+        return list(LikeSearchBackend().search(Contract.objects.all(), query))
+
+    def test_keys_are_filled_on_save(self):
+        self.assertEqual(self.contract.company_cnpj_digits, '12345678000190')
+        self.assertEqual((self.contract.number_year, self.contract.number_sequence), (2024, 15))
+
+        self.contract.company_cnpj = '98.765.432/0001-10'
+        self.contract.save(update_fields=['company_cnpj'])
+        self.contract.refresh_from_db()
+        self.assertEqual(self.contract.company_cnpj_digits, '98765432000110')
+
+    def test_partial_cnpj_uses_digits_range(self):
+        self.assertEqual(
+            contract_lookup_filter('12.345.678'),
+            Q(company_cnpj_digits__gte='12345678', company_cnpj_digits__lt='12345678:')
+        )
+        self.assertEqual(contract_lookup_filter('12345678000190'), Q(company_cnpj_digits='12345678000190'))
+        self.assertIsNone(contract_lookup_filter('12.345'))
+        self.assertEqual(self.found('12.345.678/0001'), [self.contract])
+
+    def test_contract_numbers_use_year_and_sequence(self):
+        self.assertEqual(contract_lookup_filter('2024-015'), Q(number_year=2024, number_sequence=15))
+        self.assertEqual(contract_lookup_filter('ctr-2024-15'), Q(number_year=2024, number_sequence=15))
+        self.assertEqual(contract_lookup_filter('CTR-2024'), Q(number_year=2024))
+        self.assertEqual(contract_lookup_filter('2024-'), Q(number_year=2024))
+        self.assertIsNone(contract_lookup_filter('2024'))
+        self.assertEqual(self.found('2024-15'), [self.contract])
+        self.assertEqual(self.found('CTR-2024'), [self.contract])
+
+    def test_duplicate_check_ignores_zero_padding(self):
+        url = reverse('contracts:check_contract_number')
+
+        response = self.client.get(url, {'number': 'CTR-2024-15'})
+        self.assertFalse(response.json()['available'])
+
+        response = self.client.get(url, {'number': 'ctr-2024-0015', 'current_id': self.contract.pk})
+        self.assertTrue(response.json()['available'])
+
+        response = self.client.get(url, {'number': 'CTR-2024-016'})
+        self.assertTrue(response.json()['available'])
+
+
+class ContractStatsRollupTests(TestCase):
+    """Testes da manutenção incremental de ContractStats pelos sinais"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.status = ContractStatus.objects.create(name='Vigente')
+        cls.other_status = ContractStatus.objects.create(name='Suspenso')
+
+    def create(self, **kwargs):
+        fields = {
+            'company': 'Empresa', 'status': self.status, 'start_date': date(2024, 1, 1),
+            'end_date': date(2025, 1, 1), 'value': 1000, 'fiscal_portaria': 'portaria.pdf',
+        }
+        fields.update(kwargs)
+        return Contract.objects.create(**fields)
+
+    def assertMatchesRebuild(self):
+        def rows():
+            return sorted(
+                ContractStats.objects.filter(contract_count__gt=0).values_list(
+                    'status_id', 'contract_term', 'start_year', 'is_active',
+                    'contract_count', 'total_value'
+                )
+            )
+        incremental = rows()
+        ContractStats.rebuild()
+        self.assertEqual(incremental, rows())
+        # Agrupamentos esvaziados pelos sinais não podem ficar negativos
+        self.assertFalse(ContractStats.objects.filter(contract_count__lt=0).exists())
+
+    def test_create(self):
+        self.create()
+        self.create(value=500, start_date=date(2023, 6, 1))
+        self.assertMatchesRebuild()
+
+    def test_status_and_term_change(self):
+        contract = self.create()
+        self.create()
+        contract.status = self.other_status
+        contract.save()
+        contract.contract_term = 'term_1'
+        contract.save()
+        self.assertMatchesRebuild()
+
+    def test_toggle_active(self):
+        contract = self.create()
+        contract.is_active = False
+        contract.save(update_fields=['is_active'])
+        self.assertMatchesRebuild()
+        contract.is_active = True
+        contract.save()
+        self.assertMatchesRebuild()
+
+    def test_value_change(self):
+        contract = self.create()
+        contract.value = 2500
+        contract.save()
+        self.assertMatchesRebuild()
+        self.assertEqual(stats_totals()['total_value'], 2500)
+
+    def test_delete(self):
+        contract = self.create()
+        self.create(value=300)
+        contract.delete()
+        self.assertMatchesRebuild()
+        self.assertEqual(stats_totals()['total_contracts'], 1)
+
+    def test_save_of_instance_not_loaded_from_db(self):
+        contract = self.create()
+        # Instância montada à mão, sem passar por from_db: o agrupamento
+        # anterior é lido do banco no pre_save
+        detached = Contract(**{
+            field.attname: getattr(contract, field.attname)
+            for field in Contract._meta.concrete_fields
+        })
+        self.assertFalse(hasattr(detached, '_loaded_stats'))
+        detached.status = self.other_status
+        detached.value = 700
+        detached.save()
+        self.assertMatchesRebuild()
+        self.assertEqual(
+            list(stats_by_status().values_list('status_id', 'total')), [(self.other_status.pk, 1)]
+        )
+
+
+class ContractCsvExportTests(TestCase):
+    """Testes da exportação CSV em streaming"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.status = ContractStatus.objects.create(name='Vigente')
+        cls.user = User.objects.create_user(
+            username='exportador', email='exportador@example.com', password='senha-segura-123'
+        )
+        for i in range(5):
+            Contract.objects.create(
+                contract_number=f'CTR-2024-{i + 1:03d}', company=f'Empresa {i}',
+                status=cls.status, start_date=date(2024, 1, 1),
+                end_date=date(2025, 1, 1) + timedelta(days=i), value=1000 + i,
+                fiscal_portaria='portaria.pdf',
+            )
+        # 12h em UTC são 9h no horário de Brasília
+        Contract.objects.update(created_at=datetime(2024, 6, 1, 12, 0, tzinfo=dt_timezone.utc))
+
+    def read(self, response):
+        self.assertFalse(hasattr(response, 'content'))
+        content = b''.join(response.streaming_content).decode()
+        return list(csv.reader(io.StringIO(content)))
+
+    def test_view_streams_header_and_rows(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('contracts:contract_export'), {'format': 'csv'})
+
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertEqual(
+            response['Content-Disposition'], 'attachment; filename="contratos_exportados.csv"'
+        )
+        rows = self.read(response)
+        self.assertEqual(rows[0], CONTRACT_EXPORT_HEADERS)
+        self.assertEqual(len(rows), 6)
+        first = dict(zip(CONTRACT_EXPORT_HEADERS, rows[1]))
+        self.assertEqual(first['Número'], 'CTR-2024-001')
+        self.assertEqual(first['Status'], 'Vigente')
+        self.assertEqual(first['Valor'], '1000.0')
+        self.assertEqual(first['Data Término'], '2025-01-01')
+        self.assertEqual(first['Criado em'], '2024-06-01 09:00:00-03:00')
+
+    def test_rows_are_read_with_values_list(self):
+        queryset = Contract.objects.order_by('pk')
+        with mock.patch.object(Contract, 'from_db') as from_db, self.assertNumQueries(1):
+            rows = list(contract_csv_rows(queryset, chunk_size=2))
+        from_db.assert_not_called()
+        self.assertEqual([row[0] for row in rows], [f'CTR-2024-{i:03d}' for i in range(1, 6)])
+
+    def test_export_to_csv_uses_values_list_for_plain_fields(self):
+        fields = [('Número', 'contract_number'), ('Criado em', 'created_at')]
+        response = export_to_csv(Contract.objects.order_by('pk'), fields, chunk_size=2)
+        with mock.patch.object(Contract, 'from_db') as from_db, self.assertNumQueries(1):
+            content = b''.join(response.streaming_content).decode()
+        from_db.assert_not_called()
+        rows = list(csv.reader(io.StringIO(content), delimiter=';'))
+        self.assertEqual(rows[0], ['Número', 'Criado em'])
+        self.assertEqual(rows[1], ['CTR-2024-001', '2024-06-01 09:00:00-03:00'])
+        self.assertEqual(len(rows), 6)
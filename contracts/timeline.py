@@ -0,0 +1,112 @@
+"""
+Linha do tempo de vencimentos: contratos por mês de término e calendário de
+vencimentos e lembretes por dia.
+
+O agrupamento por mês é feito no banco (``TruncMonth`` + ``Count``) e o
+calendário lê apenas a janela pedida, com consultas por intervalo nos índices
+de ``Contract.end_date`` e ``ContractReminder.due_date``.
+
+Os contratos a vencer ficam em cache por ``EXPIRATION_CACHE_TIMEOUT``
+segundos, com chave pelos parâmetros (dias e data de referência) e
+invalidados pelas etiquetas ``contract`` e ``contract_status``.
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from core.archive import day_range
+from core.cache import cached_queryset
+
+from .models import Contract, ContractReminder
+
+# Validade, em segundos, dos vencimentos em cache (relatório e calendário)
+EXPIRATION_CACHE_TIMEOUT = 300
+
+
+def expirations_by_month(date_from=None, date_to=None, queryset=None):
+    """
+    Contratos por mês de término, a partir de ``date_from`` (padrão: hoje).
+
+    Retorna uma lista ordenada de dicionários com ``month`` (primeiro dia do
+    mês), ``count`` e ``total_value``.
+    """
+    queryset = Contract.objects.all() if queryset is None else queryset
+    date_from = date_from or timezone.localdate()
+    queryset = queryset.filter(end_date__gte=date_from)
+    if date_to:
+        queryset = queryset.filter(end_date__lte=date_to)
+
+    return list(
+        queryset.order_by()
+        .annotate(month=TruncMonth('end_date'))
+        .values('month')
+        .annotate(count=Count('pk'), total_value=Sum('value'))
+        .order_by('month')
+    )
+
+
+@cached_queryset(tags=['contract', 'contract_status'], timeout=EXPIRATION_CACHE_TIMEOUT)
+def expiring_contracts(days, today):
+    """Contratos com término entre ``today`` e os próximos ``days`` dias (lista em cache)"""
+    return Contract.objects.filter(
+        end_date__range=(today, today + timedelta(days=days))
+    ).select_related('status').order_by('end_date', 'pk')
+
+
+def expired_contracts(today=None):
+    """Contratos vencidos, do mais recente ao mais antigo (para paginação por cursor)"""
+    today = today or timezone.localdate()
+    return Contract.objects.filter(end_date__lt=today).select_related('status').order_by('-end_date', '-pk')
+
+
+def get_calendar_max_days():
+    return getattr(settings, 'EXPIRATION_CALENDAR_MAX_DAYS', 92)
+
+
+def calendar_events(date_from, date_to, include_completed=False):
+    """
+    Vencimentos de contratos e lembretes por dia entre ``date_from`` e
+    ``date_to`` (inclusivo).
+
+    Retorna um dicionário ordenado ``{data: {'contracts': [...], 'reminders': [...]}}``
+    apenas com os dias que têm eventos. A janela deve ser limitada pelo
+    chamador (veja ``EXPIRATION_CALENDAR_MAX_DAYS``).
+    """
+    days = defaultdict(lambda: {'contracts': [], 'reminders': []})
+
+    contracts = Contract.objects.filter(
+        end_date__gte=date_from, end_date__lte=date_to
+    ).order_by('end_date', 'pk').values(
+        'pk', 'contract_number', 'company', 'end_date', 'is_active'
+    )
+    for contract in contracts:
+        days[contract['end_date']]['contracts'].append({
+            'id': contract['pk'],
+            'contract_number': contract['contract_number'],
+            'company': contract['company'],
+            'is_active': contract['is_active'],
+        })
+
+    start, end = day_range(date_from, date_to)
+    reminders = ContractReminder.objects.filter(due_date__gte=start, due_date__lt=end)
+    if not include_completed:
+        reminders = reminders.filter(is_completed=False)
+    reminders = reminders.order_by('due_date', 'pk').values(
+        'pk', 'title', 'due_date', 'is_completed', 'contract_id', 'contract__contract_number'
+    )
+    for reminder in reminders:
+        due = timezone.localtime(reminder['due_date'])
+        days[due.date()]['reminders'].append({
+            'id': reminder['pk'],
+            'title': reminder['title'],
+            'due_date': due.isoformat(),
+            'is_completed': reminder['is_completed'],
+            'contract_id': reminder['contract_id'],
+            'contract_number': reminder['contract__contract_number'],
+        })
+
+    return dict(sorted(days.items()))
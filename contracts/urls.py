@@ -31,6 +31,7 @@ urlpatterns = [
     path('<int:contract_pk>/partes/<int:pk>/editar/', views.ContractPartyUpdateView.as_view(), name='contract_party_update'),
     path('<int:contract_pk>/partes/<int:pk>/excluir/', views.ContractPartyDeleteView.as_view(), name='contract_party_delete'),
     # Lembretes
+    path('lembretes/', views.ContractReminderListView.as_view(), name='reminder_list'),
     path('<int:contract_pk>/lembretes/', views.ContractReminderListView.as_view(), name='contract_reminder_list'),
     path('<int:contract_pk>/lembretes/novo/', views.ContractReminderCreateView.as_view(), name='contract_reminder_create'),
     path('<int:contract_pk>/lembretes/<int:pk>/editar/', views.ContractReminderUpdateView.as_view(), name='contract_reminder_update'),
@@ -40,8 +41,20 @@ urlpatterns = [
     path('<int:pk>/historico/', views.ContractHistoryView.as_view(), name='contract_history'),
     # Relatórios
     path('relatorios/', views.ContractReportView.as_view(), name='contract_reports'),
+    path('relatorios/vencimentos/', views.ContractExpirationReportView.as_view(), name='contract_expiration_report'),
+    # Calendário de vencimentos (JSON)
+    path('calendario/', views.expiration_calendar, name='expiration_calendar'),
     # Exportação
     path('exportar/', views.ContractExportView.as_view(), name='contract_export'),
+    path('exportar/<int:pk>/', views.ExportJobDetailView.as_view(), name='export_job_detail'),
+    path('exportar/<int:pk>/status/', views.export_job_status, name='export_job_status'),
+    path('exportar/<int:pk>/baixar/', views.ExportJobDownloadView.as_view(), name='export_job_download'),
+    # Importação
+    path('importar/', views.ContractImportView.as_view(), name='contract_import'),
+    # Autocompletar
+    path('autocompletar/contratos/', views.contract_autocomplete, name='contract_autocomplete'),
+    path('autocompletar/usuarios/', views.user_autocomplete, name='user_autocomplete'),
+    path('autocompletar/empresas/', views.company_autocomplete, name='company_autocomplete'),
     # Verificação de número de contrato
     path('verificar-numero/', views.check_contract_number, name='check_contract_number'),
 ]
@@ -5,10 +5,12 @@ from io import BytesIO
 from typing import Dict, List, Optional, Union, Any
 
 # Django imports
+from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin, PermissionRequiredMixin, UserPassesTestMixin
 from django.contrib.auth.decorators import login_required, permission_required
-from django.contrib.auth.models import User, Group
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
 from django.core.exceptions import PermissionDenied, ValidationError
 from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
 from django.db import transaction
@@ -83,11 +85,13 @@ from reportlab.platypus.xpreformatted import XPreformatted
 from reportlab.rl_config import defaultPageSize
 
 # Local application imports
-from core.mixins import StaffRequiredMixin, SuperuserRequiredMixin, AjaxResponseMixin, JSONResponseMixin
+from core.archive import day_range
+from core.cache import cached_fragment
+from core.mixins import StaffRequiredMixin, SuperuserRequiredMixin, AjaxResponseMixin, JSONResponseMixin, CursorPaginationMixin
 from core.utils import (
     get_object_or_none, get_next_or_prev, get_client_ip, get_user_agent,
     send_email, generate_pdf, export_to_excel, export_to_csv, export_to_pdf,
-    format_currency, format_date, format_datetime, format_time, format_phone,
+    format_currency, format_date, format_datetime, format_time, format_phone, parse_date,
     paginate_queryset, get_paginator_range, get_ordering, get_search_fields,
     get_filtered_queryset, get_ordered_queryset, get_paginated_data
 )
@@ -95,13 +99,26 @@ from core.utils import (
 # Import models and forms
 from .models import (
     Contract, ContractType, ContractStatus, ContractParty,
-    ContractHistory, ContractReminder, ContractAttachment
+    ContractHistory, ContractReminder, ContractAttachment, ExportJob
 )
 
 from .forms import (
     ContractForm, ContractTypeForm, ContractStatusForm,
     ContractPartyForm, ContractReminderForm, ContractAttachmentForm,
-    ContractFilterForm
+    ContractFilterForm, ContractImportForm
+)
+from .exports import (
+    contracts_csv_response, contracts_excel_response, filter_contracts, get_export_filters
+)
+from .autocomplete import get_limit, search_companies, search_contracts, search_users
+from .catalog import get_statuses, get_types
+from .history import record_changes, record_history
+from .imports import import_contracts
+from .search import get_search_backend
+from .stats import stats_by_status, stats_by_term, stats_by_year, stats_totals
+from .timeline import (
+    EXPIRATION_CACHE_TIMEOUT, calendar_events, expirations_by_month, expired_contracts,
+    expiring_contracts, get_calendar_max_days
 )
 
 
@@ -122,16 +139,19 @@ from .forms import (
 from core.mixins import StaffRequiredMixin
 
 
-class ContractListView(LoginRequiredMixin, ListView):
+class ContractListView(LoginRequiredMixin, CursorPaginationMixin, ListView):
     model = Contract
     template_name = 'contracts/contract_list.html'
     context_object_name = 'contracts'
     paginate_by = 20
+    # Páginas numeradas por padrão; ?cursor= ativa a paginação por cursor
+    pagination_mode = 'page'
     
     def get_queryset(self):
         queryset = Contract.objects.select_related(
             'status', 'responsible', 'created_by'
         )
+        ranked = False
         
         # Filtros
         self.filter_form = ContractFilterForm(self.request.GET or None)
@@ -140,13 +160,9 @@ class ContractListView(LoginRequiredMixin, ListView):
             
             # Filtro por texto
             if data.get('search'):
-                search = data['search']
-                queryset = queryset.filter(
-                    Q(contract_number__icontains=search) |
-                    Q(company__icontains=search) |
-                    Q(fiscal_name__icontains=search) |
-                    Q(notes__icontains=search)
-                )
+                search_backend = get_search_backend()
+                queryset = search_backend.search(queryset, data['search'])
+                ranked = search_backend.ranked
             
             # Filtro por termo do contrato
             if data.get('contract_term'):
@@ -176,9 +192,15 @@ class ContractListView(LoginRequiredMixin, ListView):
             elif data.get('expires_in') == 'expired':
                 queryset = queryset.filter(end_date__lt=timezone.now().date())
         
-        # Ordenação
+        # Ordenação (buscas ranqueadas mantêm a ordem por relevância)
+        if ranked and not self.request.GET.get('order_by'):
+            return queryset
         order_by = self.request.GET.get('order_by', '-created_at')
-        if order_by.lstrip('-') in [f.name for f in Contract._meta.fields]:
+        if order_by.lstrip('-') == 'contract_number':
+            # Ordena pelo ano e sequência: CTR-2024-1000 vem depois de CTR-2024-999
+            prefix = '-' if order_by.startswith('-') else ''
+            queryset = queryset.order_by(f'{prefix}number_year', f'{prefix}number_sequence', order_by)
+        elif order_by.lstrip('-') in [f.name for f in Contract._meta.fields]:
             queryset = queryset.order_by(order_by)
         
         return queryset
@@ -188,7 +210,7 @@ class ContractListView(LoginRequiredMixin, ListView):
         context['filter_form'] = self.filter_form
         # Add contract term choices to the context for the template
         context['contract_term_choices'] = Contract.TERM_CHOICES
-        context['statuses'] = ContractStatus.objects.all()
+        context['statuses'] = get_statuses()
         return context
 
 
@@ -241,15 +263,13 @@ class ContractCreateView(LoginRequiredMixin, PermissionRequiredMixin, CreateView
         form.instance.created_by = self.request.user
         
         try:
-            response = super().form_valid(form)
-            
-            # Registrar histórico
-            ContractHistory.objects.create(
-                contract=self.object,
-                changed_by=self.request.user,
-                change_description=_('Contrato criado'),
-                changed_fields={'created': True}
-            )
+            with transaction.atomic():
+                response = super().form_valid(form)
+                
+                # Registrar histórico
+                record_history(
+                    self.object, self.request.user, _('Contrato criado'), {'created': True}
+                )
             
             is_ajax = self.request.POST.get('is_ajax') == '1' or self.request.headers.get('X-Requested-With') == 'XMLHttpRequest'
             
@@ -302,48 +322,11 @@ class ContractUpdateView(LoginRequiredMixin, PermissionRequiredMixin, UpdateView
         return Contract.objects.all()
     
     def form_valid(self, form):
-        # Salvar os dados antigos para comparação
-        old_instance = Contract.objects.get(pk=self.object.pk)
-        old_data = {
-            'title': old_instance.title,
-            'description': old_instance.description,
-            'start_date': str(old_instance.start_date) if old_instance.start_date else None,
-            'end_date': str(old_instance.end_date) if old_instance.end_date else None,
-            'value': str(old_instance.value) if old_instance.value is not None else None,
-            'status': str(old_instance.status) if old_instance.status else None,
-            'contract_type': str(old_instance.contract_type) if old_instance.contract_type else None,
-        }
-        
-        response = super().form_valid(form)
-        
-        # Obter os novos dados
-        new_data = {
-            'title': self.object.title,
-            'description': self.object.description,
-            'start_date': str(self.object.start_date) if self.object.start_date else None,
-            'end_date': str(self.object.end_date) if self.object.end_date else None,
-            'value': str(self.object.value) if self.object.value is not None else None,
-            'status': str(self.object.status) if self.object.status else None,
-            'contract_type': str(self.object.contract_type) if self.object.contract_type else None,
-        }
-        
-        # Verificar alterações
-        changed_fields = {}
-        for field, old_value in old_data.items():
-            if old_value != new_data[field]:
-                changed_fields[field] = {
-                    'old': old_value,
-                    'new': new_data[field]
-                }
-        
-        # Registrar histórico se houver alterações
-        if changed_fields:
-            ContractHistory.objects.create(
-                contract=self.object,
-                changed_by=self.request.user,
-                change_description=_('Dados do contrato atualizados'),
-                changed_fields=changed_fields
-            )
+        # O formulário já aplicou os novos valores em self.object; as
+        # alterações são comparadas com os valores carregados do banco
+        with transaction.atomic():
+            record_changes(self.object, self.request.user, _('Dados do contrato atualizados'))
+            response = super().form_valid(form)
         
         if self.request.headers.get('X-Requested-With') == 'XMLHttpRequest':
             data = {
@@ -589,56 +572,112 @@ class ContractPartyDeleteView(LoginRequiredMixin, PermissionRequiredMixin, Delet
 
 
 # Visualizações para Lembretes de Contrato
-class ContractReminderListView(LoginRequiredMixin, ListView):
+class ContractReminderListView(LoginRequiredMixin, CursorPaginationMixin, ListView):
+    """
+    Caixa de lembretes: todos os lembretes ou os de um contrato
+    (``contract_pk`` na URL ou ``?contract=``), filtrados por situação
+    (pendentes, atrasados, concluídos) e por dia de vencimento.
+    
+    Os filtros usam o índice ``(is_completed, due_date)``, a lista é paginada
+    por cursor e os totais saem de uma única agregação condicional. O filtro
+    de contrato usa a busca assíncrona (``contract_autocomplete``) em vez de
+    listar todos os contratos.
+    """
     model = ContractReminder
     template_name = 'contracts/contractreminder_list.html'
     context_object_name = 'reminders'
     paginate_by = 20
     
+    def get_contract_id(self):
+        contract_id = self.kwargs.get('contract_pk') or self.request.GET.get('contract', '')
+        return int(contract_id) if str(contract_id).isdigit() else None
+    
+    def get_base_queryset(self):
+        queryset = ContractReminder.objects.all()
+        contract_id = self.get_contract_id()
+        if contract_id:
+            queryset = queryset.filter(contract_id=contract_id)
+        return queryset
+    
     def get_queryset(self):
-        queryset = ContractReminder.objects.select_related('contract', 'created_by')
+        queryset = self.get_base_queryset().select_related('contract', 'assigned_to', 'created_by')
+        now = timezone.now()
         
-        # Filtro por status (pendente/realizado)
+        # Filtro por situação
         status = self.request.GET.get('status')
         if status == 'pending':
-            queryset = queryset.filter(completed=False)
+            queryset = queryset.filter(is_completed=False)
+        elif status == 'overdue':
+            queryset = queryset.filter(is_completed=False, due_date__lt=now)
         elif status == 'completed':
-            queryset = queryset.filter(completed=True)
+            queryset = queryset.filter(is_completed=True)
         
-        # Filtro por data
-        due_date = self.request.GET.get('due_date')
+        # Filtro por dia de vencimento (intervalo no índice, não igualdade com o datetime)
+        due_date = parse_date(self.request.GET.get('due_date', ''), '%Y-%m-%d')
         if due_date:
-            queryset = queryset.filter(due_date=due_date)
-        
-        # Filtro por contrato
-        contract_id = self.request.GET.get('contract')
-        if contract_id:
-            queryset = queryset.filter(contract_id=contract_id)
-        
-        return queryset.order_by('due_date', 'contract__title')
+            start, end = day_range(due_date, due_date)
+            queryset = queryset.filter(due_date__gte=start, due_date__lt=end)
+        
+        return queryset.order_by('due_date', 'pk')
+    
+    def get_counts(self):
+        """Pendentes, atrasados e concluídos em uma consulta"""
+        now = timezone.now()
+        return self.get_base_queryset().aggregate(
+            pending_count=Count('pk', filter=Q(is_completed=False)),
+            overdue_count=Count('pk', filter=Q(is_completed=False, due_date__lt=now)),
+            completed_count=Count('pk', filter=Q(is_completed=True)),
+        )
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         
         # Adicionar filtros atuais ao contexto
+        contract_id = self.get_contract_id()
         context['status'] = self.request.GET.get('status', '')
         context['due_date'] = self.request.GET.get('due_date', '')
-        context['contract_id'] = self.request.GET.get('contract', '')
+        context['contract_id'] = contract_id or ''
         
-        # Adicionar lista de contratos para o filtro
-        context['contracts'] = Contract.objects.all().order_by('title')
+        # Apenas o contrato selecionado; os demais vêm da busca assíncrona
+        context['selected_contract'] = (
+            Contract.objects.filter(pk=contract_id).only('pk', 'contract_number', 'company').first()
+            if contract_id else None
+        )
+        context['contract_autocomplete_url'] = reverse('contracts:contract_autocomplete')
+        context['now'] = timezone.now()
         
         # Estatísticas
-        today = timezone.now().date()
-        context['pending_count'] = ContractReminder.objects.filter(completed=False).count()
-        context['overdue_count'] = ContractReminder.objects.filter(
-            completed=False,
-            due_date__lt=today
-        ).count()
+        context.update(self.get_counts())
         
         return context
 
 
+def _autocomplete_response(request, search):
+    results = search(request.GET.get('q', ''), get_limit(request.GET.get('limit')))
+    return JsonResponse({'results': results})
+
+
+@login_required
+@require_http_methods(["GET"])
+def contract_autocomplete(request):
+    """Contratos para autocompletar: número ou empresa começando com ``q``"""
+    return _autocomplete_response(request, search_contracts)
+
+
+@login_required
+@require_http_methods(["GET"])
+def user_autocomplete(request):
+    """Usuários ativos para autocompletar: usuário, nome ou sobrenome começando com ``q``"""
+    return _autocomplete_response(request, search_users)
+
+
+@login_required
+@require_http_methods(["GET"])
+def company_autocomplete(request):
+    """Empresas já cadastradas em contratos, começando com ``q``"""
+    return _autocomplete_response(request, search_companies)
+
+
 class ContractReminderCreateView(LoginRequiredMixin, PermissionRequiredMixin, CreateView):
     model = ContractReminder
     form_class = ContractReminderForm
@@ -710,11 +749,11 @@ class ContractReminderCompleteView(LoginRequiredMixin, PermissionRequiredMixin,
     
     def post(self, request, *args, **kwargs):
         reminder = get_object_or_404(ContractReminder, pk=kwargs['pk'])
-        reminder.completed = not reminder.completed
-        reminder.completed_at = timezone.now() if reminder.completed else None
+        # completed_date é preenchida (ou limpa) em ContractReminder.save
+        reminder.is_completed = not reminder.is_completed
         reminder.save()
         
-        action = 'concluído' if reminder.completed else 'reaberto'
+        action = 'concluído' if reminder.is_completed else 'reaberto'
         messages.success(request, _(f'Lembrete {action} com sucesso!'))
         
         return redirect('contracts:contract_detail', pk=reminder.contract.pk)
@@ -739,7 +778,7 @@ class ContractReminderDeleteView(LoginRequiredMixin, PermissionRequiredMixin, De
 
 
 # Visualizações para Histórico de Contratos
-class ContractHistoryListView(LoginRequiredMixin, ListView):
+class ContractHistoryListView(LoginRequiredMixin, CursorPaginationMixin, ListView):
     model = ContractHistory
     template_name = 'contracts/contracthistory_list.html'
     context_object_name = 'history_entries'
@@ -748,7 +787,7 @@ class ContractHistoryListView(LoginRequiredMixin, ListView):
     def get_queryset(self):
         queryset = ContractHistory.objects.select_related(
             'contract', 'changed_by'
-        ).order_by('-changed_at')
+        ).order_by('-change_date')
         
         # Filtro por contrato
         contract_id = self.request.GET.get('contract')
@@ -760,19 +799,15 @@ class ContractHistoryListView(LoginRequiredMixin, ListView):
         if user_id:
             queryset = queryset.filter(changed_by_id=user_id)
         
-        # Filtro por data
-        date_from = self.request.GET.get('date_from')
-        if date_from:
-            queryset = queryset.filter(changed_at__date__gte=date_from)
-            
-        date_to = self.request.GET.get('date_to')
-        if date_to:
-            queryset = queryset.filter(changed_at__date__lte=date_to)
-        
-        # Filtro por tipo de alteração
-        change_type = self.request.GET.get('change_type')
-        if change_type:
-            queryset = queryset.filter(change_type=change_type)
+        # Filtro por data (intervalo semiaberto, que usa o índice de change_date)
+        start, end = day_range(
+            parse_date(self.request.GET.get('date_from'), '%Y-%m-%d'),
+            parse_date(self.request.GET.get('date_to'), '%Y-%m-%d'),
+        )
+        if start:
+            queryset = queryset.filter(change_date__gte=start)
+        if end:
+            queryset = queryset.filter(change_date__lt=end)
         
         return queryset
     
@@ -784,20 +819,23 @@ class ContractHistoryListView(LoginRequiredMixin, ListView):
         context['user_id'] = self.request.GET.get('user', '')
         context['date_from'] = self.request.GET.get('date_from', '')
         context['date_to'] = self.request.GET.get('date_to', '')
-        context['change_type'] = self.request.GET.get('change_type', '')
         
-        # Adicionar listas para os filtros
-        context['contracts'] = Contract.objects.all().order_by('title')
-        context['users'] = User.objects.filter(
-            id__in=ContractHistory.objects.values('changed_by').distinct()
-        ).order_by('first_name', 'last_name')
-        
-        # Opções de tipo de alteração
-        context['change_types'] = ContractHistory.CHANGE_TYPES
-        
-        # Estatísticas
+        # Apenas os itens selecionados; os demais vêm da busca assíncrona
+        contract_id = context['contract_id']
+        user_id = context['user_id']
+        context['selected_contract'] = (
+            Contract.objects.filter(pk=contract_id).only('pk', 'contract_number', 'company').first()
+            if contract_id.isdigit() else None
+        )
+        context['selected_user'] = (
+            get_user_model().objects.filter(pk=user_id).first() if user_id.isdigit() else None
+        )
+        context['contract_autocomplete_url'] = reverse('contracts:contract_autocomplete')
+        context['user_autocomplete_url'] = reverse('contracts:user_autocomplete')
         
         return context
+
+
 class ContractHistoryDetailView(LoginRequiredMixin, DetailView):
     model = ContractHistory
     template_name = 'contracts/contracthistory_detail.html'
@@ -951,7 +989,7 @@ class ContractDashboardView(LoginRequiredMixin, TemplateView):
         today = timezone.now().date()
         
         # Estatísticas gerais
-        context['total_contracts'] = Contract.objects.count()
+        context['total_contracts'] = stats_totals()['total_contracts']
         context['active_contracts'] = Contract.objects.filter(
             end_date__gte=today,
             start_date__lte=today
@@ -967,15 +1005,9 @@ class ContractDashboardView(LoginRequiredMixin, TemplateView):
             end_date__lt=today
         ).order_by('-end_date')[:5]
         
-        # Contratos por tipo
-        context['contracts_by_type'] = ContractType.objects.annotate(
-            count=Count('contracts')
-        ).filter(count__gt=0).order_by('-count')
-        
-        # Contratos por status
-        context['contracts_by_status'] = ContractStatus.objects.annotate(
-            count=Count('contracts')
-        ).filter(count__gt=0).order_by('-count')
+        # Contratos por termo e por status (tabela de estatísticas)
+        context['contracts_by_type'] = stats_by_term()
+        context['contracts_by_status'] = stats_by_status()
         
         # Lembretes pendentes
         context['pending_reminders'] = ContractReminder.objects.filter(
@@ -1028,8 +1060,8 @@ class ContractReportView(LoginRequiredMixin, TemplateView):
         context['contracts'] = queryset.order_by('title')
         
         # Opções de filtro
-        context['contract_types'] = ContractType.objects.all()
-        context['statuses'] = ContractStatus.objects.all()
+        context['contract_types'] = get_types()
+        context['statuses'] = get_statuses()
         
         # Manter os filtros ativos
         context['filters'] = {
@@ -1045,37 +1077,35 @@ class ContractReportView(LoginRequiredMixin, TemplateView):
 
 class ContractExpirationReportView(LoginRequiredMixin, TemplateView):
     template_name = 'contracts/reports/expiration_report.html'
+    expired_paginate_by = 20
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        today = timezone.now().date()
+        today = timezone.localdate()
         
         # Contratos a vencer
-        days = int(self.request.GET.get('days', 30))
-        
-        expiring_contracts = Contract.objects.filter(
-            end_date__range=(today, today + timezone.timedelta(days=days))
-        ).order_by('end_date')
-        
-        # Contratos vencidos
-        expired_contracts = Contract.objects.filter(
-            end_date__lt=today
-        ).order_by('-end_date')
-        
-        # Agrupar por mês de vencimento
-        expiration_dates = Contract.objects.filter(
-            end_date__gte=today
-        ).values_list('end_date', flat=True)
+        try:
+            days = max(0, int(self.request.GET.get('days', 30)))
+        except ValueError:
+            days = 30
+        
+        # Contratos vencidos, paginados por cursor (?cursor=)
+        expired = paginate_queryset(
+            expired_contracts(today), self.request, self.expired_paginate_by,
+            cursor=True, estimate_total=True
+        )
         
-        expiration_by_month = {}
-        for date in expiration_dates:
-            month_year = date.strftime('%Y-%m')
-            expiration_by_month[month_year] = expiration_by_month.get(month_year, 0) + 1
+        # Vencimentos por mês, agrupados no banco
+        expiration_by_month = [
+            (row['month'].strftime('%Y-%m'), row['count'])
+            for row in expirations_by_month(today)
+        ]
         
         context.update({
-            'expiring_contracts': expiring_contracts,
-            'expired_contracts': expired_contracts,
-            'expiration_by_month': sorted(expiration_by_month.items()),
+            'expiring_contracts': expiring_contracts(days, today),
+            'expired_contracts': expired['page_obj'],
+            'expired_page': expired,
+            'expiration_by_month': expiration_by_month,
             'days': days,
             'title': _('Relatório de Vencimento de Contratos')
         })
@@ -1083,27 +1113,52 @@ class ContractExpirationReportView(LoginRequiredMixin, TemplateView):
         return context
 
 
+@login_required
+@require_http_methods(["GET"])
+@cached_fragment(tags=['contract', 'contract_reminder'], timeout=EXPIRATION_CACHE_TIMEOUT, vary_on_user=False)
+def expiration_calendar(request):
+    """
+    Calendário de vencimentos em JSON: contratos (data de término) e
+    lembretes (vencimento) por dia entre ``start`` e ``end`` (AAAA-MM-DD).
+    
+    A janela é limitada a ``EXPIRATION_CALENDAR_MAX_DAYS`` dias; sem
+    parâmetros, vai de hoje até o fim desse limite. ``completed=1`` inclui
+    lembretes concluídos. As respostas ficam em cache pela query string até
+    que contratos ou lembretes mudem.
+    """
+    today = timezone.localdate()
+    max_days = get_calendar_max_days()
+    start = parse_date(request.GET['start'], '%Y-%m-%d') if request.GET.get('start') else today
+    end = parse_date(request.GET['end'], '%Y-%m-%d') if request.GET.get('end') else None
+    if start is not None and end is None and not request.GET.get('end'):
+        end = start + timedelta(days=max_days - 1)
+    if start is None or end is None:
+        return JsonResponse({'error': 'Datas inválidas; use o formato AAAA-MM-DD'}, status=400)
+    if end < start:
+        return JsonResponse({'error': 'A data final deve ser posterior à inicial'}, status=400)
+    if (end - start).days + 1 > max_days:
+        return JsonResponse({'error': f'O intervalo máximo é de {max_days} dias'}, status=400)
+    
+    events = calendar_events(start, end, include_completed=request.GET.get('completed') == '1')
+    return JsonResponse({
+        'start': start.isoformat(),
+        'end': end.isoformat(),
+        'days': [
+            {'date': day.isoformat(), **day_events}
+            for day, day_events in events.items()
+        ],
+    })
+
+
 class ContractValueReportView(LoginRequiredMixin, TemplateView):
     template_name = 'contracts/reports/value_report.html'
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         
-        # Valor total por tipo de contrato
-        value_by_type = ContractType.objects.annotate(
-            total_value=Sum('contracts__value'),
-            contract_count=Count('contracts')
-        ).filter(total_value__isnull=False)
-        
-        # Valor total por ano
-        value_by_year = Contract.objects.exclude(
-            start_date__isnull=True
-        ).annotate(
-            year=ExtractYear('start_date')
-        ).values('year').annotate(
-            total_value=Sum('value'),
-            contract_count=Count('id')
-        ).order_by('year')
+        # Valores por termo e por ano de início (tabela de estatísticas)
+        value_by_type = stats_by_term()
+        value_by_year = stats_by_year()
         
         # Top contratos por valor
         top_contracts = Contract.objects.exclude(
@@ -1114,7 +1169,7 @@ class ContractValueReportView(LoginRequiredMixin, TemplateView):
             'value_by_type': value_by_type,
             'value_by_year': value_by_year,
             'top_contracts': top_contracts,
-            'total_value': Contract.objects.aggregate(Sum('value'))['value__sum'] or 0,
+            'total_value': stats_totals()['total_value'],
             'title': _('Relatório de Valores de Contratos')
         })
         
@@ -1125,72 +1180,7 @@ def export_contracts_to_excel(request):
     """
     Exporta os contratos para um arquivo Excel.
     """
-    # Criar o arquivo Excel
-    output = BytesIO()
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Contratos"
-    
-    # Cabeçalhos
-    headers = [
-        'Número', 'Título', 'Tipo', 'Status', 'Valor',
-        'Data Início', 'Data Término', 'Dias Restantes',
-        'Partes', 'Anexos', 'Lembretes', 'Descrição'
-    ]
-    
-    for col_num, header in enumerate(headers, 1):
-        cell = ws.cell(row=1, column=col_num, value=header)
-        cell.font = Font(bold=True)
-    
-    # Dados
-    today = timezone.now().date()
-    contracts = Contract.objects.select_related(
-        'contract_type', 'status'
-    ).prefetch_related('parties', 'attachments', 'reminders')
-    
-    for row_num, contract in enumerate(contracts, 2):
-        days_left = (contract.end_date - today).days if contract.end_date else None
-        
-        ws.cell(row=row_num, column=1, value=contract.contract_number)
-        ws.cell(row=row_num, column=2, value=str(contract))
-        ws.cell(row=row_num, column=3, value=str(contract.contract_type) if contract.contract_type else '')
-        ws.cell(row=row_num, column=4, value=str(contract.status) if contract.status else '')
-        ws.cell(row=row_num, column=5, value=float(contract.value) if contract.value else 0)
-        ws.cell(row=row_num, column=6, value=contract.start_date)
-        ws.cell(row=row_num, column=7, value=contract.end_date)
-        ws.cell(row=row_num, column=8, value=days_left)
-        ws.cell(row=row_num, column=9, value=', '.join(str(p) for p in contract.parties.all()))
-        ws.cell(row=row_num, column=10, value=contract.attachments.count())
-        ws.cell(row=row_num, column=11, value=contract.reminders.count())
-        ws.cell(row=row_num, column=12, value=contract.description)
-    
-    # Ajustar largura das colunas
-    for column in ws.columns:
-        max_length = 0
-        column_letter = column[0].column_letter
-        
-        for cell in column:
-            try:
-                if len(str(cell.value)) > max_length:
-                    max_length = len(str(cell.value))
-            except:
-                pass
-            
-        adjusted_width = (max_length + 2) * 1.2
-        ws.column_dimensions[column_letter].width = adjusted_width
-    
-    # Salvar o arquivo
-    wb.save(output)
-    output.seek(0)
-    
-    # Criar a resposta
-    response = HttpResponse(
-        output,
-        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-    )
-    response['Content-Disposition'] = 'attachment; filename=contratos_exportados.xlsx'
-    
-    return response
+    return contracts_excel_response(Contract.objects.all(), detailed=True)
 
 
 class ContractExportView(LoginRequiredMixin, View):
@@ -1199,26 +1189,19 @@ class ContractExportView(LoginRequiredMixin, View):
     """
     def get(self, request, *args, **kwargs):
         # Obter parâmetros de filtro
-        contract_type = request.GET.get('contract_type')
-        status = request.GET.get('status')
-        start_date = request.GET.get('start_date')
-        end_date = request.GET.get('end_date')
+        filters = get_export_filters(request.GET)
         export_format = request.GET.get('format', 'excel')
+        if export_format not in dict(ExportJob.FORMAT_CHOICES):
+            export_format = 'excel'
         
-        # Filtrar contratos
-        queryset = Contract.objects.all()
-        
-        if contract_type:
-            queryset = queryset.filter(contract_type_id=contract_type)
-        if status:
-            queryset = queryset.filter(status_id=status)
-        if start_date:
-            queryset = queryset.filter(start_date__gte=start_date)
-        if end_date:
-            queryset = queryset.filter(end_date__lte=end_date)
+        # Filtrar contratos (ordenados por data de término)
+        queryset = filter_contracts(filters)
         
-        # Ordenar por data de término (mais próximos primeiro)
-        queryset = queryset.order_by('end_date')
+        # PDF e exportações grandes são processados em segundo plano
+        inline_limit = getattr(settings, 'EXPORT_INLINE_MAX_ROWS', 5000)
+        if (export_format == 'pdf' or request.GET.get('background') == '1'
+                or queryset.count() > inline_limit):
+            return self.enqueue(export_format, filters)
         
         # Exportar no formato solicitado
         if export_format == 'csv':
@@ -1226,101 +1209,146 @@ class ContractExportView(LoginRequiredMixin, View):
         else:  # Padrão para Excel
             return self.export_to_excel(queryset)
     
-    def export_to_excel(self, queryset):
-        """Exporta os contratos para um arquivo Excel"""
-        output = BytesIO()
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Contratos"
-        
-        # Cabeçalhos
-        headers = [
-            'Número', 'Título', 'Tipo', 'Status', 'Valor',
-            'Data Início', 'Data Término', 'Dias Restantes',
-            'Descrição', 'Criado em', 'Atualizado em'
-        ]
-        
-        for col_num, header in enumerate(headers, 1):
-            cell = ws.cell(row=1, column=col_num, value=header)
-            cell.font = Font(bold=True)
-        
-        # Dados
-        today = timezone.now().date()
-        
-        for row_num, contract in enumerate(queryset, 2):
-            days_left = (contract.end_date - today).days if contract.end_date else None
-            
-            ws.cell(row=row_num, column=1, value=contract.contract_number or '')
-            ws.cell(row=row_num, column=2, value=str(contract))
-            ws.cell(row=row_num, column=3, value=str(contract.contract_type) if contract.contract_type else '')
-            ws.cell(row=row_num, column=4, value=str(contract.status) if contract.status else '')
-            ws.cell(row=row_num, column=5, value=float(contract.value) if contract.value else 0)
-            ws.cell(row=row_num, column=6, value=contract.start_date)
-            ws.cell(row=row_num, column=7, value=contract.end_date)
-            ws.cell(row=row_num, column=8, value=days_left)
-            ws.cell(row=row_num, column=9, value=contract.description or '')
-            ws.cell(row=row_num, column=10, value=contract.created_at)
-            ws.cell(row=row_num, column=11, value=contract.updated_at)
-        
-        # Ajustar largura das colunas
-        for column in ws.columns:
-            max_length = 0
-            column_letter = column[0].column_letter
-            
-            for cell in column:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except:
-                    pass
-                
-            adjusted_width = (max_length + 2) * 1.2
-            ws.column_dimensions[column_letter].width = adjusted_width
+    def enqueue(self, export_format, filters):
+        """Coloca a exportação na fila do worker e redireciona para o acompanhamento"""
+        job, created = ExportJob.enqueue(
+            export_format, filters, user=self.request.user
+        )
         
-        # Salvar o arquivo
-        wb.save(output)
-        output.seek(0)
+        if self.request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+            return JsonResponse(export_job_data(job), status=202 if created else 200)
         
-        # Criar a resposta
-        response = HttpResponse(
-            output,
-            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        )
-        response['Content-Disposition'] = 'attachment; filename=contratos_exportados.xlsx'
-        return response
+        if created:
+            messages.info(self.request, _('A exportação foi colocada na fila e ficará disponível em instantes.'))
+        return redirect('contracts:export_job_detail', pk=job.pk)
+    
+    def export_to_excel(self, queryset):
+        """Exporta os contratos para um arquivo Excel"""
+        return contracts_excel_response(queryset)
     
     def export_to_csv(self, queryset):
         """Exporta os contratos para um arquivo CSV"""
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = 'attachment; filename=contratos_exportados.csv'
+        return contracts_csv_response(queryset)
+
+
+def export_job_data(job):
+    """Serializa o estado de uma exportação em segundo plano"""
+    data = {
+        'id': job.pk,
+        'format': job.export_format,
+        'status': job.status,
+        'status_display': str(job.get_status_display()),
+        'row_count': job.row_count,
+        'created_at': job.created_at.isoformat(),
+        'finished_at': job.finished_at.isoformat() if job.finished_at else None,
+        'status_url': reverse('contracts:export_job_status', kwargs={'pk': job.pk}),
+        'download_url': None,
+        'error': job.error or None,
+    }
+    if job.status == ExportJob.DONE and job.file:
+        data['download_url'] = reverse('contracts:export_job_download', kwargs={'pk': job.pk})
+    return data
+
+
+class ExportJobDetailView(LoginRequiredMixin, DetailView):
+    """
+    Página de acompanhamento de uma exportação em segundo plano.
+    """
+    model = ExportJob
+    template_name = 'contracts/export_job_detail.html'
+    context_object_name = 'job'
+    
+    def get_queryset(self):
+        return ExportJob.visible_to(self.request.user)
+    
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['job_data'] = export_job_data(self.object)
+        context['title'] = _('Exportação de Contratos')
+        return context
+
+
+@login_required
+@require_GET
+def export_job_status(request, pk):
+    """
+    Retorna em JSON a situação de uma exportação em segundo plano.
+    """
+    job = get_object_or_404(ExportJob.visible_to(request.user), pk=pk)
+    return JsonResponse(export_job_data(job))
+
+
+class ExportJobDownloadView(LoginRequiredMixin, View):
+    """
+    Envia o arquivo gerado por uma exportação concluída.
+    """
+    def get(self, request, *args, **kwargs):
+        job = get_object_or_404(
+            ExportJob.visible_to(request.user), pk=kwargs['pk'], status=ExportJob.DONE
+        )
+        if not job.file:
+            raise Http404(_('Arquivo da exportação não encontrado.'))
         
-        writer = csv.writer(response)
-        writer.writerow([
-            'Número', 'Título', 'Tipo', 'Status', 'Valor',
-            'Data Início', 'Data Término', 'Dias Restantes',
-            'Descrição', 'Criado em', 'Atualizado em'
-        ])
+        try:
+            file = job.file.open('rb')
+        except FileNotFoundError:
+            raise Http404(_('Arquivo da exportação não encontrado.'))
         
-        today = timezone.now().date()
+        return FileResponse(file, as_attachment=True, filename=job.get_filename())
+
+
+class ContractImportView(LoginRequiredMixin, PermissionRequiredMixin, FormView):
+    """
+    Importação de contratos a partir de uma planilha CSV ou XLSX.
+    
+    As linhas com erro são listadas com o número da linha; as demais são
+    gravadas normalmente.
+    """
+    form_class = ContractImportForm
+    template_name = 'contracts/contract_import.html'
+    permission_required = 'contracts.can_import_contracts'
+    
+    # Quantidade máxima de erros exibidos na página
+    max_errors_displayed = 200
+    
+    def form_valid(self, form):
+        upload = form.cleaned_data['file']
+        dry_run = form.cleaned_data['dry_run']
         
-        for contract in queryset:
-            days_left = (contract.end_date - today).days if contract.end_date else None
-            
-            writer.writerow([
-                contract.contract_number or '',
-                str(contract),
-                str(contract.contract_type) if contract.contract_type else '',
-                str(contract.status) if contract.status else '',
-                float(contract.value) if contract.value else 0,
-                contract.start_date,
-                contract.end_date,
-                days_left,
-                contract.description or '',
-                contract.created_at,
-                contract.updated_at
-            ])
+        try:
+            result = import_contracts(
+                upload, upload.name,
+                user=self.request.user,
+                default_status=form.cleaned_data['status'],
+                dry_run=dry_run,
+            )
+        except (ValueError, UnicodeDecodeError) as e:
+            form.add_error('file', _('Não foi possível ler o arquivo: %(error)s') % {'error': e})
+            return self.form_invalid(form)
         
-        return response
+        if dry_run:
+            messages.info(self.request, _('%(valid)s de %(total)s linha(s) válida(s).') % {
+                'valid': result.total - result.error_count, 'total': result.total
+            })
+        elif result.created:
+            messages.success(self.request, _('%(count)s contrato(s) importado(s) com sucesso!') % {
+                'count': result.created
+            })
+        if result.errors:
+            messages.warning(self.request, _('%(count)s linha(s) não foram importadas.') % {
+                'count': result.error_count
+            })
+        
+        return self.render_to_response(self.get_context_data(
+            form=form,
+            result=result,
+            errors=result.errors[:self.max_errors_displayed],
+        ))
+    
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['title'] = _('Importar Contratos')
+        return context
 
 
 @require_http_methods(["GET"])
@@ -1335,10 +1363,15 @@ def check_contract_number(request):
     if not number:
         return JsonResponse({'available': False, 'message': 'Número de contrato não fornecido'}, status=400)
     
-    # Verifica se já existe um contrato com este número
-    from .models import Contract
+    # Verifica se já existe um contrato com este número; números no formato
+    # CTR-YYYY-NNN são comparados pelo ano e sequência (CTR-2024-15 == CTR-2024-015)
+    from .models import Contract, parse_contract_number
     
-    query = Contract.objects.filter(contract_number=number)
+    year, sequence = parse_contract_number(number)
+    if year is not None:
+        query = Contract.objects.filter(number_year=year, number_sequence=sequence)
+    else:
+        query = Contract.objects.filter(contract_number=number)
     
     # Se for uma atualização, exclui o contrato atual da verificação
     if current_id and current_id.isdigit():
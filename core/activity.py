@@ -0,0 +1,139 @@
+"""
+Gravação assíncrona do log de atividades.
+
+``ActivityLog.log_action`` entrega os registros a um ``ActivityLogWriter``,
+que os acumula em uma fila em memória e os grava em lotes (``bulk_create``) a
+partir de uma thread em segundo plano: a cada ``ACTIVITY_LOG_BATCH_SIZE``
+registros ou a cada ``ACTIVITY_LOG_FLUSH_INTERVAL`` segundos. A fila é
+esvaziada no encerramento do processo.
+
+Com ``ACTIVITY_LOG_ASYNC = False`` (forçado nos testes por ``core.test_runner``) ou se a fila estiver
+cheia, o registro é gravado na hora, como antes. Se a gravação do lote falhar,
+os registros são gravados um a um, e só os que falharem de novo são perdidos
+(com o erro no log).
+"""
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+
+from django.conf import settings
+from django.db import close_old_connections
+
+logger = logging.getLogger(__name__)
+
+
+class ActivityLogWriter:
+    """Fila de registros de atividade gravada em lotes por uma thread"""
+
+    _STOP = object()
+
+    def __init__(self, batch_size=None, flush_interval=None, max_queue_size=None):
+        self.batch_size = batch_size or getattr(settings, 'ACTIVITY_LOG_BATCH_SIZE', 100)
+        self.flush_interval = flush_interval or getattr(settings, 'ACTIVITY_LOG_FLUSH_INTERVAL', 0.5)
+        self.queue = queue.Queue(maxsize=max_queue_size or getattr(settings, 'ACTIVITY_LOG_MAX_QUEUE', 10000))
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+
+    @property
+    def enabled(self):
+        return getattr(settings, 'ACTIVITY_LOG_ASYNC', True)
+
+    def submit(self, entry):
+        """Agenda a gravação de um ActivityLog ainda não salvo"""
+        if not self.enabled:
+            entry.save()
+            return entry
+
+        self._ensure_thread()
+        try:
+            self.queue.put_nowait(entry)
+        except queue.Full:
+            logger.warning('Fila do log de atividades cheia; gravando o registro diretamente')
+            entry.save()
+        return entry
+
+    def _ensure_thread(self):
+        # Processos criados por fork (ex.: workers do gunicorn) não herdam a
+        # thread do processo pai e precisam iniciar a sua
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+                return
+            if self._pid != os.getpid():
+                self.queue = queue.Queue(maxsize=self.queue.maxsize)
+            self._pid = os.getpid()
+            self._thread = threading.Thread(
+                target=self._run, name='activity-log-writer', daemon=True
+            )
+            self._thread.start()
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            batch = []
+            deadline = None
+            while len(batch) < self.batch_size:
+                timeout = None if deadline is None else max(deadline - time.monotonic(), 0)
+                try:
+                    item = self.queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if item is self._STOP:
+                    self.queue.task_done()
+                    stopping = True
+                    break
+                batch.append(item)
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+            self._write(batch)
+
+    def _write(self, batch):
+        if not batch:
+            return
+        from .models import ActivityLog
+
+        try:
+            ActivityLog.objects.bulk_create(batch)
+        except Exception:
+            logger.warning(
+                'Falha ao gravar %d registro(s) do log de atividades em lote; gravando um a um',
+                len(batch), exc_info=True
+            )
+            self._write_each(batch)
+        finally:
+            close_old_connections()
+            for _ in batch:
+                self.queue.task_done()
+
+    def _write_each(self, batch):
+        for entry in batch:
+            entry.pk = None
+            try:
+                entry.save(force_insert=True)
+            except Exception:
+                logger.exception('Falha ao gravar o registro do log de atividades: %s', entry.action_type)
+
+    def flush(self):
+        """Aguarda a gravação de todos os registros já enfileirados"""
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            self.queue.join()
+
+    def stop(self, timeout=5):
+        """Grava o que estiver na fila e encerra a thread"""
+        if self._thread is None or not self._thread.is_alive() or self._pid != os.getpid():
+            return
+        try:
+            self.queue.put(self._STOP, timeout=timeout)
+        except queue.Full:
+            logger.warning('Fila do log de atividades cheia no encerramento')
+            return
+        self._thread.join(timeout)
+
+
+activity_log_writer = ActivityLogWriter()
+atexit.register(activity_log_writer.stop)
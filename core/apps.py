@@ -4,3 +4,13 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+
+        from contract_manager.database import configure_sqlite_connection
+
+        from . import cache
+
+        connection_created.connect(configure_sqlite_connection, dispatch_uid='configure_sqlite_connection')
+        cache.connect_signals()
@@ -0,0 +1,251 @@
+"""
+Arquivamento de registros antigos em arquivos JSONL compactados.
+
+Registros mais antigos que o período de retenção são gravados em um arquivo
+por mês (``<LOG_ARCHIVE_ROOT>/<tabela>/<AAAA-MM>.jsonl.gz``) e removidos do
+banco pelo comando ``archive_logs``. Os arquivos podem ser lidos de volta como
+instâncias (não salvas) do modelo com ``read_archive``, ou paginados junto com
+os registros do banco com ``ArchiveCursorPaginator``.
+"""
+import gzip
+import json
+import os
+from datetime import date, datetime, time, timedelta
+from itertools import islice
+
+from django.conf import settings
+from django.utils import timezone
+
+from .pagination import CursorPaginator
+
+
+def get_archive_root():
+    return getattr(settings, 'LOG_ARCHIVE_ROOT', os.path.join(settings.MEDIA_ROOT, 'archives'))
+
+
+def month_start(value):
+    """Primeiro dia do mês de uma data"""
+    return date(value.year, value.month, 1)
+
+
+def next_month(month):
+    return date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def day_start(value):
+    """Início do dia (meia-noite local) como datetime com fuso"""
+    return timezone.make_aware(datetime.combine(value, time.min))
+
+
+def day_range(date_from=None, date_to=None):
+    """
+    Converte um intervalo de datas (inclusivo) em um intervalo de datetimes
+    semiaberto ``[início, fim)``, que usa o índice da coluna diretamente.
+    """
+    start = day_start(date_from) if date_from else None
+    end = day_start(date_to + timedelta(days=1)) if date_to else None
+    return start, end
+
+
+def archive_path(model, month):
+    return os.path.join(get_archive_root(), model._meta.db_table, f'{month:%Y-%m}.jsonl.gz')
+
+
+def archived_months(model):
+    """Meses com arquivo de arquivamento, em ordem crescente"""
+    directory = os.path.join(get_archive_root(), model._meta.db_table)
+    if not os.path.isdir(directory):
+        return []
+    months = []
+    for name in os.listdir(directory):
+        if name.endswith('.jsonl.gz'):
+            try:
+                months.append(datetime.strptime(name[:7], '%Y-%m').date())
+            except ValueError:
+                continue
+    return sorted(months)
+
+
+def _json_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if value is None or isinstance(value, (bool, int, float, str, dict, list)):
+        return value
+    return str(value)
+
+
+def serialize_instance(instance):
+    return {
+        field.attname: _json_value(getattr(instance, field.attname))
+        for field in instance._meta.concrete_fields
+    }
+
+
+def deserialize_instance(model, data):
+    values = {}
+    for field in model._meta.concrete_fields:
+        if field.attname in data:
+            value = data[field.attname]
+            values[field.attname] = value if value is None else field.to_python(value)
+    return model(**values)
+
+
+def archive_model(model, date_field, cutoff, batch_size=2000, dry_run=False):
+    """
+    Move os registros com ``date_field`` anterior a ``cutoff`` para os
+    arquivos mensais e os remove do banco.
+
+    Cada mês é gravado (em modo de acréscimo) antes de seus registros serem
+    removidos; uma interrupção entre as duas etapas pode deixar registros
+    repetidos no arquivo, que são ignorados na leitura.
+
+    Retorna ``{mês: quantidade}``.
+    """
+    manager = model._default_manager
+    queryset = manager.filter(**{f'{date_field}__lt': cutoff}).order_by(date_field, 'pk')
+    oldest = queryset.values_list(date_field, flat=True).first()
+    if oldest is None:
+        return {}
+
+    archived = {}
+    month = month_start(timezone.localtime(oldest).date())
+    while day_start(month) < cutoff:
+        start = day_start(month)
+        end = min(day_start(next_month(month)), cutoff)
+        rows = queryset.filter(**{f'{date_field}__gte': start, f'{date_field}__lt': end})
+
+        if dry_run:
+            count = rows.count()
+        else:
+            count = _archive_month(model, rows, archive_path(model, month), batch_size)
+        if count:
+            archived[month] = count
+        month = next_month(month)
+
+    return archived
+
+
+def _archive_month(model, rows, path, batch_size):
+    pks = []
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with gzip.open(path, 'at', encoding='utf-8') as output:
+        for instance in rows.iterator(chunk_size=batch_size):
+            output.write(json.dumps(serialize_instance(instance), ensure_ascii=False))
+            output.write('\n')
+            pks.append(instance.pk)
+
+    for i in range(0, len(pks), batch_size):
+        model._default_manager.filter(pk__in=pks[i:i + batch_size]).delete()
+    return len(pks)
+
+
+def _read_month(model, month, date_field, start=None, end=None, predicate=None):
+    """Registros de um mês arquivado em ``[start, end)`` que passam no ``predicate``"""
+    rows = {}
+    with gzip.open(archive_path(model, month), 'rt', encoding='utf-8') as source:
+        for line in source:
+            instance = deserialize_instance(model, json.loads(line))
+            value = getattr(instance, date_field)
+            if (start and value < start) or (end and value >= end):
+                continue
+            if predicate is None or predicate(instance):
+                # Registros repetidos (arquivamento interrompido) ficam uma vez só
+                rows[instance.pk] = instance
+    return rows.values()
+
+
+def read_archive(model, date_field, start=None, end=None, reverse=False, predicate=None):
+    """
+    Lê os registros arquivados com ``date_field`` em ``[start, end)``,
+    ordenados por ``(date_field, pk)``; com ``reverse``, dos mais recentes aos
+    mais antigos.
+
+    Os arquivos mensais são abertos um de cada vez, na ordem da leitura, e só
+    quando o consumidor chega a eles: quem para de iterar (ex.: ao completar
+    uma página) não lê os meses seguintes. Apenas um mês fica em memória.
+    """
+    first = month_start(timezone.localtime(start).date()) if start else None
+    last = month_start(timezone.localtime(end).date()) if end else None
+    months = [
+        month for month in archived_months(model)
+        if not (first and month < first) and not (last and month > last)
+    ]
+    if reverse:
+        months.reverse()
+
+    for month in months:
+        rows = _read_month(model, month, date_field, start, end, predicate)
+        yield from sorted(rows, key=lambda row: (getattr(row, date_field), row.pk), reverse=reverse)
+
+
+def has_archives_for(model, start=None, end=None):
+    """Indica se algum mês arquivado cruza o intervalo ``[start, end)``"""
+    months = archived_months(model)
+    if not months:
+        return False
+    if start is None:
+        return True
+    first = month_start(timezone.localtime(start).date())
+    last = month_start(timezone.localtime(end).date()) if end else None
+    return any(month >= first and (last is None or month <= last) for month in months)
+
+
+class ArchiveCursorPaginator(CursorPaginator):
+    """
+    Paginação por cursor de um queryset ordenado por ``-date_field`` seguido
+    dos registros arquivados do mesmo modelo, que são mais antigos que os do
+    banco.
+
+    Cada página lê o banco e, se faltarem linhas, os meses arquivados a partir
+    da posição do cursor, parando assim que a página se completa. O total
+    (``count``) é apenas o do banco.
+    """
+
+    def __init__(self, queryset, per_page, date_field, start=None, end=None,
+                 predicate=None, estimate_total=False):
+        super().__init__(queryset, per_page, estimate_total=estimate_total)
+        if [attname for attname, _ in self.ordering] != [date_field, queryset.model._meta.pk.attname]:
+            raise ValueError(f'O queryset deve estar ordenado por -{date_field}')
+        self.date_field = date_field
+        self.start = start
+        self.end = end
+        self.predicate = predicate
+
+    @property
+    def count_is_exact(self):
+        return False
+
+    def _archived(self, position, reverse):
+        """Registros arquivados depois de ``position`` na ordem da página"""
+        start, end = self.start, self.end
+        if position is not None:
+            # Limita os meses lidos à posição do cursor; a comparação exata
+            # (data e pk) é feita abaixo
+            if reverse:
+                start = max(start, position[0]) if start else position[0]
+            else:
+                limit = position[0] + timedelta(microseconds=1)
+                end = min(end, limit) if end else limit
+
+        rows = read_archive(
+            self.queryset.model, self.date_field, start, end,
+            reverse=not reverse, predicate=self.predicate,
+        )
+        key = tuple(position) if position is not None else None
+        for row in rows:
+            row_key = (getattr(row, self.date_field), row.pk)
+            if key is None or (row_key > key if reverse else row_key < key):
+                yield row
+
+    def _fetch(self, position, reverse, limit):
+        if reverse:
+            # Para trás (mais recentes): primeiro os arquivados, depois o banco
+            rows = list(islice(self._archived(position, reverse), limit))
+            if len(rows) < limit:
+                rows.extend(super()._fetch(position, reverse, limit - len(rows)))
+            return rows
+
+        rows = super()._fetch(position, reverse, limit)
+        if len(rows) < limit:
+            rows.extend(islice(self._archived(position, reverse), limit - len(rows)))
+        return rows
@@ -0,0 +1,357 @@
+"""
+Camada de cache do projeto.
+
+Três níveis, do mais rápido ao mais amplo:
+
+``request``
+    Memória da requisição atual, descartada ao fim dela. Fora de uma
+    requisição (comandos, threads) não guarda nada.
+``local``
+    LRU com expiração na memória do processo (``CACHE_LOCAL_MAXSIZE``
+    entradas, ``CACHE_LOCAL_TIMEOUT`` segundos).
+``shared``
+    O cache do Django (``CACHE_SHARED_ALIAS``, por padrão ``default``),
+    configurado por ``CACHE_URL``: locmem, arquivos ou Redis.
+
+As entradas são associadas a etiquetas (``contract``, ``contract_status``,
+``contract_type``, ``system_settings``...). Cada etiqueta tem uma versão no
+cache compartilhado, que faz parte da chave das entradas; invalidar uma
+etiqueta é trocar a versão, o que torna inalcançáveis as entradas antigas de
+todos os níveis e de todos os processos. As versões são lidas uma vez por
+requisição. Os sinais de save/delete dos modelos em ``CACHE_TAG_MODELS``
+invalidam as etiquetas correspondentes após o commit.
+
+Com o cache padrão (locmem) o cache "compartilhado" e as versões das
+etiquetas são de cada processo: a invalidação só alcança o processo que
+alterou o modelo. ``shared_cache_is_process_local`` permite que os usuários
+reduzam a validade das entradas nesse caso.
+
+Uso::
+
+    statuses = get_or_set(
+        'contracts.statuses', None, lambda: list(ContractStatus.objects.all()),
+        tags=['contract_status'], timeout=3600,
+    )
+
+    @cached_queryset(tags=['contract', 'contract_status'])
+    def expiring_contracts(days, today=None):
+        return Contract.objects.filter(...)
+
+    @cached_fragment(tags=['contract'], vary_on_user=False)
+    def expiration_calendar(request):
+        ...
+"""
+import functools
+import hashlib
+import json
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from asgiref.local import Local
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.signals import request_finished, request_started
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.http import HttpResponse
+
+KEY_PREFIX = 'core:cache'
+TAG_KEY = f'{KEY_PREFIX}:tag:{{tag}}'
+
+# Modelos cujas alterações invalidam as etiquetas indicadas
+CACHE_TAG_MODELS = {
+    'contracts.Contract': ['contract'],
+    'contracts.ContractReminder': ['contract_reminder'],
+    'contracts.ContractStatus': ['contract_status'],
+    'contracts.ContractType': ['contract_type'],
+    'core.SystemSettings': ['system_settings'],
+}
+
+MISSING = object()
+
+
+class RequestCache:
+    """Dicionário válido apenas durante a requisição atual"""
+
+    def __init__(self):
+        self._local = Local()
+
+    def start(self):
+        self._local.data = {}
+
+    def finish(self):
+        self._local.data = None
+
+    @property
+    def data(self):
+        return getattr(self._local, 'data', None)
+
+    def get(self, key, default=None):
+        data = self.data
+        return default if data is None else data.get(key, default)
+
+    def set(self, key, value, timeout=None):
+        data = self.data
+        if data is not None:
+            data[key] = value
+
+    def delete(self, key):
+        data = self.data
+        if data is not None:
+            data.pop(key, None)
+
+    def clear(self):
+        data = self.data
+        if data is not None:
+            data.clear()
+
+
+class LocalCache:
+    """LRU com expiração, em memória do processo"""
+
+    def __init__(self, maxsize=None, timeout=None):
+        self._maxsize = maxsize
+        self._timeout = timeout
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def maxsize(self):
+        return self._maxsize or getattr(settings, 'CACHE_LOCAL_MAXSIZE', 1024)
+
+    @property
+    def default_timeout(self):
+        return self._timeout or getattr(settings, 'CACHE_LOCAL_TIMEOUT', 300)
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+            expires, value = item
+            if expires is not None and expires < time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, timeout=None):
+        timeout = self.default_timeout if timeout is None else timeout
+        expires = time.monotonic() + timeout if timeout else None
+        with self._lock:
+            self._data[key] = (expires, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+request_cache = RequestCache()
+local_cache = LocalCache()
+
+
+def get_shared_cache():
+    return caches[getattr(settings, 'CACHE_SHARED_ALIAS', 'default')]
+
+
+def shared_cache_is_process_local():
+    """Indica se o cache compartilhado é, na verdade, de cada processo (locmem)"""
+    return isinstance(get_shared_cache(), LocMemCache)
+
+
+def get_cache(tier):
+    """Retorna o cache de um nível: 'request', 'local' ou 'shared'"""
+    if tier == 'request':
+        return request_cache
+    if tier == 'local':
+        return local_cache
+    if tier == 'shared':
+        return get_shared_cache()
+    raise ValueError(f'Nível de cache desconhecido: {tier}')
+
+
+# Etiquetas
+
+def get_tag_versions(tags):
+    """Versão atual de cada etiqueta (lidas do cache compartilhado uma vez por requisição)"""
+    versions = {}
+    missing = []
+    for tag in tags:
+        version = request_cache.get(TAG_KEY.format(tag=tag))
+        if version is None:
+            missing.append(tag)
+        else:
+            versions[tag] = version
+
+    if missing:
+        shared = get_shared_cache()
+        keys = {TAG_KEY.format(tag=tag): tag for tag in missing}
+        found = shared.get_many(list(keys))
+        for key, tag in keys.items():
+            version = found.get(key)
+            if version is None:
+                shared.add(key, uuid.uuid4().hex[:12], None)
+                version = shared.get(key)
+            versions[tag] = version
+            request_cache.set(key, version)
+    return versions
+
+
+def invalidate_tags(*tags):
+    """Troca a versão das etiquetas, descartando as entradas associadas a elas"""
+    shared = get_shared_cache()
+    for tag in tags:
+        key = TAG_KEY.format(tag=tag)
+        version = uuid.uuid4().hex[:12]
+        shared.set(key, version, None)
+        request_cache.set(key, version)
+
+
+def make_key(name, params=None, tags=()):
+    """Chave de uma entrada: nome, parâmetros (em hash) e versões das etiquetas"""
+    raw = json.dumps(params, sort_keys=True, default=str)
+    digest = hashlib.md5(raw.encode(), usedforsecurity=False).hexdigest()
+    versions = get_tag_versions(sorted(tags))
+    suffix = '.'.join(str(versions[tag]) for tag in sorted(tags))
+    return f'{KEY_PREFIX}:{name}:{digest}:{suffix}'
+
+
+def _store(cache, key, value, timeout=None):
+    # No cache do Django, timeout=None significa "nunca expira"; aqui, o padrão do nível
+    if timeout is None:
+        cache.set(key, value)
+    else:
+        cache.set(key, value, timeout)
+
+
+def get_or_set(name, params, compute, tags=(), timeout=None, tier='shared'):
+    """Retorna a entrada em cache ou a calcula com ``compute()`` e a guarda"""
+    cache = get_cache(tier)
+    key = make_key(name, params, tags)
+    value = cache.get(key, MISSING)
+    if value is MISSING:
+        value = compute()
+        _store(cache, key, value, timeout)
+    return value
+
+
+# Decoradores
+
+def cached(name=None, tags=(), timeout=None, tier='shared', key=None):
+    """
+    Guarda o resultado da função, com chave pelos argumentos (ou por
+    ``key(*args, **kwargs)``).
+    """
+    def decorator(func):
+        cache_name = name or f'{func.__module__}.{func.__qualname__}'
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            params = key(*args, **kwargs) if key else [args, kwargs]
+            return get_or_set(
+                cache_name, params, lambda: func(*args, **kwargs),
+                tags=tags, timeout=timeout, tier=tier,
+            )
+        return wrapper
+    return decorator
+
+
+def cache_queryset(queryset, tags=(), name='queryset', timeout=None, tier='shared'):
+    """
+    Avalia o queryset e guarda a lista de resultados, com chave pelo SQL
+    gerado (que inclui os filtros aplicados).
+    """
+    params = [queryset.db, str(queryset.query)]
+    return get_or_set(name, params, lambda: list(queryset), tags=tags, timeout=timeout, tier=tier)
+
+
+def cached_queryset(name=None, tags=(), timeout=None, tier='shared'):
+    """
+    Para funções que retornam um queryset a partir de parâmetros de filtro:
+    guarda a lista de resultados, com chave pelos argumentos.
+    """
+    def decorator(func):
+        cache_name = name or f'{func.__module__}.{func.__qualname__}'
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            return get_or_set(
+                cache_name, [args, kwargs], lambda: list(func(*args, **kwargs)),
+                tags=tags, timeout=timeout, tier=tier,
+            )
+        return wrapper
+    return decorator
+
+
+def cached_fragment(name=None, tags=(), timeout=None, tier='shared', vary_on_user=True):
+    """
+    Para views que renderizam fragmentos (respostas parciais, AJAX): guarda o
+    conteúdo das respostas 200 a GET, com chave pelo caminho, pelos parâmetros
+    da query string e, com ``vary_on_user``, pelo usuário.
+
+    Não use em páginas que exibem mensagens (``django.contrib.messages``) ou
+    outros dados de uso único.
+    """
+    def decorator(view):
+        cache_name = name or f'{view.__module__}.{view.__qualname__}'
+
+        @functools.wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view(request, *args, **kwargs)
+
+            params = [request.path, sorted(request.GET.lists())]
+            if vary_on_user:
+                params.append(getattr(request.user, 'pk', None))
+            cache = get_cache(tier)
+            key = make_key(cache_name, params, tags)
+
+            entry = cache.get(key)
+            if entry is not None:
+                content, content_type = entry
+                return HttpResponse(content, content_type=content_type)
+
+            response = view(request, *args, **kwargs)
+            if hasattr(response, 'render') and not getattr(response, 'is_rendered', True):
+                response.render()
+            if response.status_code == 200 and not response.streaming:
+                _store(cache, key, (response.content, response.get('Content-Type')), timeout)
+            return response
+        return wrapper
+    return decorator
+
+
+# Sinais
+
+def _start_request(**kwargs):
+    request_cache.start()
+
+
+def _finish_request(**kwargs):
+    request_cache.finish()
+
+
+def _invalidate_model_tags(sender, **kwargs):
+    tags = CACHE_TAG_MODELS.get(sender._meta.label, [])
+    if tags:
+        transaction.on_commit(lambda: invalidate_tags(*tags))
+
+
+def connect_signals():
+    """Registra os receptores (chamado em ``CoreConfig.ready``)"""
+    request_started.connect(_start_request, dispatch_uid='core_cache_request_started')
+    request_finished.connect(_finish_request, dispatch_uid='core_cache_request_finished')
+    for label in CACHE_TAG_MODELS:
+        uid = f'core_cache_invalidate_{label}'
+        post_save.connect(_invalidate_model_tags, sender=label, dispatch_uid=f'{uid}_save')
+        post_delete.connect(_invalidate_model_tags, sender=label, dispatch_uid=f'{uid}_delete')
@@ -0,0 +1,68 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from contracts.models import ContractHistory
+from core.archive import archive_model, get_archive_root
+from core.models import ActivityLog
+
+
+class Command(BaseCommand):
+    help = (
+        'Move registros antigos do log de atividades e do histórico de '
+        'contratos para arquivos mensais compactados (JSONL)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--activity-days',
+            type=int,
+            default=getattr(settings, 'ACTIVITY_LOG_RETENTION_DAYS', 365),
+            help='Mantém no banco os registros de atividade dos últimos N dias',
+        )
+        parser.add_argument(
+            '--history-days',
+            type=int,
+            default=getattr(settings, 'CONTRACT_HISTORY_RETENTION_DAYS', 730),
+            help='Mantém no banco o histórico de contratos dos últimos N dias',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=2000,
+            help='Registros lidos e removidos por vez (padrão: 2000)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Apenas informa quantos registros seriam arquivados',
+        )
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        targets = [
+            (ActivityLog, 'timestamp', options['activity_days']),
+            (ContractHistory, 'change_date', options['history_days']),
+        ]
+
+        for model, date_field, days in targets:
+            cutoff = now - timedelta(days=days)
+            archived = archive_model(
+                model, date_field, cutoff,
+                batch_size=options['batch_size'],
+                dry_run=options['dry_run'],
+            )
+            name = model._meta.verbose_name_plural
+            for month, count in archived.items():
+                self.stdout.write(f'  {name} {month:%m/%Y}: {count}')
+
+            total = sum(archived.values())
+            verb = 'seriam arquivados' if options['dry_run'] else 'arquivados'
+            self.stdout.write(self.style.SUCCESS(
+                f'{total} registro(s) de {name} {verb} (anteriores a {cutoff:%d/%m/%Y})'
+            ))
+
+        if not options['dry_run']:
+            self.stdout.write(f'Arquivos em {get_archive_root()}')
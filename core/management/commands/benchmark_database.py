@@ -0,0 +1,164 @@
+import multiprocessing
+import os
+import shutil
+import statistics
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, close_old_connections, connections
+from django.utils import timezone
+
+from contract_manager.database import parse_database_url
+
+
+BENCHMARK_TABLE = 'benchmark_writes'
+
+CREATE_TABLE_SQL = {
+    'sqlite': (
+        f'CREATE TABLE IF NOT EXISTS {BENCHMARK_TABLE} ('
+        'id integer PRIMARY KEY AUTOINCREMENT, worker integer NOT NULL, '
+        'details text NOT NULL, created_at datetime NOT NULL)'
+    ),
+    'postgresql': (
+        f'CREATE TABLE IF NOT EXISTS {BENCHMARK_TABLE} ('
+        'id bigserial PRIMARY KEY, worker integer NOT NULL, '
+        'details text NOT NULL, created_at timestamp with time zone NOT NULL)'
+    ),
+}
+
+
+def run_worker(args):
+    """
+    Executa as gravações de um worker. Cada gravação é uma "requisição":
+    um INSERT em autocommit seguido de ``close_old_connections``, como no
+    fim de uma requisição do Django (que fecha a conexão se CONN_MAX_AGE = 0).
+    """
+    alias, worker, writes = args
+    connection = connections[alias]
+    latencies = []
+    errors = 0
+
+    started = time.time()
+    for i in range(writes):
+        start = time.perf_counter()
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f'INSERT INTO {BENCHMARK_TABLE} (worker, details, created_at) VALUES (%s, %s, %s)',
+                    [worker, f'registro {i} do worker {worker}', timezone.now()],
+                )
+        except OperationalError:
+            errors += 1
+        else:
+            latencies.append(time.perf_counter() - start)
+        close_old_connections()
+    finished = time.time()
+
+    connection.close()
+    return started, finished, latencies, errors
+
+
+class Command(BaseCommand):
+    help = (
+        'Teste de carga de gravações concorrentes: compara gravações/s com a '
+        'configuração antiga do banco (sem conexões persistentes nem PRAGMAs) '
+        'e com a atual (DATABASE_URL)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=4,
+            help='Processos gravando ao mesmo tempo (padrão: 4)',
+        )
+        parser.add_argument(
+            '--writes',
+            type=int,
+            default=500,
+            help='Gravações por worker (padrão: 500)',
+        )
+        parser.add_argument(
+            '--database-url',
+            help=(
+                'Banco usado no teste (padrão: SQLite em um diretório temporário). '
+                f'Apenas a tabela {BENCHMARK_TABLE} é criada e removida.'
+            ),
+        )
+
+    def handle(self, *args, **options):
+        temp_dir = None
+        url = options['database_url']
+        if not url:
+            temp_dir = tempfile.mkdtemp(prefix='benchmark-db-')
+            url = 'sqlite:///' + os.path.join(temp_dir, 'benchmark.sqlite3')
+
+        try:
+            tuned = parse_database_url(url, conn_max_age=60, conn_health_checks=True)
+            modes = [
+                ('antiga', self.legacy_config(tuned)),
+                ('atual', tuned),
+            ]
+
+            self.stdout.write(
+                f'{options["workers"]} worker(s) x {options["writes"]} gravações, '
+                f'{tuned["ENGINE"].rsplit(".", 1)[-1]}'
+            )
+            results = []
+            for label, config in modes:
+                if config['ENGINE'].endswith('sqlite3'):
+                    # Arquivo próprio por modo: o journal_mode fica gravado no arquivo
+                    config['NAME'] = f'{config["NAME"]}.{label}'
+                results.append(self.run_mode(label, config, options['workers'], options['writes']))
+
+            if results[0] and results[1]:
+                self.stdout.write(self.style.SUCCESS(f'{results[1] / results[0]:.1f}x gravações/s'))
+        finally:
+            if temp_dir:
+                shutil.rmtree(temp_dir, ignore_errors=True)
+
+    def legacy_config(self, tuned):
+        """A configuração anterior: conexão por requisição e SQLite sem PRAGMAs"""
+        config = dict(tuned, CONN_MAX_AGE=0, CONN_HEALTH_CHECKS=False)
+        config.pop('PRAGMAS', None)
+        return config
+
+    def run_mode(self, label, config, workers, writes):
+        alias = f'benchmark_{label}'
+        connections.settings[alias] = connections.configure_settings(
+            {'default': connections.settings['default'], alias: config}
+        )[alias]
+
+        connection = connections[alias]
+        vendor = connection.vendor
+        if vendor not in CREATE_TABLE_SQL:
+            raise CommandError(f'Banco de dados não suportado no teste: {vendor}')
+        with connection.cursor() as cursor:
+            cursor.execute(f'DROP TABLE IF EXISTS {BENCHMARK_TABLE}')
+            cursor.execute(CREATE_TABLE_SQL[vendor])
+        # Processos filhos abrem as próprias conexões
+        connections.close_all()
+
+        context = multiprocessing.get_context('fork')
+        with context.Pool(workers) as pool:
+            runs = pool.map(run_worker, [(alias, worker, writes) for worker in range(workers)])
+
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT COUNT(*) FROM {BENCHMARK_TABLE}')
+            stored = cursor.fetchone()[0]
+            cursor.execute(f'DROP TABLE {BENCHMARK_TABLE}')
+        connection.close()
+
+        elapsed = max(run[1] for run in runs) - min(run[0] for run in runs)
+        latencies = sorted(latency for run in runs for latency in run[2])
+        errors = sum(run[3] for run in runs)
+        rate = stored / elapsed if elapsed else 0
+
+        p95 = latencies[int(len(latencies) * 0.95) - 1] if latencies else 0
+        self.stdout.write(
+            f'  {label:<7} {rate:9.0f} gravações/s  {stored:>6} gravadas  {errors:>4} erro(s)  '
+            f'mediana {statistics.median(latencies) * 1000 if latencies else 0:7.2f} ms  '
+            f'p95 {p95 * 1000:7.2f} ms'
+        )
+        return rate
@@ -0,0 +1,95 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from core.models import SystemSettings
+from core.settings_registry import settings_registry
+
+
+BENCHMARK_PREFIX = 'benchmark-'
+
+BENCHMARK_SETTINGS = [
+    ('text', 'Sistema de Contratos'),
+    ('number', '30'),
+    ('boolean', 'true'),
+    ('json', '{"dias": [7, 15, 30], "email": true}'),
+    ('date', '2024-12-31'),
+]
+
+
+class RollbackBenchmark(Exception):
+    """Usada para desfazer as configurações de teste"""
+
+
+class Command(BaseCommand):
+    help = (
+        'Compara o custo de leitura de SystemSettings direto do banco com o '
+        'registro em memória'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--calls',
+            type=int,
+            default=10000,
+            help='Leituras medidas em cada modo (padrão: 10000)',
+        )
+
+    def handle(self, *args, **options):
+        calls = options['calls']
+        try:
+            with transaction.atomic():
+                keys = self.create_settings()
+                settings_registry.invalidate()
+                self.run(keys, calls)
+                raise RollbackBenchmark
+        except RollbackBenchmark:
+            pass
+        finally:
+            settings_registry.invalidate()
+
+    def create_settings(self):
+        keys = []
+        for setting_type, value in BENCHMARK_SETTINGS:
+            key = f'{BENCHMARK_PREFIX}{setting_type}'
+            SystemSettings.objects.create(
+                key=key, name=key, value=value, setting_type=setting_type
+            )
+            keys.append(key)
+        return keys
+
+    def run(self, keys, calls):
+        def from_database(key):
+            return SystemSettings.objects.get(key=key).get_value()
+
+        modes = [
+            ('banco (consulta + conversão)', from_database),
+            ('registro em memória', SystemSettings.get_setting),
+        ]
+
+        # Primeira leitura carrega o registro
+        SystemSettings.get_setting(keys[0])
+
+        self.stdout.write(f'{calls} leituras por modo, {len(keys)} chaves alternadas')
+        results = []
+        for label, read in modes:
+            queries = []
+            with connection.execute_wrapper(lambda execute, *args: queries.append(1) or execute(*args)):
+                start = time.perf_counter()
+                for i in range(calls):
+                    read(keys[i % len(keys)])
+                elapsed = time.perf_counter() - start
+            per_call = elapsed / calls * 1e6
+            results.append(per_call)
+            self.stdout.write(
+                f'  {label:<30} {per_call:10.2f} µs/leitura  {len(queries):>6} consulta(s)'
+            )
+
+        start = time.perf_counter()
+        for _ in range(calls // len(keys)):
+            SystemSettings.get_settings(keys)
+        per_call = (time.perf_counter() - start) / (calls // len(keys)) * 1e6
+        self.stdout.write(f'  {"get_settings (" + str(len(keys)) + " chaves)":<30} {per_call:10.2f} µs/chamada')
+
+        self.stdout.write(self.style.SUCCESS(f'{results[0] / results[1]:.0f}x mais rápido'))
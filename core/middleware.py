@@ -0,0 +1,45 @@
+"""
+Middlewares do projeto.
+"""
+import time
+
+from django.conf import settings
+
+SESSION_REFRESHED_KEY = '_session_refreshed_at'
+
+
+class SessionRefreshMiddleware:
+    """
+    Expiração deslizante da sessão sem gravá-la a cada requisição.
+
+    Substitui ``SESSION_SAVE_EVERY_REQUEST``: a sessão só é marcada como
+    alterada (e então gravada, renovando a expiração no banco e no cookie)
+    quando já passou ``SESSION_REFRESH_FRACTION`` de ``SESSION_COOKIE_AGE``
+    desde a última renovação. Deve ficar depois do ``SessionMiddleware``.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        session = getattr(request, 'session', None)
+        if session is not None:
+            self.refresh(session)
+        return response
+
+    def refresh(self, session):
+        # Sessões não usadas na requisição não são lidas só para a renovação;
+        # inexistentes, expiradas ou encerradas (logout) não são recriadas
+        # (session.get carrega a sessão e descarta uma chave inválida)
+        if not session.accessed or session.session_key is None:
+            return
+        refreshed_at = session.get(SESSION_REFRESHED_KEY, 0)
+        if session.is_empty():
+            return
+
+        now = int(time.time())
+        interval = settings.SESSION_COOKIE_AGE * getattr(settings, 'SESSION_REFRESH_FRACTION', 0.1)
+        # Se a sessão já será gravada, a renovação sai de graça
+        if session.modified or now - refreshed_at >= interval:
+            session[SESSION_REFRESHED_KEY] = now
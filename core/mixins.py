@@ -12,6 +12,9 @@ from django.shortcuts import redirect
 from django.urls import reverse_lazy
 from django.utils.translation import gettext_lazy as _
 
+from .pagination import CursorPage
+from .utils import cursor_paginate_queryset
+
 
 class LoginRequiredMixin(BaseLoginRequiredMixin):
     """
@@ -169,6 +172,41 @@ class PaginationMixin:
         return context
 
 
+class CursorPaginationMixin:
+    """
+    Mixin to paginate list views by keyset (``?cursor=``) instead of page number.
+    
+    With ``pagination_mode = 'cursor'`` the view always uses cursor
+    pagination; with ``'page'`` it does so only when the request has a
+    ``cursor`` parameter. Querysets whose ordering cannot be used as a keyset
+    fall back to the regular paginator.
+    """
+    pagination_mode = 'cursor'
+    estimate_total = True
+
+    def use_cursor_pagination(self):
+        return self.pagination_mode == 'cursor' or 'cursor' in self.request.GET
+
+    def paginate_queryset(self, queryset, page_size):
+        if self.use_cursor_pagination():
+            data = cursor_paginate_queryset(
+                queryset, self.request, page_size, estimate_total=self.estimate_total
+            )
+            if data is not None:
+                page = data['page_obj']
+                return data['paginator'], page, page.object_list, data['is_paginated']
+        return super().paginate_queryset(queryset, page_size)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['cursor_pagination'] = isinstance(context.get('page_obj'), CursorPage)
+        query = self.request.GET.copy()
+        query.pop('cursor', None)
+        query.pop(self.page_kwarg, None)
+        context['pagination_query'] = query.urlencode()
+        return context
+
+
 class FilterMixin:
     """
     Mixin to add filtering to list views.
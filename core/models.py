@@ -7,10 +7,13 @@ from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from django.contrib.auth.models import AbstractUser, Group, Permission
 from django.core.validators import FileExtensionValidator
+from django.db.models.functions import Lower
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 from django.core.exceptions import ValidationError
 
+from .settings_registry import settings_registry
+
 
 def user_directory_path(instance, filename):
     """
@@ -35,6 +38,12 @@ class User(AbstractUser):
         verbose_name = _('usuário')
         verbose_name_plural = _('usuários')
         ordering = ['-date_joined']
+        indexes = [
+            # Buscas por prefixo do autocompletar (contracts.autocomplete)
+            models.Index(Lower('username'), name='user_username_lower_idx'),
+            models.Index(Lower('first_name'), name='user_first_name_lower_idx'),
+            models.Index(Lower('last_name'), name='user_last_name_lower_idx'),
+        ]
     
     def __str__(self):
         return self.get_full_name() or self.username
@@ -249,9 +258,11 @@ class ActivityLog(models.Model):
         help_text=_('Informações do navegador do usuário')
     )
     
+    # Preenchido ao montar o registro, não na gravação em lote (veja log_action)
     timestamp = models.DateTimeField(
         _('data e hora'),
-        auto_now_add=True,
+        default=timezone.now,
+        editable=False,
         db_index=True
     )
     
@@ -268,7 +279,13 @@ class ActivityLog(models.Model):
     def log_action(cls, user, action_type, details=None, request=None):
         """
         Método auxiliar para registrar uma ação no log de atividades
+        
+        O registro é gravado em segundo plano, em lote (veja core.activity);
+        o objeto retornado só tem ``pk`` depois da gravação. A data e hora são
+        as do momento da ação, não as da gravação.
         """
+        from .activity import activity_log_writer
+        
         ip_address = None
         user_agent = None
         
@@ -281,13 +298,14 @@ class ActivityLog(models.Model):
             
             user_agent = request.META.get('HTTP_USER_AGENT', '')[:500]
         
-        return cls.objects.create(
+        return activity_log_writer.submit(cls(
             user=user,
             action_type=action_type,
             details=details,
             ip_address=ip_address,
-            user_agent=user_agent
-        )
+            user_agent=user_agent,
+            timestamp=timezone.now()
+        ))
 
 
 class SystemSettings(models.Model):
@@ -390,12 +408,13 @@ class SystemSettings(models.Model):
     
     @classmethod
     def get_setting(cls, key, default=None):
-        """Obtém uma configuração pelo nome"""
-        try:
-            setting = cls.objects.get(key=key)
-            return setting.get_value()
-        except cls.DoesNotExist:
-            return default
+        """Obtém uma configuração pelo nome (do registro em memória)"""
+        return settings_registry.get(key, default)
+    
+    @classmethod
+    def get_settings(cls, keys, default=None):
+        """Obtém várias configurações de uma vez, como ``{chave: valor}``"""
+        return settings_registry.get_many(keys, default)
     
     @classmethod
     def set_setting(cls, key, value, **kwargs):
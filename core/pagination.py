@@ -0,0 +1,241 @@
+"""
+Keyset (cursor) pagination.
+
+Instead of ``OFFSET n`` and a ``COUNT(*)`` over the whole filtered set, each
+page is fetched with a ``WHERE`` on the ordering columns of the last row seen
+(e.g. ``(timestamp, id) < (t, 42)``), so every page costs the same no matter
+how deep it is. The position travels between requests as an opaque
+``?cursor=`` token.
+
+Only querysets ordered by concrete, non-null columns of the model can be
+paginated this way; the primary key is appended to the ordering as a
+tie-breaker.
+"""
+import base64
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+
+from django.core.exceptions import FieldDoesNotExist
+from django.core.paginator import InvalidPage
+from django.db import connections
+from django.db.models import Q
+
+# Rows counted exactly before ``estimate_count`` falls back to an estimate
+ESTIMATE_COUNT_LIMIT = 1000
+
+
+class InvalidCursor(InvalidPage):
+    pass
+
+
+def get_keyset_ordering(queryset):
+    """
+    Return the ordering of ``queryset`` as ``[(attname, descending), ...]``,
+    with the primary key appended, or None if it cannot be used as a keyset.
+    """
+    query = queryset.query
+    if query.extra_order_by:
+        return None
+    ordering = query.order_by or (query.default_ordering and queryset.model._meta.ordering) or []
+
+    opts = queryset.model._meta
+    keyset = []
+    for item in ordering:
+        if not isinstance(item, str):
+            return None
+        descending = item.startswith('-')
+        name = item.lstrip('-')
+        if name == 'pk':
+            name = opts.pk.name
+        try:
+            field = opts.get_field(name)
+        except FieldDoesNotExist:
+            return None
+        if not field.concrete or field.is_relation or field.null:
+            return None
+        keyset.append((field.attname, descending))
+
+    if opts.pk.attname not in {attname for attname, _ in keyset}:
+        descending = keyset[-1][1] if keyset else False
+        keyset.append((opts.pk.attname, descending))
+    return keyset
+
+
+def _encode_value(value):
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def encode_cursor(values, reverse=False):
+    payload = json.dumps({'v': [_encode_value(v) for v in values], 'r': int(reverse)},
+                         separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """Return ``(values, reverse)`` from a cursor token"""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return list(payload['v']), bool(payload.get('r'))
+    except (ValueError, TypeError, KeyError):
+        raise InvalidCursor('Invalid cursor')
+
+
+def estimate_count(queryset, limit=ESTIMATE_COUNT_LIMIT):
+    """
+    Count ``queryset`` without scanning all of it.
+
+    Up to ``limit`` rows are counted exactly (``COUNT`` over a ``LIMIT``
+    subquery). Beyond that, PostgreSQL's planner estimate is used; other
+    databases report ``limit`` as a lower bound.
+
+    Returns ``(count, exact)``.
+    """
+    queryset = queryset.order_by()
+    counted = queryset[:limit + 1].count()
+    if counted <= limit:
+        return counted, True
+
+    connection = connections[queryset.db]
+    if connection.vendor == 'postgresql':
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return max(int(plan[0]['Plan']['Plan Rows']), limit + 1), False
+    return limit, False
+
+
+class CursorPaginator:
+    """
+    Paginate a queryset by keyset.
+
+    ``count`` is exact by default; with ``estimate_total=True`` it comes from
+    ``estimate_count`` and ``count_is_exact`` tells which one it is.
+    """
+
+    def __init__(self, queryset, per_page, estimate_total=False):
+        self.ordering = get_keyset_ordering(queryset)
+        if self.ordering is None:
+            raise ValueError('The queryset ordering cannot be used for cursor pagination')
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.estimate_total = estimate_total
+        self._count = None
+        self._count_is_exact = True
+
+    @property
+    def count(self):
+        if self._count is None:
+            if self.estimate_total:
+                self._count, self._count_is_exact = estimate_count(self.queryset)
+            else:
+                self._count = self.queryset.count()
+        return self._count
+
+    @property
+    def count_is_exact(self):
+        self.count
+        return self._count_is_exact
+
+    def _order_by(self, reverse=False):
+        return [
+            f'-{attname}' if descending != reverse else attname
+            for attname, descending in self.ordering
+        ]
+
+    def _position(self, values):
+        """Convert decoded cursor values back to Python values of each column"""
+        if len(values) != len(self.ordering):
+            raise InvalidCursor('Invalid cursor')
+        fields = {f.attname: f for f in self.queryset.model._meta.concrete_fields}
+        try:
+            return [
+                fields[attname].to_python(value)
+                for (attname, _), value in zip(self.ordering, values)
+            ]
+        except Exception:
+            raise InvalidCursor('Invalid cursor')
+
+    def _after(self, position, reverse=False):
+        """Rows that come after ``position`` in the (possibly reversed) ordering"""
+        condition = Q()
+        equal = {}
+        for (attname, descending), value in zip(self.ordering, position):
+            lookup = 'lt' if descending != reverse else 'gt'
+            condition |= Q(**equal, **{f'{attname}__{lookup}': value})
+            equal[attname] = value
+        return condition
+
+    def _values(self, obj):
+        return [getattr(obj, attname) for attname, _ in self.ordering]
+
+    def _fetch(self, position, reverse, limit):
+        """Up to ``limit`` rows after ``position`` in the (possibly reversed) ordering"""
+        queryset = self.queryset.order_by(*self._order_by(reverse))
+        if position is not None:
+            queryset = queryset.filter(self._after(position, reverse))
+        return list(queryset[:limit])
+
+    def page(self, cursor=None):
+        position, reverse = None, False
+        if cursor:
+            values, reverse = decode_cursor(cursor)
+            position = self._position(values)
+
+        rows = self._fetch(position, reverse, self.per_page + 1)
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+
+        if reverse:
+            rows.reverse()
+            has_previous, has_next = has_more, True
+        else:
+            has_previous, has_next = position is not None, has_more
+
+        return CursorPage(
+            rows, self,
+            next_cursor=encode_cursor(self._values(rows[-1])) if rows and has_next else None,
+            previous_cursor=(
+                encode_cursor(self._values(rows[0]), reverse=True)
+                if rows and has_previous else None
+            ),
+        )
+
+
+class CursorPage:
+    """A page of a ``CursorPaginator``, with the tokens of its neighbours"""
+
+    def __init__(self, object_list, paginator, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return f'<CursorPage of {len(self.object_list)} items>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
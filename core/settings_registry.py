@@ -0,0 +1,67 @@
+"""
+Registro em memória das configurações do sistema (``SystemSettings``).
+
+Todas as configurações são carregadas de uma vez e convertidas para o tipo de
+cada uma (``get_value``) só nessa carga; a leitura passa a ser uma consulta a
+um dicionário.
+
+O dicionário fica no nível ``local`` de ``core.cache`` (memória do processo),
+associado à etiqueta ``system_settings``, que os sinais de save/delete de
+``SystemSettings`` invalidam após o commit. A versão da etiqueta é lida uma
+vez por requisição (a cada leitura, fora de requisições). Para que a
+invalidação alcance todos os workers, o cache compartilhado precisa ser de
+fato compartilhado (Redis, arquivos); com locmem, os demais processos só
+recarregam quando a entrada expira (``SYSTEM_SETTINGS_CACHE_TIMEOUT``).
+"""
+import copy
+
+from django.conf import settings
+
+from .cache import get_or_set, invalidate_tags
+
+SETTINGS_CACHE_NAME = 'core.system_settings'
+SETTINGS_CACHE_TAGS = ['system_settings']
+
+
+class SettingsRegistry:
+    """Configurações do sistema já convertidas, recarregadas quando a etiqueta muda"""
+
+    @property
+    def timeout(self):
+        return getattr(settings, 'SYSTEM_SETTINGS_CACHE_TIMEOUT', 60)
+
+    def _load(self):
+        from .models import SystemSettings
+
+        return {setting.key: setting.get_value() for setting in SystemSettings.objects.all()}
+
+    def _values(self):
+        return get_or_set(
+            SETTINGS_CACHE_NAME, None, self._load,
+            tags=SETTINGS_CACHE_TAGS, timeout=self.timeout, tier='local',
+        )
+
+    def get(self, key, default=None):
+        values = self._values()
+        if key not in values:
+            return default
+        value = values[key]
+        # JSON é mutável: cada chamada recebe a sua cópia
+        return copy.deepcopy(value) if isinstance(value, (dict, list)) else value
+
+    def get_many(self, keys, default=None):
+        return {key: self.get(key, default) for key in keys}
+
+    def all(self):
+        return copy.deepcopy(self._values())
+
+    def invalidate(self):
+        """
+        Descarta as configurações em todos os processos. Os sinais de
+        ``SystemSettings`` já fazem isso; alterações feitas com ``update()``
+        ou ``bulk_create`` precisam chamá-lo.
+        """
+        invalidate_tags(*SETTINGS_CACHE_TAGS)
+
+
+settings_registry = SettingsRegistry()
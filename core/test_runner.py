@@ -0,0 +1,24 @@
+"""
+Runner dos testes do projeto (``TEST_RUNNER``).
+"""
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+class TestRunner(DiscoverRunner):
+    """
+    ``DiscoverRunner`` com o log de atividades gravado na hora.
+
+    A thread de ``core.activity`` gravaria os registros fora da transação de
+    cada teste; os testes do próprio writer ligam o modo assíncrono com
+    ``override_settings(ACTIVITY_LOG_ASYNC=True)``.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.activity_log_settings = override_settings(ACTIVITY_LOG_ASYNC=False)
+        self.activity_log_settings.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self.activity_log_settings.disable()
+        super().teardown_test_environment(**kwargs)
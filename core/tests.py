@@ -1,3 +1,398 @@
-from django.test import TestCase
+import shutil
+import tempfile
+import time
+from importlib import import_module
+from datetime import datetime, timedelta, timezone as dt_timezone
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+
+from . import archive
+from .activity import ActivityLogWriter, activity_log_writer
+from .middleware import SESSION_REFRESHED_KEY, SessionRefreshMiddleware
+from .archive import ArchiveCursorPaginator, archive_model
+from .cache import cached_fragment, cached_queryset, local_cache, make_key
+from .models import ActivityLog, SystemSettings, User
+from .pagination import CursorPaginator, InvalidCursor, estimate_count, get_keyset_ordering
+from .utils import paginate_queryset
+
+
+@override_settings(ACTIVITY_LOG_ASYNC=True)
+class ActivityLogWriterTests(TransactionTestCase):
+    """Testes da gravação em lote do log de atividades"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='auditado', email='auditado@example.com', password='senha-segura-123'
+        )
+        self.writer = ActivityLogWriter(batch_size=10, flush_interval=0.05)
+        self.addCleanup(self.writer.stop)
+
+    def entry(self, action_type=ActivityLog.LOGIN):
+        return ActivityLog(user=self.user, action_type=action_type)
+
+    def test_flush_writes_queued_entries(self):
+        for _ in range(25):
+            self.writer.submit(self.entry())
+        self.writer.flush()
+        self.assertEqual(ActivityLog.objects.count(), 25)
+
+    def test_stop_drains_the_queue(self):
+        for _ in range(5):
+            self.writer.submit(self.entry())
+        self.writer.stop()
+        self.assertFalse(self.writer._thread.is_alive())
+        self.assertEqual(ActivityLog.objects.count(), 5)
+
+    def test_failed_batch_is_written_one_by_one(self):
+        self.writer.submit(self.entry())
+        self.writer.submit(self.entry(action_type=None))
+        self.writer.submit(self.entry(ActivityLog.LOGOUT))
+        with self.assertLogs('core.activity', 'WARNING'):
+            self.writer.flush()
+        self.assertEqual(
+            sorted(ActivityLog.objects.values_list('action_type', flat=True)),
+            [ActivityLog.LOGIN, ActivityLog.LOGOUT],
+        )
+
+    def test_timestamp_is_the_time_of_the_action(self):
+        action_time = datetime(2026, 1, 2, 3, 4, 5, tzinfo=dt_timezone.utc)
+        with mock.patch('django.utils.timezone.now', return_value=action_time):
+            ActivityLog.log_action(self.user, ActivityLog.LOGIN)
+        activity_log_writer.flush()
+        self.assertEqual(ActivityLog.objects.get().timestamp, action_time)
+
+    @override_settings(ACTIVITY_LOG_ASYNC=False)
+    def test_synchronous_writes(self):
+        entry = ActivityLog.log_action(self.user, ActivityLog.LOGIN)
+        self.assertIsNotNone(entry.pk)
+
+
+class TestRunnerTests(TestCase):
+    """Testes do runner dos testes (core.test_runner)"""
+
+    def test_activity_log_is_written_synchronously(self):
+        self.assertFalse(settings.ACTIVITY_LOG_ASYNC)
+        user = User.objects.create_user(
+            username='sincrono', email='sincrono@example.com', password='senha-segura-123'
+        )
+        entry = ActivityLog.log_action(user, ActivityLog.LOGIN)
+        self.assertTrue(ActivityLog.objects.filter(pk=entry.pk).exists())
+
+
+class ArchiveCursorPaginatorTests(TestCase):
+    """Testes da paginação do log de atividades com registros arquivados"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='auditado', email='auditado@example.com', password='senha-segura-123'
+        )
+
+    def setUp(self):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+        settings_override = override_settings(LOG_ARCHIVE_ROOT=root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        # Três registros por mês de janeiro a junho; até abril vão para o arquivo
+        first = datetime(2025, 1, 10, 12, tzinfo=dt_timezone.utc)
+        ActivityLog.objects.bulk_create([
+            ActivityLog(
+                user=self.user, timestamp=first.replace(month=month) + timedelta(hours=hour),
+                action_type=ActivityLog.LOGOUT if hour == 2 else ActivityLog.LOGIN,
+            )
+            for month in range(1, 7) for hour in range(3)
+        ])
+        archive_model(ActivityLog, 'timestamp', datetime(2025, 5, 1, tzinfo=dt_timezone.utc))
+        self.expected = [
+            first.replace(month=month) + timedelta(hours=hour)
+            for month in range(6, 0, -1) for hour in range(2, -1, -1)
+        ]
+
+    def paginator(self, per_page=4, predicate=None):
+        return ArchiveCursorPaginator(
+            ActivityLog.objects.order_by('-timestamp'), per_page, 'timestamp',
+            start=datetime(2024, 1, 1, tzinfo=dt_timezone.utc), predicate=predicate,
+        )
+
+    def test_pages_cross_from_database_to_archive_and_back(self):
+        self.assertEqual(ActivityLog.objects.count(), 6)
+        paginator = self.paginator()
+
+        pages = [paginator.page()]
+        while pages[-1].has_next():
+            pages.append(paginator.page(pages[-1].next_cursor))
+        self.assertEqual(
+            [activity.timestamp for page in pages for activity in page], self.expected
+        )
+        self.assertFalse(pages[0].has_previous())
+
+        back = [pages[-1]]
+        while back[-1].has_previous():
+            back.append(paginator.page(back[-1].previous_cursor))
+        self.assertEqual(
+            [[a.pk for a in page] for page in back],
+            [[a.pk for a in page] for page in reversed(pages)],
+        )
+
+    def test_reads_only_the_months_needed(self):
+        with mock.patch.object(archive, '_read_month', wraps=archive._read_month) as read_month:
+            page = self.paginator(per_page=8).page()
+        self.assertEqual(len(page), 8)
+        self.assertEqual([c.args[1].month for c in read_month.call_args_list], [4])
+
+    def test_predicate_filters_archived_rows(self):
+        paginator = self.paginator(
+            per_page=50, predicate=lambda activity: activity.action_type == ActivityLog.LOGOUT
+        )
+        # O banco não é filtrado pelo predicado, só os arquivados
+        archived = [activity for activity in paginator.page() if activity._state.adding]
+        self.assertEqual(
+            [activity.timestamp for activity in archived],
+            [t for t in self.expected[6:] if t.hour == 14],
+        )
+
+
+class CursorPaginatorTests(TestCase):
+    """Testes da paginação por cursor (keyset)"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='auditado', email='auditado@example.com', password='senha-segura-123'
+        )
+        # Pares de registros com o mesmo horário, para exercitar o desempate pelo pk
+        first = datetime(2025, 1, 1, tzinfo=dt_timezone.utc)
+        ActivityLog.objects.bulk_create([
+            ActivityLog(user=cls.user, action_type=ActivityLog.LOGIN, timestamp=first + timedelta(minutes=i // 2))
+            for i in range(11)
+        ])
+        cls.expected = list(ActivityLog.objects.order_by('-timestamp', '-pk').values_list('pk', flat=True))
+
+    def queryset(self):
+        return ActivityLog.objects.order_by('-timestamp')
+
+    def test_keyset_ordering(self):
+        self.assertEqual(get_keyset_ordering(self.queryset()), [('timestamp', True), ('id', True)])
+        self.assertEqual(get_keyset_ordering(ActivityLog.objects.all()), [('timestamp', True), ('id', True)])
+        # Colunas anuláveis e de outros modelos não servem como chave
+        self.assertIsNone(get_keyset_ordering(ActivityLog.objects.order_by('user')))
+        self.assertIsNone(get_keyset_ordering(ActivityLog.objects.order_by('user__username')))
+        self.assertIsNone(get_keyset_ordering(ActivityLog.objects.order_by('details')))
+
+    def test_forward_and_backward(self):
+        paginator = CursorPaginator(self.queryset(), 4)
+        pages = [paginator.page()]
+        while pages[-1].has_next():
+            pages.append(paginator.page(pages[-1].next_cursor))
+        self.assertEqual([len(page) for page in pages], [4, 4, 3])
+        self.assertEqual([a.pk for page in pages for a in page], self.expected)
+        self.assertFalse(pages[0].has_previous())
+
+        previous = paginator.page(pages[2].previous_cursor)
+        self.assertEqual([a.pk for a in previous], [a.pk for a in pages[1]])
+        self.assertTrue(previous.has_next())
+        first = paginator.page(previous.previous_cursor)
+        self.assertEqual([a.pk for a in first], self.expected[:4])
+        self.assertFalse(first.has_previous())
+
+    def test_each_page_is_one_query(self):
+        paginator = CursorPaginator(self.queryset(), 4)
+        cursor = paginator.page().next_cursor
+        with self.assertNumQueries(1):
+            list(paginator.page(cursor))
+
+    def test_invalid_cursor(self):
+        paginator = CursorPaginator(self.queryset(), 4)
+        for cursor in ('lixo', 'eyJ2IjpbMV0sInIiOjB9'):
+            with self.assertRaises(InvalidCursor):
+                paginator.page(cursor)
+
+        request = RequestFactory().get('/', {'cursor': 'lixo'})
+        data = paginate_queryset(self.queryset(), request, 4, cursor=True)
+        self.assertTrue(data['cursor_pagination'])
+        self.assertEqual([a.pk for a in data['page_obj']], self.expected[:4])
+
+    def test_unsupported_ordering_falls_back_to_page_numbers(self):
+        request = RequestFactory().get('/', {'page': '2'})
+        data = paginate_queryset(ActivityLog.objects.order_by('user__username', 'pk'), request, 4, cursor=True)
+        self.assertNotIn('cursor_pagination', data)
+        self.assertEqual(data['page_obj'].number, 2)
+
+    def test_estimate_count(self):
+        self.assertEqual(estimate_count(self.queryset()), (11, True))
+        self.assertEqual(estimate_count(self.queryset(), limit=5), (5, False))
+
+
+@override_settings(SESSION_COOKIE_AGE=1000, SESSION_REFRESH_FRACTION=0.1)
+class SessionRefreshMiddlewareTests(TestCase):
+    """Testes da renovação periódica da sessão"""
+
+    def setUp(self):
+        self.store_class = import_module(settings.SESSION_ENGINE).SessionStore
+
+    def saved_session(self, **data):
+        session = self.store_class()
+        session.update(data)
+        session.save()
+        return self.store_class(session.session_key)
+
+    def process(self, session, view=None):
+        request = RequestFactory().get('/')
+        request.session = session
+        SessionRefreshMiddleware(view or (lambda request: HttpResponse()))(request)
+        return session
+
+    def read_session(self, request):
+        request.session.get('user')
+        return HttpResponse()
+
+    def test_unused_session_is_not_touched(self):
+        session = self.process(self.saved_session(user=1))
+        self.assertFalse(session.accessed)
+        self.assertFalse(session.modified)
+
+    def test_recent_refresh_is_not_saved_again(self):
+        session = self.saved_session(user=1, **{SESSION_REFRESHED_KEY: int(time.time()) - 50})
+        self.process(session, self.read_session)
+        self.assertFalse(session.modified)
+
+    def test_old_refresh_marks_session_modified(self):
+        session = self.saved_session(user=1, **{SESSION_REFRESHED_KEY: int(time.time()) - 150})
+        self.process(session, self.read_session)
+        self.assertTrue(session.modified)
+        self.assertGreaterEqual(session[SESSION_REFRESHED_KEY], int(time.time()) - 1)
+
+    def test_modified_session_records_refresh(self):
+        session = self.saved_session(user=1, **{SESSION_REFRESHED_KEY: int(time.time()) - 50})
+
+        def write_session(request):
+            request.session['other'] = True
+            return HttpResponse()
+
+        self.process(session, write_session)
+        self.assertGreaterEqual(session[SESSION_REFRESHED_KEY], int(time.time()) - 1)
+
+    def test_missing_session_is_not_recreated(self):
+        session = self.process(self.store_class('inexistente0123456789abcdefghij'), self.read_session)
+        self.assertFalse(session.modified)
+        self.assertNotIn(SESSION_REFRESHED_KEY, session)
+
+    def test_login_session_is_not_saved_on_every_request(self):
+        user = User.objects.create_user(
+            username='sessao', email='sessao@example.com', password='senha-segura-123'
+        )
+        self.client.force_login(user)
+        self.client.get('/')
+        response = self.client.get('/')
+        self.assertNotIn(settings.SESSION_COOKIE_NAME, response.cookies)
+
+
+class SettingsRegistryTests(TestCase):
+    """Testes do registro em memória de SystemSettings"""
+
+    def setUp(self):
+        cache.clear()
+        local_cache.clear()
+
+    def test_settings_are_read_from_memory(self):
+        SystemSettings.objects.create(key='dias', name='dias', value='30', setting_type='number')
+        self.assertEqual(SystemSettings.get_setting('dias'), 30)
+        with self.assertNumQueries(0):
+            self.assertEqual(SystemSettings.get_settings(['dias', 'outra'], 0), {'dias': 30, 'outra': 0})
+
+    def test_saving_a_setting_reloads_the_registry(self):
+        self.assertIsNone(SystemSettings.get_setting('ativo'))
+        with self.captureOnCommitCallbacks(execute=True):
+            SystemSettings.set_setting('ativo', 'true', name='ativo', setting_type='boolean')
+        self.assertIs(SystemSettings.get_setting('ativo'), True)
+
+    def test_json_values_are_copied(self):
+        SystemSettings.objects.create(key='lista', name='lista', value='[1, 2]', setting_type='json')
+        SystemSettings.get_setting('lista').append(3)
+        self.assertEqual(SystemSettings.get_setting('lista'), [1, 2])
+
+
+class CacheDecoratorTests(TestCase):
+    """Testes dos decoradores de core.cache"""
+
+    def setUp(self):
+        cache.clear()
+        local_cache.clear()
+        self.calls = []
+
+    def contracts_by_status(self):
+        from contracts.models import Contract
+
+        @cached_queryset(name='tests.contracts_by_status', tags=['contract', 'contract_status', 'contract_type'])
+        def contracts_by_status(status_id=None):
+            self.calls.append(status_id)
+            return Contract.objects.filter(status_id=status_id).values_list('pk', flat=True)
+
+        return contracts_by_status
+
+    def test_filter_parameters_are_part_of_the_key(self):
+        tags = ['contract']
+        self.assertNotEqual(
+            make_key('tests.list', [(), {'status_id': 1}], tags),
+            make_key('tests.list', [(), {'status_id': 2}], tags),
+        )
+        self.assertEqual(
+            make_key('tests.list', {'a': 1, 'b': 2}, tags),
+            make_key('tests.list', {'b': 2, 'a': 1}, tags),
+        )
+
+        contracts_by_status = self.contracts_by_status()
+        self.assertEqual(contracts_by_status(status_id=1), [])
+        contracts_by_status(status_id=1)
+        contracts_by_status(status_id=2)
+        self.assertEqual(self.calls, [1, 2])
+
+    def test_saving_tagged_models_invalidates_after_commit(self):
+        from contracts.models import Contract, ContractStatus, ContractType
+
+        contracts_by_status = self.contracts_by_status()
+        status = ContractStatus.objects.create(name='Vigente')
+        contracts_by_status(status_id=status.pk)
+
+        def contract():
+            return Contract.objects.create(
+                company='Empresa', status=status, start_date=datetime(2024, 1, 1).date(),
+                end_date=datetime(2025, 1, 1).date(), value=1, fiscal_portaria='portaria.pdf',
+            )
+
+        for change in (contract, lambda: ContractStatus.objects.create(name='Outro'),
+                       lambda: ContractType.objects.create(name='Serviço')):
+            with self.subTest(change=change):
+                self.calls.clear()
+                with self.captureOnCommitCallbacks(execute=False) as callbacks:
+                    change()
+                    contracts_by_status(status_id=status.pk)
+                # Antes do commit a entrada antiga continua valendo
+                self.assertEqual(self.calls, [])
+
+                for callback in callbacks:
+                    callback()
+                contracts_by_status(status_id=status.pk)
+                self.assertEqual(self.calls, [status.pk])
+        self.assertEqual(len(contracts_by_status(status_id=status.pk)), 1)
+
+    def test_fragment_is_cached_by_query_string(self):
+        calls = []
+
+        @cached_fragment(name='tests.fragment', tags=['contract'], vary_on_user=False)
+        def fragment(request):
+            calls.append(request.GET.get('page'))
+            return HttpResponse(f'página {request.GET.get("page")}', content_type='text/plain')
+
+        factory = RequestFactory()
+        self.assertEqual(fragment(factory.get('/f/', {'page': '1'})).content, 'página 1'.encode())
+        self.assertEqual(fragment(factory.get('/f/', {'page': '1'})).content, 'página 1'.encode())
+        self.assertEqual(fragment(factory.get('/f/', {'page': '2'})).content, 'página 2'.encode())
+        fragment(factory.post('/f/?page=1'))
+        self.assertEqual(calls, ['1', '2', '1'])
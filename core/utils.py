@@ -23,6 +23,8 @@ from django.utils.html import escape
 from django.utils.text import slugify
 from django.utils.translation import gettext_lazy as _
 
+from .pagination import CursorPaginator, InvalidCursor, get_keyset_ordering
+
 logger = logging.getLogger(__name__)
 
 # Date/Time Utilities
@@ -88,8 +90,51 @@ def get_object_or_none(klass, *args, **kwargs):
     except (klass.DoesNotExist, ValidationError):
         return None
 
-def paginate_queryset(queryset: QuerySet, request: HttpRequest, page_size: int = 20) -> dict:
-    """Paginate a queryset and return pagination data."""
+def cursor_paginate_queryset(queryset: QuerySet, request: HttpRequest, page_size: int = 20,
+                             estimate_total: bool = False) -> Optional[dict]:
+    """
+    Paginate a queryset by keyset using the ``cursor`` request parameter.
+    
+    Returns None if the queryset ordering cannot be used as a keyset (see
+    ``core.pagination.get_keyset_ordering``). An invalid cursor shows the
+    first page.
+    """
+    if get_keyset_ordering(queryset) is None:
+        return None
+    
+    paginator = CursorPaginator(queryset, page_size, estimate_total=estimate_total)
+    return cursor_paginate(paginator, request)
+
+def cursor_paginate(paginator: CursorPaginator, request: HttpRequest) -> dict:
+    """
+    Return the page of a ``CursorPaginator`` given by the ``cursor`` request
+    parameter, with the same keys as ``paginate_queryset``.
+    """
+    try:
+        page_obj = paginator.page(request.GET.get('cursor'))
+    except InvalidCursor:
+        page_obj = paginator.page()
+    
+    return {
+        'page_obj': page_obj,
+        'paginator': paginator,
+        'is_paginated': page_obj.has_other_pages(),
+        'cursor_pagination': True,
+    }
+
+def paginate_queryset(queryset: QuerySet, request: HttpRequest, page_size: int = 20,
+                      cursor: bool = False, estimate_total: bool = False) -> dict:
+    """
+    Paginate a queryset and return pagination data.
+    
+    With ``cursor=True`` the queryset is paginated by keyset when its
+    ordering allows it (see ``cursor_paginate_queryset``).
+    """
+    if cursor:
+        data = cursor_paginate_queryset(queryset, request, page_size, estimate_total)
+        if data is not None:
+            return data
+    
     paginator = Paginator(queryset, page_size)
     page_number = request.GET.get('page')
     
@@ -108,65 +153,209 @@ def paginate_queryset(queryset: QuerySet, request: HttpRequest, page_size: int =
 
 # Export Utilities
 
-def export_to_csv(queryset, fields, filename='export.csv'):
-    """Export a queryset to CSV."""
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+class Echo:
+    """
+    File-like object that returns what is written instead of storing it.
+    
+    Used with ``csv.writer`` to turn each formatted row into a string that
+    can be yielded to a ``StreamingHttpResponse``.
+    """
+    def write(self, value):
+        return value
+
+
+def csv_streaming_response(headers, rows, filename='export.csv', delimiter=',', batch_size=500):
+    """
+    Build a streaming CSV response from an iterable of rows.
+    
+    Rows are formatted and sent in batches of ``batch_size`` as they are
+    produced, so the first bytes reach the client immediately and the
+    response body is never held in memory.
+    """
+    from django.http import StreamingHttpResponse
     
-    writer = csv.writer(response, delimiter=';')
-    writer.writerow([field[0] for field in fields])  # Headers
+    writer = csv.writer(Echo(), delimiter=delimiter)
     
-    for obj in queryset:
-        row = []
-        for _, attr in fields:
-            value = getattr(obj, attr, '')
-            if callable(value):
-                value = value()
-            row.append(str(value) if value is not None else '')
-        writer.writerow(row)
+    def content():
+        buffer = [writer.writerow(headers)]
+        for row in rows:
+            buffer.append(writer.writerow(row))
+            if len(buffer) >= batch_size:
+                yield ''.join(buffer)
+                buffer = []
+        if buffer:
+            yield ''.join(buffer)
     
+    response = StreamingHttpResponse(content(), content_type='text/csv')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
     return response
 
-def export_to_excel(queryset, fields, filename='export.xlsx'):
-    """Export a queryset to Excel."""
+
+def _csv_value(value):
+    """Convert a value into its CSV representation."""
+    if value is None:
+        return ''
+    if isinstance(value, datetime) and timezone.is_aware(value):
+        value = timezone.localtime(value)
+    return str(value)
+
+
+def export_to_csv(queryset, fields, filename='export.csv', chunk_size=2000):
+    """
+    Export a queryset to CSV.
+    
+    When every attribute is a plain (non-relational) model field the rows are
+    read with ``values_list`` through a chunked iterator, skipping model
+    instantiation entirely. Otherwise instances are iterated in chunks.
+    """
+    attrs = [attr for _, attr in fields]
+    
+    if isinstance(queryset, QuerySet):
+        plain_fields = {
+            field.name for field in queryset.model._meta.concrete_fields
+            if not field.is_relation
+        }
+        if all(attr in plain_fields for attr in attrs):
+            values = queryset.values_list(*attrs).iterator(chunk_size=chunk_size)
+            rows = ([_csv_value(value) for value in row] for row in values)
+            return csv_streaming_response(
+                [header for header, _ in fields], rows, filename=filename, delimiter=';'
+            )
+        queryset = queryset.iterator(chunk_size=chunk_size)
+    
+    def rows():
+        for obj in queryset:
+            row = []
+            for attr in attrs:
+                value = getattr(obj, attr, '')
+                if callable(value):
+                    value = value()
+                row.append(_csv_value(value))
+            yield row
+    
+    return csv_streaming_response(
+        [header for header, _ in fields], rows(), filename=filename, delimiter=';'
+    )
+
+EXCEL_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+
+def _excel_value(value):
+    """Convert a Python value into something openpyxl can store in a cell."""
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, datetime) and timezone.is_aware(value):
+        return timezone.localtime(value).replace(tzinfo=None)
+    return value
+
+
+def write_excel_stream(output, headers, rows, title='Export', sample_size=500, max_width=None):
+    """
+    Write rows to an XLSX file using openpyxl's write-only mode.
+    
+    Rows are consumed lazily, so memory usage stays flat regardless of the
+    number of rows. Write-only sheets must declare column widths before the
+    first row, so widths are measured on the header and the first
+    ``sample_size`` rows, which are buffered while they are measured.
+    
+    Args:
+        output: A path or binary file object the workbook is saved to
+        headers: List of column headers
+        rows: Iterable of row sequences
+        title: Worksheet title
+        sample_size: Number of rows used to size the columns
+        max_width: Optional upper bound for column widths
+    """
+    from itertools import islice
     from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
     from openpyxl.styles import Font
+    from openpyxl.utils import get_column_letter
     
-    response = HttpResponse(content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
-    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(title=title)
     
-    wb = Workbook()
-    ws = wb.active
-    ws.title = 'Export'
+    rows = iter(rows)
+    sample = [[_excel_value(value) for value in row] for row in islice(rows, sample_size)]
     
-    # Headers
-    for col_num, (header, _) in enumerate(fields, 1):
-        cell = ws.cell(row=1, column=col_num, value=header)
-        cell.font = Font(bold=True)
+    widths = [len(str(header)) for header in headers]
+    for row in sample:
+        for col_num, value in enumerate(row):
+            length = len(str(value)) if value is not None else 0
+            if col_num < len(widths) and length > widths[col_num]:
+                widths[col_num] = length
     
-    # Data
-    for row_num, obj in enumerate(queryset, 2):
-        for col_num, (_, attr) in enumerate(fields, 1):
-            value = getattr(obj, attr, '')
-            if callable(value):
-                value = value()
-            ws.cell(row=row_num, column=col_num, value=value)
-    
-    # Auto-adjust column widths
-    for col in ws.columns:
-        max_length = 0
-        column = col[0].column_letter
-        for cell in col:
-            try:
-                if len(str(cell.value)) > max_length:
-                    max_length = len(str(cell.value))
-            except:
-                pass
+    for col_num, max_length in enumerate(widths, 1):
         adjusted_width = (max_length + 2) * 1.2
-        ws.column_dimensions[column].width = min(adjusted_width, 30)
+        if max_width:
+            adjusted_width = min(adjusted_width, max_width)
+        ws.column_dimensions[get_column_letter(col_num)].width = adjusted_width
     
-    wb.save(response)
-    return response
+    header_row = []
+    for header in headers:
+        cell = WriteOnlyCell(ws, value=header)
+        cell.font = Font(bold=True)
+        header_row.append(cell)
+    ws.append(header_row)
+    
+    for row in sample:
+        ws.append(row)
+    del sample
+    
+    for row in rows:
+        ws.append([_excel_value(value) for value in row])
+    
+    wb.save(output)
+
+
+def excel_streaming_response(headers, rows, filename='export.xlsx', **kwargs):
+    """
+    Build a streaming response for an XLSX export.
+    
+    The workbook is spooled to an anonymous temporary file instead of an
+    in-memory buffer and sent to the client in blocks, so neither the
+    workbook nor the response body is ever held in memory.
+    """
+    import tempfile
+    from django.http import FileResponse
+    
+    output = tempfile.TemporaryFile()
+    try:
+        write_excel_stream(output, headers, rows, **kwargs)
+    except Exception:
+        output.close()
+        raise
+    output.seek(0)
+    
+    return FileResponse(
+        output,
+        as_attachment=True,
+        filename=filename,
+        content_type=EXCEL_CONTENT_TYPE
+    )
+
+
+def export_to_excel(queryset, fields, filename='export.xlsx', chunk_size=2000):
+    """Export a queryset to Excel."""
+    if isinstance(queryset, QuerySet):
+        queryset = queryset.iterator(chunk_size=chunk_size)
+    
+    def rows():
+        for obj in queryset:
+            row = []
+            for _, attr in fields:
+                value = getattr(obj, attr, '')
+                if callable(value):
+                    value = value()
+                row.append(value)
+            yield row
+    
+    return excel_streaming_response(
+        [header for header, _ in fields],
+        rows(),
+        filename=filename,
+        max_width=30
+    )
 
 # Request/Response Utilities
 
@@ -507,7 +696,7 @@ def get_ordered_queryset(queryset, request, default_ordering='-created_at'):
         return queryset.order_by(ordering)
     return queryset
 
-def get_paginated_data(queryset, request, per_page=20):
+def get_paginated_data(queryset, request, per_page=20, cursor=False, estimate_total=False):
     """
     Paginate a queryset.
     
@@ -515,12 +704,21 @@ def get_paginated_data(queryset, request, per_page=20):
         queryset: The base queryset
         request: The HTTP request object
         per_page: Number of items per page
+        cursor: Paginate by keyset (``?cursor=``) when the ordering allows it
+        estimate_total: Estimate the total instead of counting every row
+            (cursor pagination only)
         
     Returns:
         dict: Pagination data including page object and page range
     """
     from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
     
+    if cursor:
+        data = cursor_paginate_queryset(queryset, request, per_page, estimate_total)
+        if data is not None:
+            data['page_range'] = []
+            return data
+    
     paginator = Paginator(queryset, per_page)
     page = request.GET.get('page')
     
@@ -5,7 +5,6 @@ from django.contrib.auth import login, authenticate, logout
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.contrib.auth.forms import AuthenticationForm, PasswordChangeForm
-from django.contrib.auth.models import User
 from django.views.generic import TemplateView, UpdateView
 from django.urls import reverse_lazy
 from django.utils import timezone
@@ -28,8 +27,11 @@ from .forms import (
     PasswordResetRequestForm,
     SetNewPasswordForm
 )
-from .models import UserProfile, ActivityLog
+from .archive import ArchiveCursorPaginator, day_range, has_archives_for
+from .models import User, UserProfile, ActivityLog
+from .utils import cursor_paginate, paginate_queryset
 from contracts.models import Contract
+from contracts.stats import get_dashboard_stats
 
 logger = logging.getLogger(__name__)
 
@@ -55,11 +57,8 @@ class LoginView(FormView):
         login(self.request, user)
         
         # Registrar atividade de login
-        ActivityLog.objects.create(
-            user=user,
-            action_type='login',
-            details='Login realizado com sucesso',
-            ip_address=self.get_client_ip()
+        ActivityLog.log_action(
+            user, ActivityLog.LOGIN, 'Login realizado com sucesso', request=self.request
         )
         
         messages.success(self.request, f'Bem-vindo(a), {user.get_full_name() or user.username}!')
@@ -70,15 +69,6 @@ class LoginView(FormView):
         logger.warning(f'Tentativa de login falha para o usuário: {username}')
         messages.error(self.request, 'Usuário ou senha inválidos. Por favor, tente novamente.')
         return super().form_invalid(form)
-    
-    def get_client_ip(self):
-        """Obtém o endereço IP do cliente"""
-        x_forwarded_for = self.request.META.get('HTTP_X_FORWARDED_FOR')
-        if x_forwarded_for:
-            ip = x_forwarded_for.split(',')[0]
-        else:
-            ip = self.request.META.get('REMOTE_ADDR')
-        return ip
 
 
 class LogoutView(RedirectView):
@@ -90,25 +80,13 @@ class LogoutView(RedirectView):
     def get(self, request, *args, **kwargs):
         if request.user.is_authenticated:
             # Registrar atividade de logout
-            ActivityLog.objects.create(
-                user=request.user,
-                action_type='logout',
-                details='Logout realizado com sucesso',
-                ip_address=self.get_client_ip()
+            ActivityLog.log_action(
+                request.user, ActivityLog.LOGOUT, 'Logout realizado com sucesso', request=request
             )
             
             logout(request)
             messages.info(request, 'Você saiu do sistema com sucesso.')
         return super().get(request, *args, **kwargs)
-    
-    def get_client_ip(self):
-        """Obtém o endereço IP do cliente"""
-        x_forwarded_for = self.request.META.get('HTTP_X_FORWARDED_FOR')
-        if x_forwarded_for:
-            ip = x_forwarded_for.split(',')[0]
-        else:
-            ip = self.request.META.get('REMOTE_ADDR')
-        return ip
 
 
 class DashboardView(LoginRequiredMixin, TemplateView):
@@ -123,55 +101,22 @@ class DashboardView(LoginRequiredMixin, TemplateView):
         context = super().get_context_data(**kwargs)
         user = self.request.user
         
-        # Estatísticas de contratos
-        contracts = Contract.objects.all()
-        
-        # Contratos por status
-        contracts_by_status = Contract.objects.values('status__name').annotate(
-            total=Count('id')
-        ).order_by('-total')
-        
-        # Contagem de contratos ativos
-        active_contracts = contracts.filter(is_active=True).count()
-        
-        # Contratos vencendo em breve (próximos 30 dias)
-        today = timezone.now().date()
-        thirty_days_later = today + timedelta(days=30)
-        expiring_soon = contracts.filter(
-            end_date__range=[today, thirty_days_later],
-            is_active=True
-        ).count()
-        
-        # Contratos vencidos
-        expired_contracts = contracts.filter(
-            end_date__lt=today,
-            is_active=True
-        ).count()
-        
-        # Valor total dos contratos ativos
-        total_contracts_value = contracts.filter(
-            is_active=True
-        ).aggregate(total=Sum('value'))['total'] or 0
+        # Estatísticas de contratos (uma consulta, em cache por dia)
+        stats = get_dashboard_stats()
         
         # Atividades recentes
         recent_activities = ActivityLog.objects.select_related('user').order_by('-timestamp')[:10]
         
-        # Próximos vencimentos
-        upcoming_contracts = contracts.filter(
-            end_date__gte=today,
-            is_active=True
-        ).order_by('end_date')[:5]
-        
         context.update({
             'active_menu': 'dashboard',
-            'total_contracts': contracts.count(),
-            'active_contracts': active_contracts,
-            'expiring_soon_count': expiring_soon,
-            'expired_contracts_count': expired_contracts,
-            'total_contracts_value': total_contracts_value,
-            'contracts_by_status': contracts_by_status,
+            'total_contracts': stats['total_contracts'],
+            'active_contracts': stats['active_contracts'],
+            'expiring_soon_count': stats['expiring_soon_count'],
+            'expired_contracts_count': stats['expired_contracts_count'],
+            'total_contracts_value': stats['total_contracts_value'],
+            'contracts_by_status': stats['contracts_by_status'],
             'recent_activities': recent_activities,
-            'upcoming_contracts': upcoming_contracts,
+            'upcoming_contracts': stats['upcoming_contracts'],
         })
         
         return context
@@ -246,11 +191,8 @@ class UserRegistrationView(FormView):
         )
         
         # Registrar atividade
-        ActivityLog.objects.create(
-            user=user,
-            action_type='user_register',
-            details='Novo usuário registrado',
-            ip_address=self.get_client_ip()
+        ActivityLog.log_action(
+            user, 'user_register', 'Novo usuário registrado', request=self.request
         )
         
         messages.success(
@@ -258,15 +200,6 @@ class UserRegistrationView(FormView):
             'Cadastro realizado com sucesso! Faça login para continuar.'
         )
         return super().form_valid(form)
-    
-    def get_client_ip(self):
-        """Obtém o endereço IP do cliente"""
-        x_forwarded_for = self.request.META.get('HTTP_X_FORWARDED_FOR')
-        if x_forwarded_for:
-            ip = x_forwarded_for.split(',')[0]
-        else:
-            ip = self.request.META.get('REMOTE_ADDR')
-        return ip
 
 
 class ActivityLogView(LoginRequiredMixin, TemplateView):
@@ -290,38 +223,44 @@ class ActivityLogView(LoginRequiredMixin, TemplateView):
         if user_id:
             activities = activities.filter(user_id=user_id)
         
-        date_from = self.request.GET.get('date_from')
-        if date_from:
-            try:
-                date_from = datetime.strptime(date_from, '%Y-%m-%d').date()
-                activities = activities.filter(timestamp__date__gte=date_from)
-            except (ValueError, TypeError):
-                pass
+        date_from = self.parse_date(self.request.GET.get('date_from'))
+        date_to = self.parse_date(self.request.GET.get('date_to'))
         
-        date_to = self.request.GET.get('date_to')
-        if date_to:
-            try:
-                date_to = datetime.strptime(date_to, '%Y-%m-%d').date()
-                activities = activities.filter(timestamp__date__lte=date_to)
-            except (ValueError, TypeError):
-                pass
+        # Intervalo semiaberto [início, fim) sobre o timestamp, que usa o índice
+        start, end = day_range(date_from, date_to)
+        if start:
+            activities = activities.filter(timestamp__gte=start)
+        if end:
+            activities = activities.filter(timestamp__lt=end)
         
         # Ordenação
         activities = activities.order_by('-timestamp')
         
-        # Paginação
-        from django.core.paginator import Paginator
-        paginator = Paginator(activities, self.paginate_by)
-        page = self.request.GET.get('page')
+        # Registros arquivados entram apenas quando o período é informado e
+        # alcança meses já arquivados; são lidos mês a mês, só até completar a
+        # página (veja ArchiveCursorPaginator)
+        if start and has_archives_for(ActivityLog, start, end):
+            paginator = ArchiveCursorPaginator(
+                activities, self.paginate_by, 'timestamp', start, end,
+                predicate=self.archive_filter(action_type, user_id), estimate_total=True,
+            )
+            pagination = cursor_paginate(paginator, self.request)
+            self.attach_users(pagination['page_obj'])
+        else:
+            # Paginação por cursor (sem OFFSET nem COUNT completo)
+            pagination = paginate_queryset(
+                activities, self.request, self.paginate_by, cursor=True, estimate_total=True,
+            )
         
-        try:
-            activities_page = paginator.page(page)
-        except:
-            activities_page = paginator.page(1)
+        query = self.request.GET.copy()
+        query.pop('cursor', None)
+        query.pop('page', None)
         
+        context.update(pagination)
         context.update({
             'active_menu': 'activity_log',
-            'activities': activities_page,
+            'activities': pagination['page_obj'],
+            'pagination_query': query.urlencode(),
             'action_types': ActivityLog.ACTION_TYPES,
             'selected_action_type': action_type,
             'selected_user': int(user_id) if user_id and user_id.isdigit() else None,
@@ -331,6 +270,31 @@ class ActivityLogView(LoginRequiredMixin, TemplateView):
         })
         
         return context
+    
+    @staticmethod
+    def parse_date(value):
+        try:
+            return datetime.strptime(value, '%Y-%m-%d').date()
+        except (ValueError, TypeError):
+            return None
+    
+    @staticmethod
+    def archive_filter(action_type=None, user_id=None):
+        """Os mesmos filtros da consulta, aplicados aos registros arquivados"""
+        def predicate(activity):
+            return (
+                (not action_type or activity.action_type == action_type)
+                and (not user_id or str(activity.user_id) == user_id)
+            )
+        return predicate
+    
+    @staticmethod
+    def attach_users(activities):
+        """Carrega os usuários dos registros arquivados da página"""
+        archived = [activity for activity in activities if activity._state.adding]
+        users = User.objects.in_bulk({activity.user_id for activity in archived if activity.user_id})
+        for activity in archived:
+            activity.user = users.get(activity.user_id)
 
 
 # Views para tratamento de erros HTTP
@@ -1,3 +1,13 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import Alert
+
+
+@admin.register(Alert)
+class AlertAdmin(admin.ModelAdmin):
+    list_display = ('message', 'kind', 'severity', 'is_open', 'opened_at', 'last_seen_at', 'closed_at')
+    list_filter = ('is_open', 'kind', 'severity')
+    search_fields = ('key', 'message', 'contract__contract_number')
+    raw_id_fields = ('contract', 'reminder')
+    date_hierarchy = 'opened_at'
+    readonly_fields = ('key', 'kind', 'opened_at', 'last_seen_at', 'closed_at')
@@ -0,0 +1,174 @@
+"""
+Avaliação periódica dos alertas de monitoramento.
+
+Cada regra retorna as situações encontradas agora, indexadas pela chave do
+alerta. ``evaluate_alerts`` compara o resultado com os alertas abertos do
+mesmo tipo: abre os novos, atualiza ``last_seen_at`` dos que continuam e
+fecha os que deixaram de existir. Assim a página de alertas lê uma tabela
+pequena e já calculada em vez de varrer os contratos a cada requisição.
+"""
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Q
+from django.utils import timezone
+
+from contracts.models import Contract, ContractReminder
+
+from .models import Alert
+
+
+def get_alerts(is_open=True, kind=None, severity=None):
+    """Alertas para exibição, dos mais graves e recentes aos mais antigos"""
+    queryset = Alert.objects.filter(is_open=is_open).annotate(
+        contract_number=F('contract__contract_number')
+    )
+    if kind:
+        queryset = queryset.filter(kind=kind)
+    if severity:
+        queryset = queryset.filter(severity=severity)
+    return queryset.order_by('-severity', '-opened_at')
+
+
+def get_open_alert_counts():
+    """Totais de alertas abertos por gravidade e por tipo, em uma consulta"""
+    aggregates = {'total': Count('pk')}
+    for severity, _label in Alert.SEVERITY_CHOICES:
+        aggregates[f'severity_{severity}'] = Count('pk', filter=Q(severity=severity))
+    for kind, _label in Alert.KIND_CHOICES:
+        aggregates[kind] = Count('pk', filter=Q(kind=kind))
+    counts = Alert.objects.filter(is_open=True).aggregate(**aggregates)
+    return {
+        'total': counts['total'],
+        'by_severity': {severity: counts[f'severity_{severity}'] for severity, _ in Alert.SEVERITY_CHOICES},
+        'by_kind': {kind: counts[kind] for kind, _ in Alert.KIND_CHOICES},
+    }
+
+
+def expired_active_contracts(now):
+    """Contratos com término no passado que continuam ativos"""
+    today = timezone.localdate(now)
+    rows = Contract.objects.filter(
+        is_active=True, end_date__lt=today
+    ).order_by().values_list('pk', 'contract_number', 'end_date')
+    return {
+        f'{Alert.EXPIRED_ACTIVE}:{pk}': {
+            'severity': Alert.CRITICAL,
+            'contract_id': pk,
+            'message': f'{number} venceu em {end_date:%d/%m/%Y} e continua ativo',
+        }
+        for pk, number, end_date in rows.iterator()
+    }
+
+
+def overdue_reminders(now):
+    """Lembretes pendentes com vencimento no passado"""
+    rows = ContractReminder.objects.filter(
+        is_completed=False, due_date__lt=now
+    ).order_by().values_list('pk', 'contract_id', 'title', 'due_date', 'contract__contract_number')
+    return {
+        f'{Alert.OVERDUE_REMINDER}:{pk}': {
+            'severity': Alert.WARNING,
+            'contract_id': contract_id,
+            'reminder_id': pk,
+            'message': (
+                f'{title} ({number}) venceu em '
+                f'{timezone.localtime(due_date):%d/%m/%Y %H:%M}'
+            )[:255],
+        }
+        for pk, contract_id, title, due_date, number in rows.iterator()
+    }
+
+
+def missing_documents(now):
+    """Contratos ativos sem portaria do fiscal ou sem o termo aditivo exigido"""
+    missing_portaria = Q(fiscal_portaria='')
+    missing_additive = ~Q(contract_term='initial') & (Q(additive_term='') | Q(additive_term__isnull=True))
+    rows = Contract.objects.filter(is_active=True).filter(
+        missing_portaria | missing_additive
+    ).order_by().values_list('pk', 'contract_number', 'contract_term', 'fiscal_portaria', 'additive_term')
+
+    found = {}
+    for pk, number, term, portaria, additive in rows.iterator():
+        if not portaria:
+            found[f'{Alert.MISSING_DOCUMENT}:{pk}:fiscal_portaria'] = {
+                'severity': Alert.WARNING,
+                'contract_id': pk,
+                'message': f'{number} sem portaria do fiscal',
+            }
+        if term != 'initial' and not additive:
+            found[f'{Alert.MISSING_DOCUMENT}:{pk}:additive_term'] = {
+                'severity': Alert.WARNING,
+                'contract_id': pk,
+                'message': f'{number} sem o termo aditivo',
+            }
+    return found
+
+
+def invalid_dates(now):
+    """Contratos com término anterior ao início"""
+    rows = Contract.objects.filter(
+        end_date__lt=F('start_date')
+    ).order_by().values_list('pk', 'contract_number', 'start_date', 'end_date')
+    return {
+        f'{Alert.INVALID_DATES}:{pk}': {
+            'severity': Alert.CRITICAL,
+            'contract_id': pk,
+            'message': f'{number} termina ({end:%d/%m/%Y}) antes de começar ({start:%d/%m/%Y})',
+        }
+        for pk, number, start, end in rows.iterator()
+    }
+
+
+RULES = {
+    Alert.EXPIRED_ACTIVE: expired_active_contracts,
+    Alert.OVERDUE_REMINDER: overdue_reminders,
+    Alert.MISSING_DOCUMENT: missing_documents,
+    Alert.INVALID_DATES: invalid_dates,
+}
+
+
+def sync_alerts(kind, found, now):
+    """Abre, mantém e fecha os alertas de um tipo conforme as situações encontradas"""
+    with transaction.atomic():
+        open_alerts = dict(
+            Alert.objects.filter(is_open=True, kind=kind).order_by().values_list('key', 'pk')
+        )
+
+        new_keys = found.keys() - open_alerts.keys()
+        Alert.objects.bulk_create(
+            [
+                Alert(key=key, kind=kind, opened_at=now, last_seen_at=now, **found[key])
+                for key in sorted(new_keys)
+            ],
+            batch_size=500
+        )
+
+        seen = [pk for key, pk in open_alerts.items() if key in found]
+        gone = [pk for key, pk in open_alerts.items() if key not in found]
+        for start in range(0, len(seen), 500):
+            Alert.objects.filter(pk__in=seen[start:start + 500]).update(last_seen_at=now)
+        for start in range(0, len(gone), 500):
+            Alert.objects.filter(pk__in=gone[start:start + 500]).update(is_open=False, closed_at=now)
+
+    return {'opened': len(new_keys), 'open': len(found), 'closed': len(gone)}
+
+
+def purge_closed_alerts(now=None):
+    """Remove alertas fechados há mais de ``ALERT_RETENTION_DAYS`` dias"""
+    now = now or timezone.now()
+    days = getattr(settings, 'ALERT_RETENTION_DAYS', 90)
+    deleted, _ = Alert.objects.filter(
+        is_open=False, closed_at__lt=now - timezone.timedelta(days=days)
+    ).delete()
+    return deleted
+
+
+def evaluate_alerts(now=None, kinds=None):
+    """Executa as regras e retorna, por tipo, os alertas abertos, mantidos e fechados"""
+    now = now or timezone.now()
+    results = {}
+    for kind, rule in RULES.items():
+        if kinds and kind not in kinds:
+            continue
+        results[kind] = sync_alerts(kind, rule(now), now)
+    return results
@@ -0,0 +1,51 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from monitoring.alerts import RULES, evaluate_alerts, purge_closed_alerts
+from monitoring.models import Alert
+
+
+class Command(BaseCommand):
+    help = 'Recalcula os alertas de monitoramento (contratos e lembretes)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Continua em execução, avaliando a cada --interval segundos (padrão: executa uma vez, para uso com cron)',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=getattr(settings, 'ALERT_EVALUATION_INTERVAL', 300),
+            help='Intervalo em segundos entre as avaliações com --loop (padrão: 300)',
+        )
+        parser.add_argument(
+            '--kind',
+            action='append',
+            choices=list(RULES),
+            help='Avalia apenas este tipo de alerta (pode ser repetido)',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            while True:
+                self.run_once(options['kind'])
+                if not options['loop']:
+                    break
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            self.stdout.write('Encerrando.')
+
+    def run_once(self, kinds):
+        labels = dict(Alert.KIND_CHOICES)
+        for kind, result in evaluate_alerts(kinds=kinds).items():
+            self.stdout.write(
+                f'{labels[kind]}: {result["open"]} aberto(s), '
+                f'{result["opened"]} novo(s), {result["closed"]} fechado(s)'
+            )
+        purged = purge_closed_alerts()
+        if purged:
+            self.stdout.write(f'{purged} alerta(s) fechado(s) antigo(s) removido(s)')
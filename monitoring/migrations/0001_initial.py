@@ -0,0 +1,43 @@
+# Generated by Django 4.2.7 on 2026-10-18 16:14
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('contracts', '0014_notificationdelivery'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Alert',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=100, verbose_name='chave')),
+                ('kind', models.CharField(choices=[('expired_active', 'Contrato vencido ainda ativo'), ('overdue_reminder', 'Lembrete atrasado'), ('missing_document', 'Documento ausente'), ('invalid_dates', 'Datas inconsistentes')], max_length=30, verbose_name='tipo')),
+                ('severity', models.PositiveSmallIntegerField(choices=[(10, 'Informação'), (20, 'Atenção'), (30, 'Crítico')], default=20, verbose_name='gravidade')),
+                ('message', models.CharField(max_length=255, verbose_name='mensagem')),
+                ('is_open', models.BooleanField(default=True, verbose_name='aberto')),
+                ('opened_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='aberto em')),
+                ('last_seen_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='visto em')),
+                ('closed_at', models.DateTimeField(blank=True, null=True, verbose_name='fechado em')),
+                ('contract', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='alerts', to='contracts.contract', verbose_name='contrato')),
+                ('reminder', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='alerts', to='contracts.contractreminder', verbose_name='lembrete')),
+            ],
+            options={
+                'verbose_name': 'alerta',
+                'verbose_name_plural': 'alertas',
+                'ordering': ['-severity', '-opened_at'],
+                'indexes': [models.Index(fields=['is_open', '-severity', '-opened_at'], name='alert_open_severity_idx'), models.Index(fields=['is_open', 'kind'], name='alert_open_kind_idx'), models.Index(fields=['closed_at'], name='alert_closed_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='alert',
+            constraint=models.UniqueConstraint(condition=models.Q(('is_open', True)), fields=('key',), name='unique_open_alert'),
+        ),
+    ]
@@ -1,3 +1,77 @@
 from django.db import models
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
 
-# Create your models here.
+
+class Alert(models.Model):
+    """
+    Alerta calculado pelo avaliador periódico (comando ``evaluate_alerts``).
+
+    Cada situação tem uma chave estável (ex.: ``overdue_reminder:12``); só
+    pode existir um alerta aberto por chave. Enquanto a situação persiste, o
+    alerta continua aberto e tem ``last_seen_at`` atualizado; quando deixa de
+    ser encontrada, o alerta é fechado. A página de monitoramento lê apenas
+    esta tabela.
+    """
+    EXPIRED_ACTIVE = 'expired_active'
+    OVERDUE_REMINDER = 'overdue_reminder'
+    MISSING_DOCUMENT = 'missing_document'
+    INVALID_DATES = 'invalid_dates'
+    KIND_CHOICES = [
+        (EXPIRED_ACTIVE, _('Contrato vencido ainda ativo')),
+        (OVERDUE_REMINDER, _('Lembrete atrasado')),
+        (MISSING_DOCUMENT, _('Documento ausente')),
+        (INVALID_DATES, _('Datas inconsistentes')),
+    ]
+
+    INFO = 10
+    WARNING = 20
+    CRITICAL = 30
+    SEVERITY_CHOICES = [
+        (INFO, _('Informação')),
+        (WARNING, _('Atenção')),
+        (CRITICAL, _('Crítico')),
+    ]
+
+    key = models.CharField(_('chave'), max_length=100)
+    kind = models.CharField(_('tipo'), max_length=30, choices=KIND_CHOICES)
+    severity = models.PositiveSmallIntegerField(_('gravidade'), choices=SEVERITY_CHOICES, default=WARNING)
+    contract = models.ForeignKey(
+        'contracts.Contract',
+        on_delete=models.CASCADE,
+        verbose_name=_('contrato'),
+        related_name='alerts'
+    )
+    reminder = models.ForeignKey(
+        'contracts.ContractReminder',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        verbose_name=_('lembrete'),
+        related_name='alerts'
+    )
+    message = models.CharField(_('mensagem'), max_length=255)
+    is_open = models.BooleanField(_('aberto'), default=True)
+    opened_at = models.DateTimeField(_('aberto em'), default=timezone.now)
+    last_seen_at = models.DateTimeField(_('visto em'), default=timezone.now)
+    closed_at = models.DateTimeField(_('fechado em'), null=True, blank=True)
+
+    class Meta:
+        verbose_name = _('alerta')
+        verbose_name_plural = _('alertas')
+        ordering = ['-severity', '-opened_at']
+        indexes = [
+            models.Index(fields=['is_open', '-severity', '-opened_at'], name='alert_open_severity_idx'),
+            models.Index(fields=['is_open', 'kind'], name='alert_open_kind_idx'),
+            models.Index(fields=['closed_at'], name='alert_closed_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['key'],
+                condition=models.Q(is_open=True),
+                name='unique_open_alert'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()}: {self.message}"
@@ -1,3 +1,119 @@
+from datetime import date, datetime, timedelta
+
 from django.test import TestCase
+from django.utils import timezone
+
+from contracts.models import Contract, ContractReminder, ContractStatus
+
+from .alerts import evaluate_alerts, get_open_alert_counts, purge_closed_alerts, sync_alerts
+from .models import Alert
+
+
+class AlertSyncTests(TestCase):
+    """Testes da avaliação e sincronização dos alertas"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.now = timezone.make_aware(datetime(2024, 6, 1, 12, 0))
+        cls.status = ContractStatus.objects.create(name='Vigente')
+        cls.contract = Contract.objects.create(
+            company='Empresa', status=cls.status, start_date=date(2024, 1, 1),
+            end_date=date(2025, 1, 1), value=1000, fiscal_portaria='portaria.pdf',
+        )
+
+    def found(self, *keys):
+        return {
+            key: {'severity': Alert.WARNING, 'contract_id': self.contract.pk, 'message': key}
+            for key in keys
+        }
+
+    def test_sync_opens_keeps_and_closes(self):
+        result = sync_alerts(Alert.MISSING_DOCUMENT, self.found('a', 'b'), self.now)
+        self.assertEqual(result, {'opened': 2, 'open': 2, 'closed': 0})
+
+        later = self.now + timedelta(hours=1)
+        result = sync_alerts(Alert.MISSING_DOCUMENT, self.found('b', 'c'), later)
+        self.assertEqual(result, {'opened': 1, 'open': 2, 'closed': 1})
+
+        alerts = {alert.key: alert for alert in Alert.objects.all()}
+        self.assertFalse(alerts['a'].is_open)
+        self.assertEqual(alerts['a'].closed_at, later)
+        self.assertTrue(alerts['b'].is_open)
+        self.assertEqual(alerts['b'].opened_at, self.now)
+        self.assertEqual(alerts['b'].last_seen_at, later)
+        self.assertEqual(alerts['c'].opened_at, later)
+
+    def test_sync_only_touches_its_kind(self):
+        sync_alerts(Alert.INVALID_DATES, self.found('x'), self.now)
+        result = sync_alerts(Alert.MISSING_DOCUMENT, {}, self.now)
+
+        self.assertEqual(result['closed'], 0)
+        self.assertTrue(Alert.objects.get(key='x').is_open)
+
+    def test_closed_key_can_reopen(self):
+        sync_alerts(Alert.MISSING_DOCUMENT, self.found('a'), self.now)
+        sync_alerts(Alert.MISSING_DOCUMENT, {}, self.now)
+        sync_alerts(Alert.MISSING_DOCUMENT, self.found('a'), self.now)
+
+        self.assertEqual(Alert.objects.filter(key='a').count(), 2)
+        self.assertEqual(Alert.objects.filter(key='a', is_open=True).count(), 1)
+
+    def test_evaluate_alerts_runs_the_rules(self):
+        expired = Contract.objects.create(
+            company='Vencida', status=self.status, start_date=date(2023, 1, 1),
+            end_date=date(2024, 1, 1), value=1, fiscal_portaria='portaria.pdf',
+        )
+        inverted = Contract.objects.create(
+            company='Invertida', status=self.status, start_date=date(2025, 1, 1),
+            end_date=date(2024, 12, 1), value=1, fiscal_portaria='',
+        )
+        reminder = ContractReminder.objects.create(
+            contract=self.contract, title='Renovar', due_date=self.now - timedelta(days=1),
+        )
+        ContractReminder.objects.create(
+            contract=self.contract, title='Feito', due_date=self.now - timedelta(days=1), is_completed=True,
+        )
+
+        results = evaluate_alerts(now=self.now)
+
+        keys = set(Alert.objects.filter(is_open=True).values_list('key', flat=True))
+        self.assertEqual(keys, {
+            f'{Alert.EXPIRED_ACTIVE}:{expired.pk}',
+            f'{Alert.INVALID_DATES}:{inverted.pk}',
+            f'{Alert.MISSING_DOCUMENT}:{inverted.pk}:fiscal_portaria',
+            f'{Alert.OVERDUE_REMINDER}:{reminder.pk}',
+        })
+        self.assertEqual(results[Alert.EXPIRED_ACTIVE]['opened'], 1)
+        self.assertEqual(Alert.objects.get(kind=Alert.OVERDUE_REMINDER).reminder, reminder)
+
+        reminder.is_completed = True
+        reminder.save()
+        results = evaluate_alerts(now=self.now, kinds=[Alert.OVERDUE_REMINDER])
+        self.assertEqual(list(results), [Alert.OVERDUE_REMINDER])
+        self.assertEqual(results[Alert.OVERDUE_REMINDER]['closed'], 1)
+
+    def test_open_alert_counts(self):
+        sync_alerts(Alert.MISSING_DOCUMENT, self.found('a', 'b'), self.now)
+        sync_alerts(Alert.INVALID_DATES, {
+            'c': {'severity': Alert.CRITICAL, 'contract_id': self.contract.pk, 'message': 'c'},
+        }, self.now)
+        sync_alerts(Alert.MISSING_DOCUMENT, self.found('a'), self.now)
+
+        with self.assertNumQueries(1):
+            counts = get_open_alert_counts()
+        self.assertEqual(counts['total'], 2)
+        self.assertEqual(counts['by_severity'][Alert.WARNING], 1)
+        self.assertEqual(counts['by_severity'][Alert.CRITICAL], 1)
+        self.assertEqual(counts['by_kind'][Alert.INVALID_DATES], 1)
+        self.assertEqual(counts['by_kind'][Alert.EXPIRED_ACTIVE], 0)
+
+    def test_purge_removes_only_old_closed_alerts(self):
+        sync_alerts(Alert.MISSING_DOCUMENT, self.found('old', 'recent', 'open'), self.now)
+        Alert.objects.filter(key='old').update(is_open=False, closed_at=self.now - timedelta(days=100))
+        Alert.objects.filter(key='recent').update(is_open=False, closed_at=self.now - timedelta(days=10))
 
-# Create your tests here.
+        with self.settings(ALERT_RETENTION_DAYS=90):
+            self.assertEqual(purge_closed_alerts(now=self.now), 1)
+        self.assertEqual(
+            set(Alert.objects.values_list('key', flat=True)), {'recent', 'open'}
+        )
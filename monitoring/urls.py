@@ -6,6 +6,8 @@ app_name = 'monitoring'
 urlpatterns = [
     # Página de alertas
     path('alertas/', views.AlertsView.as_view(), name='alerts'),
+    # Alertas em JSON
+    path('alertas/json/', views.AlertsJSONView.as_view(), name='alerts_json'),
     # Redireciona a raiz para a página de alertas
     path('', views.AlertsView.as_view(), name='index'),
 ]
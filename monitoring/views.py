@@ -1,12 +1,79 @@
-from django.shortcuts import render
-from django.views.generic import TemplateView
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.http import JsonResponse
+from django.urls import reverse
+from django.views.generic import ListView, View
 
+from core.mixins import CursorPaginationMixin
+from core.utils import cursor_paginate_queryset
 
-class AlertsView(LoginRequiredMixin, TemplateView):
+from .alerts import get_alerts, get_open_alert_counts
+from .models import Alert
+
+
+def _alert_filters(params):
+    """Filtros da query string: status (open/closed), kind e severity"""
+    kind = params.get('kind')
+    severity = params.get('severity')
+    return {
+        'is_open': params.get('status') != 'closed',
+        'kind': kind if kind in dict(Alert.KIND_CHOICES) else None,
+        'severity': int(severity) if severity in {str(value) for value, _ in Alert.SEVERITY_CHOICES} else None,
+    }
+
+
+class AlertsView(LoginRequiredMixin, CursorPaginationMixin, ListView):
+    """Alertas pré-calculados pelo comando ``evaluate_alerts``"""
     template_name = 'monitoring/alerts.html'
-    
+    context_object_name = 'alerts'
+    paginate_by = 25
+
+    def get_queryset(self):
+        self.filters = _alert_filters(self.request.GET)
+        return get_alerts(**self.filters)
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['active_menu'] = 'monitoring'
+        context['filters'] = self.filters
+        counts = get_open_alert_counts()
+        context['open_total'] = counts['total']
+        context['severity_counts'] = [
+            (value, label, counts['by_severity'][value]) for value, label in Alert.SEVERITY_CHOICES
+        ]
+        context['kind_counts'] = [
+            (value, label, counts['by_kind'][value]) for value, label in Alert.KIND_CHOICES
+        ]
         return context
+
+
+class AlertsJSONView(LoginRequiredMixin, View):
+    """Os mesmos alertas em JSON, paginados por cursor (``?cursor=``)"""
+    paginate_by = 50
+
+    def get(self, request, *args, **kwargs):
+        data = cursor_paginate_queryset(get_alerts(**_alert_filters(request.GET)), request, self.paginate_by)
+        page = data['page_obj']
+        return JsonResponse({
+            'counts': get_open_alert_counts(),
+            'results': [self.serialize(alert) for alert in page.object_list],
+            'next_cursor': page.next_cursor,
+            'previous_cursor': page.previous_cursor,
+        })
+
+    def serialize(self, alert):
+        return {
+            'id': alert.pk,
+            'kind': alert.kind,
+            'kind_display': alert.get_kind_display(),
+            'severity': alert.severity,
+            'severity_display': alert.get_severity_display(),
+            'message': alert.message,
+            'contract_id': alert.contract_id,
+            'contract_number': alert.contract_number,
+            'contract_url': reverse('contracts:contract_detail', args=[alert.contract_id]),
+            'reminder_id': alert.reminder_id,
+            'is_open': alert.is_open,
+            'opened_at': alert.opened_at.isoformat(),
+            'last_seen_at': alert.last_seen_at.isoformat(),
+            'closed_at': alert.closed_at.isoformat() if alert.closed_at else None,
+        }
@@ -53,6 +53,53 @@ function initSelect2() {
     }
 }
 
+/**
+ * Função para inicializar os campos com autocompletar (data-autocomplete-url).
+ * Selects usam o Select2 com busca no servidor; inputs de texto usam o
+ * autocomplete do jQuery UI apenas como sugestão.
+ */
+function initAutocomplete() {
+    const delay = 250;
+
+    if ($.fn.select2) {
+        $('select[data-autocomplete-url]').each(function() {
+            const $select = $(this);
+            $select.select2({
+                theme: 'bootstrap-5',
+                width: '100%',
+                placeholder: $select.data('placeholder') || 'Digite para buscar',
+                allowClear: true,
+                language: 'pt-BR',
+                minimumInputLength: $select.data('minimum-input-length') || 1,
+                ajax: {
+                    url: $select.data('autocomplete-url'),
+                    dataType: 'json',
+                    delay: delay,
+                    cache: true,
+                    data: function(params) {
+                        return {q: params.term};
+                    }
+                }
+            });
+        });
+    }
+
+    if ($.fn.autocomplete) {
+        $('input[data-autocomplete-url]').each(function() {
+            const $input = $(this);
+            $input.autocomplete({
+                delay: delay,
+                minLength: $input.data('minimum-input-length') || 1,
+                source: function(request, response) {
+                    $.getJSON($input.data('autocomplete-url'), {q: request.term}, function(data) {
+                        response(data.results.map(item => item.text));
+                    });
+                }
+            });
+        });
+    }
+}
+
 /**
  * Função para inicializar os datepickers
  */
@@ -147,6 +194,7 @@ document.addEventListener('DOMContentLoaded', function() {
     initPopovers();
     initDataTables();
     initSelect2();
+    initAutocomplete();
     initDatepickers();
     initMasks();
     